@@ -0,0 +1,206 @@
+"""Load-test and latency benchmark for the public API.
+
+Boots server.py's `app` in-process (through httpx's ASGI transport, so no
+network is involved), seeds a scratch database with synthetic data and
+fires concurrent requests at every public route. Per-route p50/p95/p99
+latency, requests/sec and error counts are printed and saved as JSON so
+two runs can be diffed:
+
+    python bench_api.py --rows 10000 --requests 500 --concurrency 32
+    python bench_api.py --rows 10000 --baseline bench_results/previous.json
+    python bench_api.py --backend mongomock --rows 1000     # no mongod needed
+    python bench_api.py --backend memory --rows 10000       # framework cost only
+    python bench_api.py --rows 10000 --no-cache             # every request runs its route
+
+With --backend mongo (default) the data goes into `<DB_NAME>_bench` on
+MONGO_URL and the database is dropped afterwards. Routes that rely on
+operators mongomock does not implement ($text, $bucketAuto) show up as
+errors under --backend mongomock. --backend memory serves the API from the
+in-memory repositories (REPOSITORY_BACKEND=memory), so the difference to a
+mongo run is the database's share of each route's latency.
+
+Each route is one fixed URL, so after the warm-up the read cache, the
+encoded-response cache and single-flight joins answer almost every request
+and the numbers measure those layers. --no-cache turns all three off
+(CACHE_MAX_ENTRIES=0, COMPRESSION_CACHE_ENTRIES=0, SINGLE_FLIGHT=0) so each
+request runs its handler and query; compare backends with --no-cache. The
+sitemap and the catalog snapshot (CATALOG_INDEX) keep their own caches.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+
+ROUTES = [
+    "/api/pbn",
+    "/api/pbn?niche=tech&min_dr=40&sort_by=price_per_post",
+    "/api/pbn?cursor=&limit=20",
+    "/api/pbn?envelope=true&page=5",
+    "/api/pbn/facets",
+    "/api/domains",
+    "/api/domains?max_price=8000000&sort_by=age",
+    "/api/domains/facets",
+    "/api/packages",
+    "/api/faq",
+    "/api/settings",
+    "/api/page-content",
+    "/api/page-content/homepage_hero",
+    "/api/pages/about",
+    "/api/blog",
+    "/api/blog?search=backlink",
+    "/api/blog/post-1",
+    "/api/search?q=backlink",
+    "/api/sitemap",
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    index = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+    return samples[index]
+
+
+async def load_route(client, route: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(route)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    header = f"{'route':<55}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>6}"
+    if baseline:
+        header += f"{'Δp95':>9}"
+    print(header)
+    for route, row in results["routes"].items():
+        line = (f"{route:<55}{row['rps']:>9}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['errors']:>6}")
+        before = (baseline or {}).get("routes", {}).get(route)
+        if before and before["p95_ms"]:
+            line += f"{(row['p95_ms'] / before['p95_ms'] - 1) * 100:>+8.1f}%"
+        print(line)
+
+
+async def main(args) -> None:
+    load_dotenv(ROOT_DIR / '.env')
+    os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    os.environ['DB_NAME'] = f"{os.environ.get('DB_NAME', 'domainpbn')}_bench"
+    if args.no_cache:
+        # Read at import time by server.py; a zero-entry TTLCache keeps nothing
+        os.environ['CACHE_MAX_ENTRIES'] = '0'
+        os.environ['COMPRESSION_CACHE_ENTRIES'] = '0'
+        os.environ['SINGLE_FLIGHT'] = '0'
+    if args.backend == "memory":
+        os.environ['REPOSITORY_BACKEND'] = 'memory'
+    elif args.backend == "mongomock":
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+        motor.motor_asyncio.AsyncIOMotorClient = lambda *a, **kw: AsyncMongoMockClient()
+
+    sys.path.insert(0, str(ROOT_DIR))
+    import httpx
+    import server
+    from seed_synthetic import seed
+    from synthetic import fixed_content, generate
+
+    print(f"Seeding {args.rows} rows per catalog collection ({args.backend})...")
+    started = time.perf_counter()
+    counts = {"pbn_sites": args.rows, "domain_listings": args.rows, "blog_posts": args.rows, "page_contents": 8}
+    if args.backend == "memory":
+        for name, docs in fixed_content().items():
+            await server.repos[name].insert_many(docs)
+        for name, count in counts.items():
+            await server.repos[name].insert_many(generate(name, count))
+    else:
+        await seed(server.db, counts, drop=True)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "backend": args.backend,
+            "cache": not args.no_cache,
+            "rows": args.rows,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "routes": {},
+    }
+    try:
+        async with server.app.router.lifespan_context(server.app):
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for route in ROUTES:
+                    await load_route(client, route, min(args.warmup, args.requests), 1)
+                    results["routes"][route] = await load_route(client, route, args.requests, args.concurrency)
+    finally:
+        if args.backend == "mongo":
+            from motor.motor_asyncio import AsyncIOMotorClient
+            cleanup = AsyncIOMotorClient(os.environ['MONGO_URL'])
+            await cleanup.drop_database(os.environ['DB_NAME'])
+            cleanup.close()
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    print_report(results, baseline)
+
+    out = Path(args.out or ROOT_DIR / "bench_results" / f"api-{datetime.now():%Y%m%d-%H%M%S}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark public API routes under concurrent load")
+    parser.add_argument("--rows", type=int, default=1000, help="rows per catalog collection (1k to 1M)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10, help="sequential warm-up requests per route")
+    parser.add_argument("--backend", choices=["mongo", "mongomock", "memory"], default="mongo")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="disable the read cache, encoded-response cache and single-flight")
+    parser.add_argument("--baseline", help="previous results JSON to compare p95 against")
+    parser.add_argument("--out", help="where to write the results JSON")
+    asyncio.run(main(parser.parse_args()))
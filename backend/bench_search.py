@@ -0,0 +1,120 @@
+"""Benchmark blog search: legacy `$regex` path versus the `$text` index.
+
+Seeds synthetic posts into a scratch database (`<DB_NAME>_bench_search`),
+then times both query shapes at each size:
+
+    python bench_search.py --sizes 10000 100000 --runs 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from indexes import INDEXES
+
+VOCABULARY = (
+    "seo backlink pbn domain authority ranking google traffic keyword niche "
+    "artikel website bisnis strategi konten optimasi mesin pencari tips panduan "
+    "link building guest post anchor text algoritma update aman premium harga "
+    "murah kualitas tinggi digital marketing toko online affiliate blog"
+).split()
+
+QUERIES = ["backlink", "guest post", "optimasi", "affiliate marketing", "algoritma"]
+
+
+def words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(count))
+
+
+def make_posts(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        yield {
+            "id": str(uuid.uuid4()),
+            "title": words(rng, 6).title(),
+            "slug": f"post-{i}",
+            "excerpt": words(rng, 25),
+            "content": words(rng, 300),
+            "is_published": True,
+            "published_at": now - timedelta(minutes=i),
+            "created_at": now - timedelta(minutes=i),
+        }
+
+
+async def seed(collection, count: int, batch: int = 5000):
+    await collection.drop()
+    await collection.create_indexes(INDEXES["blog_posts"])
+    docs = []
+    for doc in make_posts(count):
+        docs.append(doc)
+        if len(docs) == batch:
+            await collection.insert_many(docs, ordered=False)
+            docs = []
+    if docs:
+        await collection.insert_many(docs, ordered=False)
+
+
+async def time_query(make_cursor, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await make_cursor().to_list(10)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 2),
+    }
+
+
+async def bench(collection, runs: int):
+    results = {}
+    for q in QUERIES:
+        regex = lambda: collection.find(
+            {"is_published": True, "$or": [
+                {"title": {"$regex": q, "$options": "i"}},
+                {"excerpt": {"$regex": q, "$options": "i"}},
+            ]},
+            {"_id": 0},
+        ).sort("published_at", -1).limit(10)
+        text = lambda: collection.find(
+            {"is_published": True, "$text": {"$search": q}},
+            {"_id": 0, "score": {"$meta": "textScore"}},
+        ).sort([("score", {"$meta": "textScore"}), ("published_at", -1)]).limit(10)
+        results[q] = {"regex": await time_query(regex, runs), "text": await time_query(text, runs)}
+    return results
+
+
+async def main(sizes, runs: int):
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[f"{os.environ['DB_NAME']}_bench_search"]
+    try:
+        for size in sizes:
+            print(f"Seeding {size} posts...")
+            await seed(db.blog_posts, size)
+            print(f"{'query':<22}{'regex p50':>12}{'regex p95':>12}{'text p50':>12}{'text p95':>12}")
+            for q, row in (await bench(db.blog_posts, runs)).items():
+                print(f"{q:<22}{row['regex']['p50_ms']:>12}{row['regex']['p95_ms']:>12}"
+                      f"{row['text']['p50_ms']:>12}{row['text']['p95_ms']:>12}")
+            print()
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare regex and text-index blog search latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.runs))
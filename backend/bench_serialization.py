@@ -0,0 +1,89 @@
+"""Microbenchmark of the per-request CPU spent shaping `/api/admin/blog` responses.
+
+Compares the legacy read path (ISO-string timestamps walked by the recursive
+deserialize_datetime, then validated by FastAPI's response_model) with the
+current one (native BSON dates returned straight to response_model). No
+database is needed; documents are generated in memory:
+
+    python bench_serialization.py --rows 1000 --runs 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from server import BlogPost
+
+
+def legacy_deserialize_datetime(obj: Any) -> Any:
+    """Copy of the helper server.py used before timestamps were stored natively"""
+    if isinstance(obj, dict):
+        result = {}
+        for k, v in obj.items():
+            if isinstance(v, str) and k in ['created_at', 'updated_at', 'published_at']:
+                try:
+                    result[k] = datetime.fromisoformat(v)
+                except ValueError:
+                    result[k] = v
+            else:
+                result[k] = legacy_deserialize_datetime(v)
+        return result
+    elif isinstance(obj, list):
+        return [legacy_deserialize_datetime(item) for item in obj]
+    return obj
+
+
+def make_posts(rows: int, native: bool) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    posts = []
+    for i in range(rows):
+        stamp = now - timedelta(hours=i)
+        posts.append({
+            "id": str(uuid.uuid4()),
+            "title": f"Panduan SEO Backlink #{i}",
+            "slug": f"panduan-seo-backlink-{i}",
+            "excerpt": "Pelajari cara membangun backlink berkualitas untuk website Anda. " * 2,
+            "content": "<p>Backlink PBN premium membantu ranking website Anda.</p>" * 40,
+            "thumbnail": None,
+            "meta_title": None,
+            "meta_description": None,
+            "is_published": True,
+            "published_at": stamp if native else stamp.isoformat(),
+            "created_at": stamp if native else stamp.isoformat(),
+        })
+    return posts
+
+
+async def time_path(field, posts: List[dict], legacy: bool, runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.process_time()
+        content = [legacy_deserialize_datetime(post) for post in posts] if legacy else posts
+        await serialize_response(field=field, response_content=content)
+        samples.append((time.process_time() - start) * 1000)
+    return samples
+
+
+async def main(rows: int, runs: int):
+    field = create_response_field(name="Response_get_admin_blog_posts", type_=List[BlogPost])
+    before = await time_path(field, make_posts(rows, native=False), legacy=True, runs=runs)
+    after = await time_path(field, make_posts(rows, native=True), legacy=False, runs=runs)
+    print(f"/api/admin/blog response shaping, {rows} posts, {runs} runs (CPU ms per request)")
+    print(f"{'path':<10}{'median':>10}{'min':>10}")
+    print(f"{'before':<10}{statistics.median(before):>10.2f}{min(before):>10.2f}")
+    print(f"{'after':<10}{statistics.median(after):>10.2f}{min(after):>10.2f}")
+    print(f"speedup: {statistics.median(before) / statistics.median(after):.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark datetime handling on the admin blog listing")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.runs))
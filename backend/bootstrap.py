@@ -0,0 +1,62 @@
+"""Pre-serialized JSON snapshot bundling everything the homepage renders.
+
+The snapshot is a JSON object with one key per section (packages, settings,
+a PBN preview, ...). Each section is loaded and serialized to bytes once and
+kept together with the versions (see conditional.CollectionVersions) of the
+collections it was read from. A request only compares versions and joins the
+cached bytes; a section is re-read from MongoDB only after an admin write
+bumped one of its collections, on whichever worker that write happened.
+
+The versions themselves come from the in-process copy in
+conditional.CachedCollectionVersions, so a warm request is served from memory
+alone. A write made on this worker is reflected by the next request. A write
+made on another worker is reflected once this worker's copy of the versions
+refreshes: within COLLECTION_VERSIONS_TTL_SECONDS (1 s by default), or as
+soon as the change stream delivers the bump.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from conditional import VersionState
+
+# Called with the versions the section is being built for
+SectionLoader = Callable[[VersionState], Awaitable[bytes]]
+
+
+class Snapshot:
+    """JSON object whose sections are rebuilt only when their collections change"""
+
+    def __init__(self, versions, sections: Dict[str, Tuple[List[str], SectionLoader]]):
+        self.versions = versions
+        self.sections = sections
+        self.collections = sorted({name for collections, _ in sections.values() for name in collections})
+        self.parts: Dict[str, bytes] = {}
+        self.built_versions: Dict[str, Dict[str, int]] = {}
+        self.body: Optional[bytes] = None
+        self.rebuilds = 0
+        self._lock = asyncio.Lock()
+
+    def _stale(self, state: VersionState) -> List[str]:
+        return [
+            section for section, (collections, _) in self.sections.items()
+            if self.built_versions.get(section) != {name: state[name][0] for name in collections}
+        ]
+
+    async def get(self, state: Optional[VersionState] = None) -> bytes:
+        """Current snapshot bytes; `state` may be versions already read for this request"""
+        if state is None or not set(self.collections) <= set(state):
+            state = await self.versions.get(self.collections)
+        if self.body is not None and not self._stale(state):
+            return self.body
+        async with self._lock:
+            stale = self._stale(state)
+            if stale or self.body is None:
+                for section in stale:
+                    collections, load = self.sections[section]
+                    self.parts[section] = await load(state)
+                    self.built_versions[section] = {name: state[name][0] for name in collections}
+                self.body = b"{" + b",".join(
+                    b'"%s":%s' % (section.encode(), self.parts[section]) for section in self.sections
+                ) + b"}"
+                self.rebuilds += 1
+        return self.body
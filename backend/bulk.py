@@ -0,0 +1,200 @@
+"""Bulk admin operations executed as one unordered `bulk_write`.
+
+An operation is one of:
+
+    {"op": "update", "id": "...", "set": {...}}           partial update of one document
+    {"op": "status", "id": "...", "status": "hidden"}     status change of one document
+    {"op": "delete", "id": "..."}                          delete one document
+    {"op": "update_many", "filter": {...}, "set": {...}, "multiply": {"price_per_post": 1.1}}
+
+`set` is validated against the collection's PATCH model, `status` against
+the collection's status vocabulary, and `filter` may only use model fields
+with the comparison operators in FILTER_OPERATORS. `multiply` scales numeric
+fields server-side by a factor in (0, MAX_MULTIPLY_FACTOR] (rounded back to
+whole numbers for int fields), so "raise prices 10% for niche=Finance" is a
+single UpdateMany.
+
+Invalid operations are reported and skipped; the valid ones are sent with
+ordered=False, so one failing write does not stop the rest. Server-side
+rejections (OperationFailure on a filter or on the whole bulk_write) are
+reported on the operation that caused them rather than failing the request.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from pymongo import DeleteOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+FILTER_OPERATORS = {"$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin"}
+# `multiply` factors must lie in (0, MAX_MULTIPLY_FACTOR]: a zero or negative
+# factor would wipe or flip prices, a huge one is almost certainly a typo
+MAX_MULTIPLY_FACTOR = 10.0
+SCALARS = (str, int, float, bool, type(None))
+
+
+class BulkSpec:
+    """What a collection accepts in bulk operations"""
+
+    def __init__(self, collection: str, patch_model: type, statuses: Sequence[str]):
+        self.collection = collection
+        self.patch_model = patch_model
+        self.statuses = set(statuses)
+        self.fields = patch_model.model_fields
+        self.numeric = {name for name, info in self.fields.items() if info.annotation in (int, float)}
+
+
+def _check_filter(spec: BulkSpec, query: Dict[str, Any]) -> None:
+    if not query:
+        raise ValueError("update_many needs a non-empty filter")
+    for field, condition in query.items():
+        if field not in spec.fields:
+            raise ValueError(f"cannot filter on '{field}'")
+        if isinstance(condition, dict):
+            for operator, value in condition.items():
+                if operator not in FILTER_OPERATORS:
+                    raise ValueError(f"operator '{operator}' is not allowed")
+                if operator in ("$in", "$nin") and not isinstance(value, list):
+                    raise ValueError(f"'{operator}' on '{field}' needs a list")
+                values = value if operator in ("$in", "$nin") else [value]
+                if not all(isinstance(item, SCALARS) for item in values):
+                    raise ValueError(f"'{field}' must be compared with plain values")
+        elif not isinstance(condition, SCALARS):
+            raise ValueError(f"'{field}' must be compared with plain values")
+
+
+def _check_set(spec: BulkSpec, changes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    try:
+        validated = spec.patch_model(**(changes or {})).model_dump(exclude_unset=True)
+    except ValidationError as exc:
+        raise ValueError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors()))
+    unknown = set(changes or {}) - set(validated)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    if "status" in validated and validated["status"] not in spec.statuses:
+        raise ValueError(f"status must be one of {', '.join(sorted(spec.statuses))}")
+    return validated
+
+
+def _multiply_pipeline(spec: BulkSpec, changes: Dict[str, Any], factors: Dict[str, float]) -> List[Dict[str, Any]]:
+    stage: Dict[str, Any] = dict(changes)
+    for field, factor in factors.items():
+        if field not in spec.numeric:
+            raise ValueError(f"'{field}' is not a numeric field")
+        if field in changes:
+            raise ValueError(f"'{field}' cannot be both set and multiplied")
+        if isinstance(factor, bool) or not isinstance(factor, (int, float)) \
+                or not 0 < factor <= MAX_MULTIPLY_FACTOR:
+            raise ValueError(f"factor for '{field}' must be a number in (0, {MAX_MULTIPLY_FACTOR:g}]")
+        scaled: Dict[str, Any] = {"$multiply": [f"${field}", factor]}
+        if spec.fields[field].annotation is int:
+            scaled = {"$toLong": {"$round": [scaled, 0]}}
+        stage[field] = scaled
+    return [{"$set": stage}]
+
+
+def build_write(spec: BulkSpec, op: Dict[str, Any]):
+    """Translate one API operation into a pymongo write model (raises ValueError)"""
+    kind = op.get("op")
+    if kind in ("update", "status", "delete") and not op.get("id"):
+        raise ValueError(f"'{kind}' needs an id")
+    if kind == "delete":
+        return DeleteOne({"id": op["id"]})
+    if kind == "status":
+        return UpdateOne({"id": op["id"]}, {"$set": _check_set(spec, {"status": op.get("status")})})
+    if kind == "update":
+        changes = _check_set(spec, op.get("set"))
+        if not changes:
+            raise ValueError("'update' needs at least one field in 'set'")
+        return UpdateOne({"id": op["id"]}, {"$set": changes})
+    if kind == "update_many":
+        query = op.get("filter") or {}
+        _check_filter(spec, query)
+        changes = _check_set(spec, op.get("set"))
+        if op.get("multiply"):
+            return UpdateMany(query, _multiply_pipeline(spec, changes, op["multiply"]))
+        if not changes:
+            raise ValueError("'update_many' needs 'set' or 'multiply'")
+        return UpdateMany(query, {"$set": changes})
+    raise ValueError(f"unknown op '{kind}'")
+
+
+def _server_error(exc: OperationFailure) -> str:
+    return (exc.details or {}).get("errmsg") or str(exc)
+
+
+async def _bulk_write(collection, writes: List[Tuple[int, Any]], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """bulk_write(ordered=False) of `writes`; per-document write errors are recorded on their results"""
+    try:
+        return (await collection.bulk_write([write for _, write in writes], ordered=False)).bulk_api_result
+    except BulkWriteError as exc:
+        outcome = exc.details
+        for error in outcome.get("writeErrors", []):
+            index = writes[error["index"]][0]
+            results[index].update(status="error", error=error.get("errmsg"))
+        return outcome
+
+
+async def run_bulk(collection, spec: BulkSpec, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate, execute as one unordered bulk_write on the Motor collection and report per operation"""
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    writes: List[Tuple[int, Any]] = []
+    for index, op in enumerate(operations):
+        result = {"index": index, "op": op.get("op"), "status": "ok", "matched": None, "error": None}
+        results.append(result)
+        try:
+            writes.append((index, build_write(spec, op)))
+        except ValueError as exc:
+            result.update(status="error", error=str(exc))
+
+    # bulk_write only reports totals, so per-operation match counts are looked up
+    # first: one query for every id-addressed op plus one count per filter op
+    by_id = [index for index, _ in writes if operations[index]["op"] != "update_many"]
+    by_filter = [index for index, _ in writes if operations[index]["op"] == "update_many"]
+    ids = [operations[index]["id"] for index in by_id]
+    existing = set(await collection.distinct("id", {"id": {"$in": ids}})) if ids else set()
+    counts = await asyncio.gather(*(collection.count_documents(operations[index]["filter"]) for index in by_filter),
+                                  return_exceptions=True)
+    for index, count in zip(by_filter, counts):
+        if isinstance(count, OperationFailure):
+            # A filter the server rejects fails the same way in bulk_write; report it and skip the op
+            results[index].update(status="error", error=_server_error(count))
+        elif isinstance(count, BaseException):
+            raise count
+        else:
+            results[index]["matched"] = count
+    writes = [(index, write) for index, write in writes if results[index]["status"] != "error"]
+    for index in by_id:
+        found = operations[index]["id"] in existing
+        results[index]["matched"] = int(found)
+        if not found:
+            results[index]["status"] = "not_found"
+
+    summary = {"matched": 0, "modified": 0, "deleted": 0}
+    write_ms = 0.0
+    if writes:
+        write_started = time.perf_counter()
+        try:
+            outcomes = [await _bulk_write(collection, writes, results)]
+        except OperationFailure:
+            # The whole command was rejected, so no op was applied; run them one by
+            # one to find out which op the server objects to
+            outcomes = []
+            for write in writes:
+                try:
+                    outcomes.append(await _bulk_write(collection, [write], results))
+                except OperationFailure as exc:
+                    results[write[0]].update(status="error", error=_server_error(exc))
+        write_ms = (time.perf_counter() - write_started) * 1000
+        summary = {key: sum(outcome.get(field, 0) for outcome in outcomes)
+                   for key, field in (("matched", "nMatched"), ("modified", "nModified"), ("deleted", "nRemoved"))}
+
+    return {
+        "results": results,
+        **summary,
+        "errors": sum(1 for result in results if result["status"] == "error"),
+        "write_ms": round(write_ms, 2),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -0,0 +1,81 @@
+"""In-process TTL + LRU cache for the public read endpoints.
+
+Entries are keyed by a tuple whose first element is the collection the value
+was read from, so admin write handlers can drop everything derived from a
+collection with a single invalidate() call.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def set(self, key: Tuple[Hashable, ...], value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: Tuple[Hashable, ...], loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value or await `loader` and cache its result.
+
+        A None result (e.g. a missing document) is not cached so the route
+        can still answer 404 without pinning the miss for a whole TTL.
+        """
+        hit, value = self.get(key)
+        if hit:
+            return value
+        value = await loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, namespace: Hashable) -> int:
+        """Drop every entry whose key starts with `namespace`"""
+        stale = [key for key in self._entries if key[0] == namespace]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += 1
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,347 @@
+"""In-process column snapshot of the public PBN and domain catalogs.
+
+A CatalogIndex holds the public rows of one collection (active PBN sites,
+available domains) already projected for the listing routes, plus one NumPy
+array per scalar field and, per sort field, the row permutation for
+`(field desc, id desc)`. A listing query is answered by building a boolean
+mask from the filter (vectorized comparisons, `$in`, and the `$or` of a
+keyset cursor) and taking the masked permutation: no database round-trip and
+no per-row Python work until the page itself is copied out.
+
+Freshness follows the collection versions (see conditional.py). The snapshot
+records the version it reflects; a request carrying a newer version reloads
+it from the repository. Two paths avoid that re-read, leaving only an array
+rebuild on the next request:
+
+* writes on this worker hand the written document to `written()`, which
+  patches the rows when no other write happened in between;
+* with the change feed (changefeed.py) on a replica set, writes from other
+  workers arrive through `changed()`, followed by the version bump that
+  came after them through `advance()`.
+
+Queries the snapshot cannot answer exactly (another status, a projection or
+sort it was not built for, a field with missing or mixed-type values) are
+passed to the repository unchanged.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from repository import Repository, matches, project
+
+logger = logging.getLogger(__name__)
+
+_RANGE_OPERATORS = {"$gt": np.greater, "$gte": np.greater_equal, "$lt": np.less, "$lte": np.less_equal}
+
+
+def _column(values: List[Any]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """(array, vocabulary) for a field whose values are all int, all numbers, all bool or all str
+
+    Strings are stored as codes into their sorted vocabulary, so equality,
+    `$in` and range comparisons (the keyset cursor's `id < last_id`) all run
+    on integers.
+    """
+    kinds = {type(value) for value in values}
+    if kinds == {bool}:
+        return np.array(values, dtype=bool), None
+    if kinds == {int}:
+        return np.array(values, dtype=np.int64), None
+    if kinds and kinds <= {int, float}:
+        return np.array(values, dtype=np.float64), None
+    if kinds == {str}:
+        vocabulary, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+        return codes.astype(np.int64), vocabulary
+    return None, None
+
+
+def _operand_fits(column: np.ndarray, vocabulary: Optional[np.ndarray], operand: Any) -> bool:
+    if vocabulary is not None:
+        return isinstance(operand, str)
+    if column.dtype.kind == "b":
+        return isinstance(operand, bool)
+    return isinstance(operand, (int, float)) and not isinstance(operand, bool)
+
+
+def _code(vocabulary: np.ndarray, operator: str, value: str) -> Tuple[str, int]:
+    """Rewrite a string comparison as the equivalent comparison on vocabulary codes"""
+    position = int(np.searchsorted(vocabulary, value, side="left"))
+    present = position < len(vocabulary) and vocabulary[position] == value
+    if operator in ("$eq", "$ne"):
+        return operator, position if present else -1
+    if operator == "$gt" and present:
+        return "$gt", position
+    if operator == "$lte" and present:
+        return "$lte", position
+    # absent value, or $gte / $lt: everything from `position` on sorts at or above it
+    return {"$gt": "$gte", "$gte": "$gte", "$lt": "$lt", "$lte": "$lt"}[operator], position
+
+
+class CatalogSnapshot(Repository):
+    """Immutable column arrays for one set of rows; find/count fall back to `fallback`, the rest always do"""
+
+    def __init__(self, docs: List[Dict[str, Any]], base_query: Dict[str, Any], projection: Dict[str, Any],
+                 sort_fields: Sequence[str], fallback: Repository):
+        self.name = fallback.name
+        self.collection = fallback.collection
+        self.fallback = fallback
+        self.base_query = base_query
+        self.projection = projection
+        self.docs = docs
+        self.size = len(docs)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.vocabularies: Dict[str, np.ndarray] = {}
+        for field in {key for doc in docs for key in doc}:
+            column, vocabulary = _column([doc.get(field) for doc in docs])
+            if column is not None:
+                self.columns[field] = column
+            if vocabulary is not None:
+                self.vocabularies[field] = vocabulary
+        self.orders: Dict[str, np.ndarray] = {}
+        # ids are unique, so their codes are their rank
+        id_rank = self.columns.get("id")
+        if id_rank is None or "id" not in self.vocabularies:
+            return
+        for field in sort_fields:
+            column = self.columns.get(field)
+            if column is not None and column.dtype.kind in "if":
+                # lexsort's last key is the primary one; negate for descending
+                self.orders[field] = np.lexsort((-id_rank, -column))
+
+    def _compare(self, field: str, operator: str, operand: Any) -> Optional[np.ndarray]:
+        column = self.columns.get(field)
+        if column is None:
+            return None
+        vocabulary = self.vocabularies.get(field)
+        if operator in ("$in", "$nin"):
+            if not isinstance(operand, list) or not all(_operand_fits(column, vocabulary, value) for value in operand):
+                return None
+            if vocabulary is not None:
+                wanted = np.zeros(len(vocabulary) + 1, dtype=bool)
+                for value in operand:
+                    _, code = _code(vocabulary, "$eq", value)
+                    wanted[code] = code >= 0
+                hits = wanted[column]
+            else:
+                hits = np.isin(column, operand)
+            return hits if operator == "$in" else ~hits
+        if not _operand_fits(column, vocabulary, operand):
+            return None
+        if vocabulary is not None:
+            operator, operand = _code(vocabulary, operator, operand)
+        if operator == "$eq":
+            return column == operand
+        if operator == "$ne":
+            return column != operand
+        compare = _RANGE_OPERATORS.get(operator)
+        return compare(column, operand) if compare is not None else None
+
+    def mask(self, query: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Rows matching `query`, or None if it uses anything the columns cannot evaluate"""
+        mask = np.ones(self.size, dtype=bool)
+        for field, condition in query.items():
+            if field in ("$or", "$and"):
+                parts = [self.mask(clause) for clause in condition]
+                if not parts or any(part is None for part in parts):
+                    return None
+                mask &= np.logical_or.reduce(parts) if field == "$or" else np.logical_and.reduce(parts)
+                continue
+            if field.startswith("$"):
+                return None
+            if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+                operators = condition
+            else:
+                operators = {"$eq": condition}
+            for operator, operand in operators.items():
+                part = self._compare(field, operator, operand)
+                if part is None:
+                    return None
+                mask &= part
+        return mask
+
+    def _answerable(self, query: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> bool:
+        # The snapshot only holds rows matching base_query, shaped by one projection
+        return projection == self.projection and all(
+            query.get(field) == value for field, value in self.base_query.items()
+        )
+
+    def _order(self, sort: Optional[List[Any]]) -> Optional[np.ndarray]:
+        if not sort or len(sort) != 2 or tuple(sort[1]) != ("id", -1) or sort[0][1] != -1:
+            return None
+        return self.orders.get(sort[0][0])
+
+    async def find(self, query, projection=None, sort=None, skip=0, limit=0):
+        order = self._order(sort)
+        mask = self.mask(query) if order is not None and self._answerable(query, projection) else None
+        if mask is None:
+            return await self.fallback.find(query, projection, sort, skip, limit)
+        selected = order[mask[order]]
+        page = selected[skip:skip + limit] if limit else selected[skip:]
+        return [dict(self.docs[index]) for index in page]
+
+    async def count(self, query):
+        mask = self.mask(query) if self._answerable(query, self.projection) else None
+        if mask is None:
+            return await self.fallback.count(query)
+        return int(mask.sum())
+
+    # Everything else is the repository's
+
+    async def find_one(self, query, projection=None):
+        return await self.fallback.find_one(query, projection)
+
+    def iterate(self, query, projection=None, sort=None, batch_size=1000):
+        return self.fallback.iterate(query, projection, sort, batch_size)
+
+    async def distinct(self, field, query=None):
+        return await self.fallback.distinct(field, query)
+
+    async def facets(self, query, category_field, price_field):
+        return await self.fallback.facets(query, category_field, price_field)
+
+    async def insert_one(self, doc):
+        await self.fallback.insert_one(doc)
+
+    async def insert_many(self, docs):
+        return await self.fallback.insert_many(docs)
+
+    async def update(self, query, changes, upsert=False):
+        return await self.fallback.update(query, changes, upsert)
+
+    async def delete(self, query):
+        return await self.fallback.delete(query)
+
+
+class CatalogIndex:
+    """Keeps a CatalogSnapshot of `repo`'s rows matching `base_query` in step with the collection version"""
+
+    def __init__(self, repo: Repository, versions, base_query: Dict[str, Any], projection: Dict[str, Any],
+                 sort_fields: Sequence[str], enabled: bool = True):
+        self.name = repo.name
+        self.repo = repo
+        self.versions = versions
+        self.base_query = base_query
+        self.projection = projection
+        self.sort_fields = list(sort_fields)
+        self.enabled = enabled
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        # MongoDB _id -> id, to apply change-stream deletes (which only carry _id)
+        self.ids: Dict[Any, str] = {}
+        self.version: Optional[int] = None
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.dirty = False
+        self.reloads = 0
+        self.local_updates = 0
+        self.stream_updates = 0
+        self.build_ms = 0.0
+        self._changes = 0
+        self._lock = asyncio.Lock()
+
+    def _build(self) -> None:
+        started = time.perf_counter()
+        self.snapshot = CatalogSnapshot(list(self.rows.values()), self.base_query, self.projection,
+                                        self.sort_fields, self.repo)
+        self.build_ms = (time.perf_counter() - started) * 1000
+        self.dirty = False
+
+    async def _load(self, version: int) -> None:
+        changes = self._changes
+        # Keep _id (dropped from the stored rows) so stream deletes can be mapped to ids
+        projection = {field: flag for field, flag in self.projection.items() if field != "_id"} or None
+        docs = await self.repo.find(self.base_query, projection)
+        self.ids = {}
+        self.rows = {}
+        for doc in docs:
+            object_id = doc.pop("_id", None)
+            if object_id is not None:
+                self.ids[object_id] = doc["id"]
+            self.rows[doc["id"]] = doc
+        # A write applied while the find was running may be missing from its result
+        self.version = version if changes == self._changes else None
+        self._build()
+        self.reloads += 1
+        logger.info("Catalog %s loaded: %d rows at version %d in %.1f ms",
+                    self.name, len(self.rows), version, self.build_ms)
+
+    async def current(self, state=None) -> Optional[CatalogSnapshot]:
+        """Snapshot matching the collection version in `state` (read if not given), or None if disabled"""
+        if not self.enabled:
+            return None
+        if state is None or self.name not in state:
+            state = await self.versions.get([self.name])
+        version = state[self.name][0]
+        if self.snapshot is None or version != self.version:
+            async with self._lock:
+                if self.snapshot is None or version != self.version:
+                    await self._load(version)
+        if self.dirty:
+            self._build()
+        return self.snapshot
+
+    def _apply(self, doc: Dict[str, Any]) -> None:
+        self.rows.pop(doc["id"], None)
+        if doc.get("_id") is not None:
+            self.ids[doc["_id"]] = doc["id"]
+        if matches(doc, self.base_query):
+            self.rows[doc["id"]] = project(doc, self.projection)
+        self.dirty = True
+
+    def written(self, version: int, doc: Optional[Dict[str, Any]] = None, deleted_id: Optional[str] = None) -> None:
+        """Apply a write made on this worker that bumped the collection to `version`
+
+        Only when it directly follows the snapshot's version; otherwise the next
+        request sees the version gap and reloads.
+        """
+        self._changes += 1
+        if self.snapshot is None or self.version is None or version != self.version + 1:
+            return
+        if doc is None and deleted_id is None:
+            return
+        if doc is None:
+            self.rows.pop(deleted_id, None)
+            self.dirty = True
+        else:
+            self._apply(doc)
+        self.version = version
+        self.local_updates += 1
+
+    def changed(self, change: Dict[str, Any]) -> None:
+        """Apply a change-stream event (full_document="updateLookup") on this collection
+
+        Rows are patched now; the snapshot's version moves on once the version
+        bump that follows the write arrives through advance().
+        """
+        self._changes += 1
+        if self.snapshot is None:
+            return
+        operation = change.get("operationType")
+        doc = change.get("fullDocument")
+        if operation in ("insert", "update", "replace") and doc is not None:
+            self._apply(doc)
+        elif operation == "delete":
+            doc_id = self.ids.pop(change.get("documentKey", {}).get("_id"), None)
+            if doc_id is not None and self.rows.pop(doc_id, None) is not None:
+                self.dirty = True
+        else:
+            # drop, a lookup that found nothing, lost history: start over
+            self.version = None
+            return
+        self.stream_updates += 1
+
+    def advance(self, version: Optional[int]) -> None:
+        """The collection's version reached `version` and every write before it has been applied"""
+        if self.version is not None and version == self.version + 1:
+            self.version = version
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "rows": len(self.rows),
+            "version": self.version,
+            "reloads": self.reloads,
+            "local_updates": self.local_updates,
+            "stream_updates": self.stream_updates,
+            "build_ms": round(self.build_ms, 2),
+        }
@@ -0,0 +1,195 @@
+"""Cross-worker cache invalidation from MongoDB change streams.
+
+Every uvicorn worker runs one ChangeFeed. It watches the database's change
+stream for the given collections and calls `on_change(collection, event)`
+for each insert, update, replace, delete or drop. Updates carry the
+looked-up full document. A write made through another worker, or by a
+script or the mongo shell, therefore reaches this worker's in-process
+caches. Updates to `collection_versions` are delivered as well. Each
+version bump follows the write it records, so a consumer that has seen the
+bump has also seen the write.
+
+The resume token is saved to `change_stream_tokens` (at most every
+`token_save_interval` seconds and on shutdown) and the stream resumes after
+it on restart or reconnect. If the oplog no longer holds that position, the
+feed starts from now and reports an "invalidate" event for every collection.
+
+Standalone servers have no change streams. In "auto" mode the feed then
+falls back to polling `collection_versions` every `poll_interval` seconds.
+That catches writes made through the API on any worker, since those bump
+the versions, but not writes made around it. These are reported as
+`on_change(collection, None)`, without details.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+ChangeHandler = Callable[[str, Optional[Dict[str, Any]]], None]
+
+# Change streams need a replica set or sharded cluster
+UNSUPPORTED_CODES = {40573, 40324}
+# The resume token fell off the oplog (ChangeStreamHistoryLost, ChangeStreamFatalError)
+HISTORY_LOST_CODES = {286, 280}
+WATCHED_OPERATIONS = ["insert", "update", "replace", "delete", "drop"]
+MAX_BACKOFF = 30.0
+
+
+class ChangeStreamsUnavailable(Exception):
+    pass
+
+
+class ChangeFeed:
+    """Background consumer turning collection changes into local invalidations"""
+
+    def __init__(self, db, versions, collections: List[str], on_change: ChangeHandler,
+                 mode: str = "auto", poll_interval: float = 2.0, token_save_interval: float = 5.0,
+                 consumer: str = "cache-invalidation"):
+        self.db = db
+        self.versions = versions
+        self.collections = list(collections)
+        self.on_change = on_change
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.token_save_interval = token_save_interval
+        self.consumer = consumer
+        self.tokens = db.change_stream_tokens
+        self.token: Optional[Dict[str, Any]] = None
+        self.saved_token: Optional[Dict[str, Any]] = None
+        self.active: Optional[str] = None
+        self.events: Dict[str, int] = {}
+        self.reconnects = 0
+        self._last_save = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.mode == "off" or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._save_token(force=True)
+
+    def _changed(self, collection: str, change: Optional[Dict[str, Any]] = None) -> None:
+        self.events[collection] = self.events.get(collection, 0) + 1
+        try:
+            self.on_change(collection, change)
+        except Exception:
+            logger.exception("Invalidation for %s failed", collection)
+
+    async def _run(self) -> None:
+        if self.mode in ("auto", "stream"):
+            try:
+                await self._watch()
+                return
+            except ChangeStreamsUnavailable as exc:
+                if self.mode == "stream":
+                    logger.error("Change streams unavailable, cache invalidation feed stopped: %s", exc)
+                    return
+                logger.warning("Change streams unavailable (%s), polling collection_versions every %.1fs",
+                               exc, self.poll_interval)
+        await self._poll()
+
+    # -- change stream --
+
+    async def _load_token(self) -> None:
+        try:
+            doc = await self.tokens.find_one({"_id": self.consumer})
+        except PyMongoError:
+            logger.exception("Could not load the change stream resume token")
+            return
+        if doc:
+            self.token = self.saved_token = doc.get("token")
+
+    async def _save_token(self, force: bool = False) -> None:
+        if self.token is None or self.token == self.saved_token:
+            return
+        if not force and time.monotonic() - self._last_save < self.token_save_interval:
+            return
+        self._last_save = time.monotonic()
+        try:
+            await self.tokens.update_one(
+                {"_id": self.consumer},
+                {"$set": {"token": self.token, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True,
+            )
+            self.saved_token = self.token
+        except PyMongoError:
+            logger.warning("Could not save the change stream resume token", exc_info=True)
+
+    async def _watch(self) -> None:
+        await self._load_token()
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": self.collections + ["collection_versions"]},
+            "operationType": {"$in": WATCHED_OPERATIONS},
+        }}]
+        backoff = 1.0
+        while True:
+            try:
+                async with self.db.watch(pipeline, full_document="updateLookup", resume_after=self.token) as stream:
+                    if self.active != "stream":
+                        logger.info("Cache invalidation feed watching %d collections%s", len(self.collections),
+                                    " (resumed)" if self.token else "")
+                    self.active = "stream"
+                    backoff = 1.0
+                    async for change in stream:
+                        self.token = stream.resume_token
+                        self._changed(change["ns"]["coll"], change)
+                        await self._save_token()
+            except (NotImplementedError, TypeError) as exc:  # test doubles such as mongomock have no watch()
+                raise ChangeStreamsUnavailable(str(exc) or "watch() not implemented")
+            except OperationFailure as exc:
+                if exc.code in UNSUPPORTED_CODES:
+                    raise ChangeStreamsUnavailable(exc.details.get("errmsg", str(exc)) if exc.details else str(exc))
+                if exc.code in HISTORY_LOST_CODES and self.token is not None:
+                    logger.warning("Resume token is no longer in the oplog, restarting the feed from now")
+                    self.token = None
+                    for collection in self.collections:
+                        self._changed(collection, {"operationType": "invalidate"})
+                    continue
+                logger.warning("Change stream failed (%s), reconnecting in %.0fs", exc, backoff)
+            except PyMongoError as exc:
+                logger.warning("Change stream interrupted (%s), reconnecting in %.0fs", exc, backoff)
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    # -- polling fallback --
+
+    async def _poll(self) -> None:
+        self.active = "poll"
+        seen: Optional[Dict[str, int]] = None
+        while True:
+            try:
+                state = await self.versions.get(self.collections)
+                current = {name: version for name, (version, _) in state.items()}
+                if seen is not None:
+                    for name, version in current.items():
+                        if version != seen.get(name):
+                            self._changed(name)
+                seen = current
+            except PyMongoError:
+                logger.warning("Polling collection_versions failed", exc_info=True)
+            await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "active": self.active,
+            "events": dict(self.events),
+            "reconnects": self.reconnects,
+            "resumable": self.token is not None,
+        }
@@ -0,0 +1,121 @@
+"""gzip / brotli response compression with a per-representation byte cache.
+
+The middleware sits inside ConditionalGetMiddleware. For a public GET, that
+middleware has already computed the strong ETag of the representation (path,
+query, collection versions and negotiated coding) and put it in
+`scope["state"]["etag"]`. The fully encoded response for that ETag is kept
+in a TTLCache: the next request for the same representation is answered
+from memory without running the route or compressing again, and an admin
+write changes the versions, hence the ETag, hence the cache key. The body
+stored under an ETag is never older than the versions it names: the read
+cache behind the routes is keyed on those same versions (see
+server.cached_read).
+
+Responses that are small, streamed, already encoded (the pre-gzipped
+sitemap) or of a non-text type are passed through untouched. Brotli is used
+when the `brotli` package is installed and the client prefers it.
+"""
+import gzip
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/xml", "text/", "application/x-ndjson", "application/javascript")
+
+
+def negotiate(accept_encoding: str, candidates: Optional[List[str]] = None) -> str:
+    """Pick "br", "gzip" (or one of `candidates`) or "" (identity) from an Accept-Encoding header"""
+    offered: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            offered[coding] = quality
+    wildcard = offered.get("*", 0.0)
+    if candidates is None:
+        candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_quality = "", 0.0
+    for coding in candidates:
+        quality = offered.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, coding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """ASGI middleware negotiating gzip/br and caching encoded bodies by ETag"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 cache: Optional[TTLCache] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        etag = scope.get("state", {}).get("etag") if scope["method"] == "GET" else None
+        key = ("responses", etag)
+        if etag is not None and self.cache is not None:
+            hit, cached = self.cache.get(key)
+            if hit:
+                status, headers, body = cached
+                await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or start_message is None:
+                await send(message)
+                return
+            headers = MutableHeaders(scope=start_message)
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            streaming = message.get("more_body", False)
+            if (streaming or "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            if coding and len(body) >= self.minimum_size:
+                body = compress(body, coding, self.gzip_level, self.brotli_quality)
+                headers["content-encoding"] = coding
+                headers["content-length"] = str(len(body))
+            if etag is not None and self.cache is not None and start_message["status"] == 200:
+                self.cache.set(key, (200, list(start_message["headers"]), body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
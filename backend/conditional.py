@@ -0,0 +1,196 @@
+"""HTTP conditional requests (ETag / Last-Modified / 304) for public GET routes.
+
+Every admin write bumps a per-collection version document in MongoDB, so
+all workers agree on the current version. The middleware looks up the
+versions of the collections behind a route and answers 304 before the route
+handler runs when the client's validators still match.
+
+CachedCollectionVersions keeps those versions in process for `ttl` seconds,
+so a warm public GET needs no MongoDB round-trip at all. A write on this
+worker is visible at once. A write on another worker is visible after at
+most `ttl` seconds, or as soon as its version bump arrives through the
+change stream (see changefeed.py).
+"""
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from starlette.datastructures import Headers, MutableHeaders
+
+from compression import negotiate
+
+logger = logging.getLogger(__name__)
+
+VersionState = Dict[str, Tuple[int, Optional[datetime]]]
+
+
+class CollectionVersions:
+    """Monotonic change counters per collection, stored in `collection_versions`"""
+
+    def __init__(self, db):
+        self.collection = db.collection_versions
+
+    async def bump(self, name: str) -> int:
+        doc = await self.collection.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["version"]
+
+    async def get(self, names: List[str]) -> VersionState:
+        state: VersionState = {name: (0, None) for name in names}
+        async for doc in self.collection.find({"_id": {"$in": names}}):
+            updated_at = doc.get("updated_at")
+            if updated_at is not None and updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            state[doc["_id"]] = (doc.get("version", 0), updated_at)
+        return state
+
+
+class LocalCollectionVersions:
+    """In-process counters with the CollectionVersions interface, for the memory repository"""
+
+    def __init__(self):
+        self.state: VersionState = {}
+
+    async def bump(self, name: str) -> int:
+        version = self.state.get(name, (0, None))[0] + 1
+        self.state[name] = (version, datetime.now(timezone.utc))
+        return version
+
+    async def get(self, names: List[str]) -> VersionState:
+        return {name: self.state.get(name, (0, None)) for name in names}
+
+
+class CachedCollectionVersions:
+    """CollectionVersions read through an in-process copy that is at most `ttl` seconds old"""
+
+    def __init__(self, versions: CollectionVersions, ttl: float = 1.0):
+        self.versions = versions
+        self.ttl = ttl
+        # name -> (version, updated_at, monotonic time it was read)
+        self.state: Dict[str, Tuple[int, Optional[datetime], float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def bump(self, name: str) -> int:
+        version = await self.versions.bump(name)
+        # Re-read on the next get() so updated_at matches what other workers see
+        self.state.pop(name, None)
+        return version
+
+    async def get(self, names: List[str]) -> VersionState:
+        now = time.monotonic()
+        stale = [name for name in names if name not in self.state or now - self.state[name][2] > self.ttl]
+        if stale:
+            self.misses += 1
+            for name, (version, updated_at) in (await self.versions.get(stale)).items():
+                self.observe(name, version, updated_at, now)
+        else:
+            self.hits += 1
+        return {name: self.state[name][:2] for name in names}
+
+    def observe(self, name: str, version: int, updated_at: Optional[datetime], now: Optional[float] = None) -> None:
+        """Record a version read from MongoDB or delivered by the change stream; versions never go back"""
+        if updated_at is not None and updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        current = self.state.get(name)
+        if current is not None and current[0] > version:
+            return
+        self.state[name] = (version, updated_at, time.monotonic() if now is None else now)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ttl_seconds": self.ttl, "collections": len(self.state), "hits": self.hits, "misses": self.misses}
+
+
+def make_etag(path: str, query_string: bytes, state: VersionState, coding: str = "") -> str:
+    """Strong validator; `coding` keeps br, gzip and identity representations apart"""
+    versions = ",".join(f"{name}:{state[name][0]}" for name in sorted(state))
+    digest = hashlib.sha1(f"{path}?{query_string.decode('latin-1')}|{versions}|{coding}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def is_not_modified(headers: Headers, etag: str, last_modified: Optional[datetime]) -> bool:
+    """RFC 9110 evaluation: If-None-Match wins over If-Modified-Since"""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in candidates
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+class ConditionalGetMiddleware:
+    """ASGI middleware adding validators to public GETs and answering 304s"""
+
+    def __init__(self, app, versions: CollectionVersions, routes: Dict[str, List[str]]):
+        self.app = app
+        self.versions = versions
+        # Longest prefix first so nested routes win over their parents
+        self.routes = sorted(routes.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def match(self, path: str) -> Optional[List[str]]:
+        for prefix, collections in self.routes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return collections
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        collections = self.match(scope["path"])
+        if collections is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            state = await self.versions.get(collections)
+        except Exception:
+            logger.exception("Could not load collection versions, skipping validators")
+            await self.app(scope, receive, send)
+            return
+
+        # Handlers that need the same versions (e.g. /api/bootstrap) reuse them
+        scope.setdefault("state", {})["collection_versions"] = state
+
+        request_headers = Headers(scope=scope)
+        coding = negotiate(request_headers.get("accept-encoding", ""))
+        etag = make_etag(scope["path"], scope.get("query_string", b""), state, coding)
+        # CompressionMiddleware keys its encoded-body cache on this ETag
+        scope["state"]["etag"] = etag
+        stamps = [updated_at for _, updated_at in state.values() if updated_at is not None]
+        last_modified = max(stamps) if stamps else None
+        validators = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+        if last_modified is not None:
+            validators.append((b"last-modified", format_datetime(last_modified, usegmt=True).encode()))
+
+        if is_not_modified(request_headers, etag, last_modified):
+            # The ETag depends on the negotiated coding, so caches must key the 304 on it too
+            headers = validators + [(b"vary", b"Accept-Encoding")]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                for key, value in validators:
+                    headers[key.decode()] = value.decode()
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
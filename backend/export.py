@@ -0,0 +1,77 @@
+"""Streaming NDJSON / CSV export of admin collections.
+
+Rows are pulled from the repository (for MongoDB, a cursor read batch by
+batch) and written to the response as they arrive, so memory stays flat
+regardless of collection size and the first bytes leave before the last
+document is read.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, List
+
+from starlette.responses import StreamingResponse
+
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+# Flush to the socket once this many bytes are buffered
+FLUSH_BYTES = 64 * 1024
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    return value
+
+
+async def iter_ndjson(cursor) -> AsyncIterator[bytes]:
+    chunk = []
+    size = 0
+    async for doc in cursor:
+        line = json.dumps(doc, default=_json_default, ensure_ascii=False) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield "".join(chunk).encode()
+            chunk = []
+            size = 0
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+async def iter_csv(cursor, columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for doc in cursor:
+        writer.writerow([_csv_cell(doc.get(column)) for column in columns])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(rows, fmt: str, columns: List[str], name: str) -> StreamingResponse:
+    """Wrap an async iterator of documents (Repository.iterate) in a streaming NDJSON or CSV download"""
+    body = iter_csv(rows, columns) if fmt == "csv" else iter_ndjson(rows)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}-{stamp}.{fmt}"'},
+    )
@@ -0,0 +1,98 @@
+"""Single-round-trip `$facet` aggregation for the catalog filter sidebars.
+
+compute_facets() produces the same shape in Python for the in-memory
+repository (see repository.py).
+"""
+from typing import Any, Dict, List
+
+DR_BOUNDARIES = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 101]
+PRICE_BUCKETS = 5
+
+
+def facet_pipeline(query: Dict[str, Any], category_field: str, price_field: str) -> List[Dict[str, Any]]:
+    """Counts per category, DR buckets, price buckets and total for one filter set"""
+    return [
+        {"$match": query},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "categories": [
+                {"$group": {"_id": f"${category_field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ],
+            "dr": [
+                {"$bucket": {
+                    "groupBy": "$dr",
+                    "boundaries": DR_BOUNDARIES,
+                    "default": "other",
+                    "output": {"count": {"$sum": 1}},
+                }},
+            ],
+            "price": [
+                {"$bucketAuto": {"groupBy": f"${price_field}", "buckets": PRICE_BUCKETS}},
+            ],
+        }},
+    ]
+
+
+def shape_facets(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn the raw `$facet` document into the API response shape"""
+    dr_buckets = []
+    for bucket in result.get("dr", []):
+        if bucket["_id"] == "other":
+            continue
+        upper = DR_BOUNDARIES[DR_BOUNDARIES.index(bucket["_id"]) + 1]
+        dr_buckets.append({"min": bucket["_id"], "max": upper - 1, "count": bucket["count"]})
+    total = result.get("total", [])
+    return {
+        "total": total[0]["count"] if total else 0,
+        "categories": [
+            {"value": bucket["_id"], "count": bucket["count"]}
+            for bucket in result.get("categories", []) if bucket["_id"] is not None
+        ],
+        "dr": dr_buckets,
+        "price": [
+            {"min": bucket["_id"]["min"], "max": bucket["_id"]["max"], "count": bucket["count"]}
+            for bucket in result.get("price", [])
+        ],
+    }
+
+
+async def fetch_facets(collection, query: Dict[str, Any], category_field: str, price_field: str) -> Dict[str, Any]:
+    results = await collection.aggregate(facet_pipeline(query, category_field, price_field)).to_list(1)
+    return shape_facets(results[0] if results else {})
+
+
+def _bucket_auto(values: List[Any], buckets: int) -> List[Dict[str, Any]]:
+    """`$bucketAuto` without granularity: about equal counts, equal values kept together"""
+    values = sorted(value for value in values if value is not None)
+    result = []
+    start = 0
+    while start < len(values) and len(result) < buckets:
+        size = max(1, round((len(values) - start) / (buckets - len(result))))
+        end = min(start + size, len(values))
+        while end < len(values) and values[end] == values[end - 1]:
+            end += 1
+        result.append({"_id": {"min": values[start], "max": values[end] if end < len(values) else values[-1]},
+                       "count": end - start})
+        start = end
+    return result
+
+
+def compute_facets(docs: List[Dict[str, Any]], category_field: str, price_field: str) -> Dict[str, Any]:
+    """Same result as fetch_facets, computed in Python over already-filtered documents"""
+    categories: Dict[Any, int] = {}
+    dr: Dict[int, int] = {}
+    for doc in docs:
+        category = doc.get(category_field)
+        categories[category] = categories.get(category, 0) + 1
+        value = doc.get("dr")
+        if isinstance(value, (int, float)) and DR_BOUNDARIES[0] <= value < DR_BOUNDARIES[-1]:
+            lower = max(bound for bound in DR_BOUNDARIES if bound <= value)
+            dr[lower] = dr.get(lower, 0) + 1
+    return shape_facets({
+        "total": [{"count": len(docs)}] if docs else [],
+        "categories": [{"_id": value, "count": count} for value, count in
+                       sorted(categories.items(), key=lambda item: (-item[1], str(item[0])))],
+        "dr": [{"_id": lower, "count": dr[lower]} for lower in sorted(dr)],
+        "price": _bucket_auto([doc.get(price_field) for doc in docs], PRICE_BUCKETS),
+    })
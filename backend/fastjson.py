@@ -0,0 +1,97 @@
+"""Opt-in orjson response path for trusted, projected MongoDB reads.
+
+A route declaring `response_model=List[Model]` pays for FastAPI validating
+every document into a model instance, dumping it back to a dict and encoding
+that with the stdlib json module. For documents this application wrote
+itself that round-trip only re-establishes what is already true, so routes
+can opt into `fast_json(Model, docs)` instead: a precomputed ModelShape puts
+each document's keys in model order, fills defaults, drops unknown keys and
+coerces int/float/bool scalars, and orjson encodes the result.
+
+The output matches the response_model path byte for byte for such documents
+(tests/test_fastjson.py checks this). Known differences are limited to inputs
+the app never writes: timestamps stored as strings, floats that Python
+prints in exponent form, and NaN. It is off by default: opted-in routes go
+through response_model validation unless FAST_JSON=1.
+"""
+import os
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+FAST_JSON_ENABLED = os.environ.get("FAST_JSON", "0") in ("1", "true", "yes")
+
+_MISSING = object()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def _scalar_cast(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """The coercion pydantic's lax mode would apply to a plain scalar field"""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else None
+    return annotation if annotation in (int, float, bool) else None
+
+
+class ModelShape:
+    """Reshapes raw documents into a model's serialized form without validating them"""
+
+    def __init__(self, model: type):
+        self.fields: List[Tuple[str, Any, Optional[Callable[[], Any]], Optional[type]]] = []
+        for name, info in model.model_fields.items():
+            if isinstance(info.annotation, type) and issubclass(info.annotation, BaseModel):
+                raise TypeError(f"{model.__name__}.{name}: nested models are not supported by ModelShape")
+            default = _MISSING if info.is_required() or info.default_factory else info.default
+            self.fields.append((name, default, info.default_factory, _scalar_cast(info.annotation)))
+        self.names = tuple(name for name, *_ in self.fields)
+        self.casts = [(name, cast) for name, _, _, cast in self.fields if cast is not None]
+
+    def __call__(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        if tuple(doc) == self.names:
+            # Written from this model's model_dump(): only scalar types may need fixing
+            for name, cast in self.casts:
+                value = doc[name]
+                if type(value) is not cast and type(value) in (int, float, bool):
+                    doc[name] = cast(value)
+            return doc
+        shaped = {}
+        for name, default, factory, cast in self.fields:
+            value = doc.get(name, _MISSING)
+            if value is _MISSING:
+                if factory is not None:
+                    value = factory()
+                elif default is _MISSING:
+                    continue
+                else:
+                    value = default
+            elif cast is not None and type(value) in (int, float, bool) and type(value) is not cast:
+                value = cast(value)
+            shaped[name] = value
+        return shaped
+
+
+_shapes: Dict[type, ModelShape] = {}
+
+
+def shape_for(model: type) -> ModelShape:
+    shape = _shapes.get(model)
+    if shape is None:
+        shape = _shapes[model] = ModelShape(model)
+    return shape
+
+
+def fast_json(model: type, docs: Iterable[Dict[str, Any]]) -> Any:
+    """Return `docs` as a FastJSONResponse shaped like List[model], or unchanged if disabled"""
+    if not FAST_JSON_ENABLED:
+        return docs
+    shape = shape_for(model)
+    return FastJSONResponse([shape(doc) for doc in docs])
@@ -0,0 +1,184 @@
+"""Chunked, streaming bulk import of domain listings from CSV or NDJSON uploads.
+
+The request body is spooled to a temp file (in memory up to
+IMPORT_SPOOL_MAX_MEMORY, on disk beyond), then read row by row, validated
+in chunks of IMPORT_CHUNK_SIZE rows and written with one unordered
+bulk_write per chunk. Rows upsert on `domain_name`, so re-importing a drop
+updates existing listings instead of duplicating them. Each chunk's report
+lists, by source line number, the rows that failed to decode or validate
+and the rows whose write was rejected.
+"""
+import codecs
+import csv
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '1000'))
+IMPORT_SPOOL_MAX_MEMORY = int(os.environ.get('IMPORT_SPOOL_MAX_MEMORY', str(8 * 1024 * 1024)))
+# Cap on the deprecated JSON-array import, which is parsed whole in memory
+IMPORT_MAX_JSON_ROWS = int(os.environ.get('IMPORT_MAX_JSON_ROWS', '5000'))
+
+Row = Tuple[int, Any]
+
+
+def detect_format(content_type: Optional[str]) -> str:
+    content_type = (content_type or "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+        return "ndjson"
+    return "csv"
+
+
+async def spool_body(stream: AsyncIterator[bytes]):
+    """Copy a request body stream into a rewound spooled temp file"""
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_MEMORY)
+    async for chunk in stream:
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def _decoded_lines(binary_file, bad_lines: Dict[int, UnicodeDecodeError]) -> Iterator[str]:
+    """UTF-8 lines of `binary_file`; undecodable ones are recorded in `bad_lines` and yielded with U+FFFD"""
+    for line_no, raw in enumerate(binary_file, start=1):
+        if line_no == 1:
+            raw = raw.removeprefix(codecs.BOM_UTF8)
+        try:
+            yield raw.decode("utf-8")
+        except UnicodeDecodeError as e:
+            bad_lines[line_no] = e
+            yield raw.decode("utf-8", errors="replace")
+
+
+def iter_rows(binary_file, fmt: str) -> Iterator[Row]:
+    """Yield (line_number, raw_row) pairs without loading the whole file
+
+    Lines that are not valid UTF-8 yield their UnicodeDecodeError in place of
+    the row, so they are reported like any other invalid row.
+    """
+    bad_lines: Dict[int, UnicodeDecodeError] = {}
+    text = _decoded_lines(binary_file, bad_lines)
+    if fmt == "ndjson":
+        for line_no, line in enumerate(text, start=1):
+            if line_no in bad_lines:
+                yield line_no, bad_lines.pop(line_no)
+                continue
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, e
+        return
+    reader = csv.DictReader(text)
+    last_line = reader.line_num
+    for row in reader:
+        # A quoted CSV field may span lines: the row is bad if any of them is
+        decode_errors = [bad_lines.pop(n) for n in range(last_line + 1, reader.line_num + 1) if n in bad_lines]
+        last_line = reader.line_num
+        if decode_errors:
+            yield reader.line_num, decode_errors[0]
+            continue
+        # Blank CSV cells mean "not set": the stored value (or the default, for a new row) stays
+        yield reader.line_num, {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip()}
+
+
+Upsert = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+def _validate(model: Type[BaseModel], line_no: int, raw: Any) -> Tuple[Optional[Upsert], Optional[Dict[str, Any]]]:
+    """((supplied fields, defaults of the others), None) for a valid row, (None, error entry) otherwise"""
+    if isinstance(raw, UnicodeDecodeError):
+        return None, {"row": line_no, "errors": [f"invalid UTF-8: {raw}"]}
+    if isinstance(raw, Exception):
+        return None, {"row": line_no, "errors": [f"invalid JSON: {raw}"]}
+    if not isinstance(raw, dict):
+        return None, {"row": line_no, "errors": ["row is not an object"]}
+    try:
+        row = model(**raw)
+    except ValidationError as e:
+        messages = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+        return None, {"row": line_no, "errors": messages}
+    supplied = row.model_dump(exclude_unset=True)
+    defaults = {field: value for field, value in row.model_dump().items() if field not in supplied}
+    return (supplied, defaults), None
+
+
+async def _write_chunk(collection, docs: List[Tuple[int, Upsert]]) -> Dict[str, Any]:
+    """Upsert (line_number, (supplied, defaults)) pairs; write errors are reported against their source line
+
+    Only the columns a row supplies are `$set`, so re-importing a listing does
+    not reset its status or notes; defaults are written only when the row
+    creates the listing.
+    """
+    now = datetime.now(timezone.utc)
+    # Unordered upserts on the same key could race each other; last row wins
+    by_name = {supplied["domain_name"]: (line_no, supplied, defaults) for line_no, (supplied, defaults) in docs}
+    lines = [line_no for line_no, _, _ in by_name.values()]
+    ops = [
+        UpdateOne(
+            {"domain_name": supplied["domain_name"]},
+            {"$set": supplied, "$setOnInsert": {**defaults, "id": str(uuid.uuid4()), "created_at": now}},
+            upsert=True,
+        )
+        for _, supplied, defaults in by_name.values()
+    ]
+    try:
+        result = await collection.bulk_write(ops, ordered=False)
+        details = result.bulk_api_result
+        write_errors = []
+    except BulkWriteError as e:
+        details = e.details
+        write_errors = details.get("writeErrors", [])
+    return {
+        "inserted": details.get("nUpserted", 0),
+        "updated": details.get("nMatched", 0),
+        "duplicates_in_chunk": len(docs) - len(ops),
+        "write_errors": len(write_errors),
+        "errors": [{"row": lines[error["index"]], "errors": [error.get("errmsg", "write failed")]}
+                   for error in write_errors],
+    }
+
+
+async def import_rows(collection, rows: Iterator[Row], model: Type[BaseModel],
+                      chunk_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Validate and upsert rows chunk by chunk, yielding a progress report per chunk"""
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+    totals = {"rows": 0, "inserted": 0, "updated": 0, "invalid": 0, "write_errors": 0}
+    chunk_no = 0
+    rows = iter(rows)
+    while True:
+        docs, errors, count = [], [], 0
+        for line_no, raw in rows:
+            count += 1
+            doc, error = _validate(model, line_no, raw)
+            if error:
+                errors.append(error)
+            else:
+                docs.append((line_no, doc))
+            if count == chunk_size:
+                break
+        if count == 0:
+            break
+        chunk_no += 1
+        written = await _write_chunk(collection, docs) if docs else {
+            "inserted": 0, "updated": 0, "duplicates_in_chunk": 0, "write_errors": 0, "errors": []}
+        invalid = len(errors)
+        errors.extend(written.pop("errors"))
+        totals["rows"] += count
+        totals["inserted"] += written["inserted"]
+        totals["updated"] += written["updated"]
+        totals["invalid"] += invalid
+        totals["write_errors"] += written["write_errors"]
+        yield {"chunk": chunk_no, "rows": count, **written, "invalid": invalid,
+               "errors": sorted(errors, key=lambda error: error["row"])}
+        if count < chunk_size:
+            break
+    yield {"done": True, "chunks": chunk_no, **totals}
@@ -0,0 +1,261 @@
+"""Index bootstrap and query-plan verification for the DomainPBN collections.
+
+Run as a script to apply the indexes, or with --check to explain every
+route query and fail when MongoDB would answer it with a collection scan:
+
+    python indexes.py
+    python indexes.py --check
+
+A unique index cannot be built over duplicate values. ensure_indexes then
+leaves the collection as it is and logs the offending field; --dedupe keeps
+the newest document (by created_at) for each duplicated value and deletes
+the others before the indexes are applied:
+
+    python indexes.py --dedupe
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Index declarations per collection. Compound keys follow the filter + sort
+# shape of the routes in server.py (equality fields first, then sort field).
+INDEXES: Dict[str, List[IndexModel]] = {
+    "pbn_sites": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("dr", DESCENDING), ("id", DESCENDING)], name="status_dr_id"),
+        IndexModel([("status", ASCENDING), ("da", DESCENDING), ("id", DESCENDING)], name="status_da_id"),
+        IndexModel([("status", ASCENDING), ("traffic", DESCENDING), ("id", DESCENDING)], name="status_traffic_id"),
+        IndexModel([("status", ASCENDING), ("price_per_post", DESCENDING), ("id", DESCENDING)], name="status_price_per_post_id"),
+        IndexModel([("niche", ASCENDING)], name="niche"),
+    ],
+    "packages": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("is_active", ASCENDING), ("sort_order", ASCENDING)], name="is_active_sort_order"),
+    ],
+    "blog_posts": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+        IndexModel([("is_published", ASCENDING), ("published_at", DESCENDING)], name="is_published_published_at"),
+        # Blog content is mostly Indonesian, which MongoDB has no stemmer for
+        IndexModel(
+            [("title", TEXT), ("excerpt", TEXT), ("content", TEXT)],
+            name="text_search",
+            weights={"title": 10, "excerpt": 5, "content": 1},
+            default_language="none",
+        ),
+    ],
+    "faqs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("is_active", ASCENDING), ("sort_order", ASCENDING)], name="is_active_sort_order"),
+    ],
+    "pages": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+    ],
+    "domain_listings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # The importer upserts by domain_name
+        IndexModel([("domain_name", ASCENDING)], name="domain_name_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("dr", DESCENDING), ("id", DESCENDING)], name="status_dr_id"),
+        IndexModel([("status", ASCENDING), ("da", DESCENDING), ("id", DESCENDING)], name="status_da_id"),
+        IndexModel([("status", ASCENDING), ("price", DESCENDING), ("id", DESCENDING)], name="status_price_id"),
+        IndexModel([("status", ASCENDING), ("age", DESCENDING), ("id", DESCENDING)], name="status_age_id"),
+    ],
+    "settings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "page_contents": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("page_key", ASCENDING)], name="page_key"),
+    ],
+}
+
+# Indexes an earlier INDEXES declared and a later one replaced. ensure_indexes
+# drops them once their replacements exist, so writes stop maintaining them.
+SUPERSEDED_INDEXES: Dict[str, List[str]] = {
+    # (status, field) -> (status, field, id) for keyset pagination
+    "pbn_sites": ["status_dr", "status_da", "status_traffic", "status_price_per_post"],
+    "domain_listings": ["status_dr", "status_da", "status_price", "status_age",
+                        # domain_name -> domain_name_unique
+                        "domain_name"],
+}
+
+# Representative query for each route: (label, collection, filter, sort).
+# Admin listings that return the whole collection are left out on purpose,
+# a full scan is the correct plan for them.
+ROUTE_QUERIES: List[Tuple[str, str, Dict[str, Any], List[Tuple[str, int]]]] = [
+    ("GET /api/pbn", "pbn_sites", {"status": "active"}, [("dr", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/pbn?min_dr", "pbn_sites", {"status": "active", "dr": {"$gte": 50}}, [("dr", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/pbn?max_price", "pbn_sites", {"status": "active", "price_per_post": {"$lte": 150000}}, [("price_per_post", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/pbn?sort_by=da", "pbn_sites", {"status": "active"}, [("da", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/pbn?sort_by=traffic", "pbn_sites", {"status": "active"}, [("traffic", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/pbn?cursor", "pbn_sites", {"status": "active", "$or": [{"dr": {"$lt": 50}}, {"dr": 50, "id": {"$lt": "x"}}]}, [("dr", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/pbn?niche", "pbn_sites", {"status": "active", "niche": {"$in": ["Technology", "Finance"]}}, [("dr", DESCENDING), ("id", DESCENDING)]),
+    ("PUT /api/admin/pbn/{id}", "pbn_sites", {"id": "x"}, []),
+    ("GET /api/packages", "packages", {"is_active": True}, [("sort_order", ASCENDING)]),
+    ("PUT /api/admin/packages/{id}", "packages", {"id": "x"}, []),
+    ("GET /api/blog", "blog_posts", {"is_published": True}, [("published_at", DESCENDING)]),
+    ("GET /api/blog?search", "blog_posts", {"is_published": True, "$text": {"$search": "seo backlink"}}, []),
+    ("GET /api/blog/{slug}", "blog_posts", {"slug": "x", "is_published": True}, []),
+    ("PUT /api/admin/blog/{id}", "blog_posts", {"id": "x"}, []),
+    ("GET /api/faq", "faqs", {"is_active": True}, [("sort_order", ASCENDING)]),
+    ("PUT /api/admin/faq/{id}", "faqs", {"id": "x"}, []),
+    ("GET /api/pages/{slug}", "pages", {"slug": "x", "is_published": True}, []),
+    ("PUT /api/admin/pages/{id}", "pages", {"id": "x"}, []),
+    ("GET /api/domains", "domain_listings", {"status": "available"}, [("dr", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/domains?max_price", "domain_listings", {"status": "available", "price": {"$lte": 10000000}}, [("price", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/domains?sort_by=age", "domain_listings", {"status": "available"}, [("age", DESCENDING), ("id", DESCENDING)]),
+    ("GET /api/domains?cursor", "domain_listings", {"status": "available", "$or": [{"price": {"$lt": 5000000}}, {"price": 5000000, "id": {"$lt": "x"}}]}, [("price", DESCENDING), ("id", DESCENDING)]),
+    ("PUT /api/admin/domains/{id}", "domain_listings", {"id": "x"}, []),
+    ("GET /api/settings", "settings", {"id": "global_settings"}, []),
+    ("GET /api/page-content/{page_key}", "page_contents", {"page_key": "x"}, []),
+    ("PUT /api/admin/page-content/{id}", "page_contents", {"id": "x"}, []),
+]
+
+
+def unique_fields(models: List[IndexModel]) -> Dict[str, str]:
+    """Field -> index name for the single-key unique indexes among `models`"""
+    return {next(iter(model.document["key"])): model.document["name"]
+            for model in models if model.document.get("unique") and len(model.document["key"]) == 1}
+
+
+async def find_duplicates(collection, field: str, limit: int = 0) -> List[Dict[str, Any]]:
+    """Values of `field` held by more than one document, each with its `_id`s newest first"""
+    pipeline: List[Dict[str, Any]] = [
+        {"$sort": {"created_at": DESCENDING}},
+        {"$group": {"_id": f"${field}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    if limit:
+        pipeline.append({"$limit": limit})
+    return [group async for group in collection.aggregate(pipeline, allowDiskUse=True)]
+
+
+async def dedupe(db) -> Dict[str, int]:
+    """Delete all but the newest document for every duplicated unique-indexed value; deleted count per field"""
+    deleted = {}
+    for collection, models in INDEXES.items():
+        for field in unique_fields(models):
+            stale = [_id for group in await find_duplicates(db[collection], field) for _id in group["ids"][1:]]
+            if stale:
+                result = await db[collection].delete_many({"_id": {"$in": stale}})
+                deleted[f"{collection}.{field}"] = result.deleted_count
+    return deleted
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Create every declared index and drop the superseded ones; existing indexes are left untouched"""
+    applied = {}
+    for collection, models in INDEXES.items():
+        existing = await db[collection].index_information()
+        # Building a unique index over duplicates fails; keep the current
+        # indexes instead of dropping the ones it would replace
+        missing = [field for field, name in unique_fields(models).items() if name not in existing]
+        duplicated = [field for field in missing if await find_duplicates(db[collection], field, limit=1)]
+        if duplicated:
+            logger.error("Duplicate %s values in %s, unique index not created; run `python indexes.py --dedupe`",
+                         ", ".join(duplicated), collection)
+            continue
+        superseded = [name for name in SUPERSEDED_INDEXES.get(collection, []) if name in existing]
+        # MongoDB refuses a second index on the same keys, so one redeclared
+        # under a new name or options is dropped before its replacement is built
+        declared_keys = [list(model.document["key"].items()) for model in models]
+        for name in [name for name in superseded if existing[name]["key"] in declared_keys]:
+            await _drop_index(db, collection, name)
+            superseded.remove(name)
+        try:
+            applied[collection] = await db[collection].create_indexes(models)
+        except OperationFailure as e:
+            # A conflicting definition or duplicate data must not keep the API down
+            logger.error("Index creation failed on %s: %s", collection, e)
+            continue
+        for name in superseded:
+            await _drop_index(db, collection, name)
+    return applied
+
+
+async def _drop_index(db, collection: str, name: str) -> None:
+    try:
+        await db[collection].drop_index(name)
+        logger.info("Dropped superseded index %s.%s", collection, name)
+    except OperationFailure as e:
+        logger.error("Dropping index %s.%s failed: %s", collection, name, e)
+
+
+def plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Flatten the stage names of a winning plan tree"""
+    stages = [plan.get("stage", "")]
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    # Slot-based engine wraps the classic tree in queryPlan
+    if "queryPlan" in plan:
+        stages += plan_stages(plan["queryPlan"])
+    return stages
+
+
+async def verify_query_plans(db) -> List[Dict[str, Any]]:
+    """Explain every route query and report the stages of its winning plan"""
+    report = []
+    for label, collection, query, sort in ROUTE_QUERIES:
+        cursor = db[collection].find(query, {"_id": 0}).limit(1 if not sort else 10)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        report.append({
+            "route": label,
+            "collection": collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return report
+
+
+async def main(check: bool, dedupe_first: bool = False) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        if dedupe_first:
+            for field, count in (await dedupe(db)).items():
+                print(f"{field}: deleted {count} duplicates")
+        applied = await ensure_indexes(db)
+        for collection, names in applied.items():
+            print(f"{collection}: {', '.join(names)}")
+        if not check:
+            return 0
+
+        failures = 0
+        for row in await verify_query_plans(db):
+            mark = "❌" if row["collscan"] else "✅"
+            print(f"{mark} {row['route']} -> {' > '.join(row['stages'])}")
+            failures += row["collscan"]
+        if failures:
+            print(f"\n{failures} route queries fall back to a collection scan")
+            return 1
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply and verify MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="explain route queries and fail on COLLSCAN")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="delete all but the newest document per duplicated unique value first")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check, args.dedupe)))
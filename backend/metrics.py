@@ -0,0 +1,277 @@
+"""Request and MongoDB instrumentation rendered in the Prometheus text format.
+
+MetricsMiddleware times every HTTP request and labels it with the matched
+route template (`/api/blog/{slug}`, not the concrete URL) so the label set
+stays bounded. MongoCommandListener is registered on the Motor client and
+records per-collection command counts, durations and documents returned.
+Both write into one MetricsRegistry, which /metrics renders on demand.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+Labels = Tuple[Tuple[str, str], ...]
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(labels)} {value:g}"
+
+
+class Gauge(Counter):
+    def set(self, labels: Labels, value: float) -> None:
+        self.values[labels] = value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(labels)} {value:g}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        # labels -> (per-bucket counts, sum, count)
+        self.values: Dict[Labels, Tuple[List[int], float, int]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        counts, total, count = self.values.get(labels) or ([0] * len(self.buckets), 0.0, 0)
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(counts):
+            counts[index] += 1
+        self.values[labels] = (counts, total + value, count + 1)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}"
+            yield f"{self.name}_sum{_format_labels(labels)} {total:.6f}"
+            yield f"{self.name}_count{_format_labels(labels)} {count}"
+
+
+class MetricsRegistry:
+    """Holds every metric; safe to update from PyMongo's monitoring threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, object] = {}
+        self.collectors: List[Callable[["MetricsRegistry"], None]] = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self.metrics.setdefault(name, Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None]) -> None:
+        """Register a callback that refreshes gauges right before each scrape"""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector(self)
+        with self.lock:
+            lines = [line for metric in self.metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+def route_template(scope, routes: list) -> str:
+    """Path template of the route serving `scope`, e.g. `/api/blog/{slug}`"""
+    # The router stores the matched route in the (shared) scope
+    route = scope.get("route")
+    if route is None:
+        route = next((candidate for candidate in routes if candidate.matches(scope)[0] == Match.FULL), None)
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per method, route template and status"""
+
+    def __init__(self, app, registry: MetricsRegistry, routes: Optional[list] = None):
+        self.app = app
+        self.registry = registry
+        # Used to label responses short-circuited before routing (e.g. 304s)
+        self.routes = routes if routes is not None else []
+        self.latency = registry.histogram("http_request_duration_seconds", "HTTP request latency")
+        self.requests = registry.counter("http_requests_total", "HTTP requests served")
+        self.in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with self.registry.lock:
+            self.in_flight.inc((), 1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            template = route_template(scope, self.routes)
+            labels = (("method", scope["method"]), ("route", template), ("status", str(status)))
+            with self.registry.lock:
+                self.in_flight.inc((), -1)
+                self.latency.observe(labels[:2], elapsed)
+                self.requests.inc(labels)
+
+
+def _returned_documents(command: str, reply: dict) -> Optional[int]:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    # For writes `n` is the number of documents affected, not returned
+    if command == "count" and isinstance(reply.get("n"), int):
+        return reply["n"]
+    return None
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """PyMongo command listener aggregating per-collection command metrics"""
+
+    # Commands that are connection housekeeping, not application queries
+    IGNORED = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue",
+               "endSessions", "buildInfo", "killCursors", "getLastError"}
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.duration = registry.histogram("mongodb_command_duration_seconds", "MongoDB command latency")
+        self.commands = registry.counter("mongodb_commands_total", "MongoDB commands by outcome")
+        self.documents = registry.counter("mongodb_documents_returned_total", "Documents returned by MongoDB commands")
+        self._pending: Dict[Tuple[object, int], Tuple[str, str]] = {}
+
+    def started(self, event):
+        if event.command_name in self.IGNORED:
+            return
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        with self.registry.lock:
+            self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def _finish(self, event, outcome: str, reply: Optional[dict]) -> None:
+        with self.registry.lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is None:
+                return
+            labels = (("collection", pending[0]), ("command", pending[1]))
+            self.duration.observe(labels, event.duration_micros / 1_000_000)
+            self.commands.inc(labels + (("outcome", outcome),))
+            returned = _returned_documents(pending[1], reply) if reply is not None else None
+            if returned:
+                self.documents.inc(labels, returned)
+
+    def succeeded(self, event):
+        self._finish(event, "success", event.reply)
+
+    def failed(self, event):
+        self._finish(event, "failure", None)
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Connection pool listener measuring how long requests wait for a connection"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.wait = registry.histogram("mongodb_pool_wait_seconds", "Time spent waiting to check out a pooled connection")
+        self.checkouts = registry.counter("mongodb_pool_checkouts_total", "Connection checkouts by outcome")
+        self.open = registry.gauge("mongodb_pool_connections", "Open pooled connections")
+        self.checked_out = registry.gauge("mongodb_pool_checked_out", "Pooled connections currently in use")
+        # Check-out started and completed are emitted on the same thread
+        self._local = threading.local()
+
+    def _address(self, event) -> Labels:
+        return (("address", "%s:%s" % event.address),)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        labels = self._address(event)
+        with self.registry.lock:
+            if started is not None:
+                self.wait.observe(labels, time.perf_counter() - started)
+            self.checkouts.inc(labels + (("outcome", "success"),))
+            self.checked_out.inc(labels, 1)
+
+    def connection_check_out_failed(self, event):
+        started = getattr(self._local, "started", None)
+        labels = self._address(event)
+        with self.registry.lock:
+            if started is not None:
+                self.wait.observe(labels, time.perf_counter() - started)
+            self.checkouts.inc(labels + (("outcome", event.reason),))
+
+    def connection_checked_in(self, event):
+        with self.registry.lock:
+            self.checked_out.inc(self._address(event), -1)
+
+    def connection_created(self, event):
+        with self.registry.lock:
+            self.open.inc(self._address(event), 1)
+
+    def connection_closed(self, event):
+        with self.registry.lock:
+            self.open.inc(self._address(event), -1)
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
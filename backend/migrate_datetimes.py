@@ -0,0 +1,65 @@
+"""One-shot migration: convert ISO-string timestamps to native BSON dates.
+
+Documents written before server.py stored datetimes natively hold
+`created_at` / `updated_at` / `published_at` as ISO strings. This rewrites
+them in place and is safe to re-run (only string values are touched):
+
+    python migrate_datetimes.py
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+COLLECTIONS = ["pbn_sites", "packages", "blog_posts", "faqs", "pages",
+               "domain_listings", "settings", "page_contents"]
+FIELDS = ["created_at", "updated_at", "published_at"]
+BATCH_SIZE = 1000
+
+
+def parse(value: str):
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def migrate_collection(collection) -> int:
+    query = {"$or": [{field: {"$type": "string"}} for field in FIELDS]}
+    projection = {field: 1 for field in FIELDS}
+    converted = 0
+    ops = []
+    async for doc in collection.find(query, projection).batch_size(BATCH_SIZE):
+        changes = {}
+        for field in FIELDS:
+            if isinstance(doc.get(field), str):
+                try:
+                    changes[field] = parse(doc[field])
+                except ValueError:
+                    print(f"  ! {collection.name} {doc['_id']}: unparseable {field}={doc[field]!r}")
+        if changes:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": changes}))
+        if len(ops) == BATCH_SIZE:
+            converted += (await collection.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        converted += (await collection.bulk_write(ops, ordered=False)).modified_count
+    return converted
+
+
+async def migrate():
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    print("Converting ISO-string timestamps to BSON dates...")
+    for name in COLLECTIONS:
+        converted = await migrate_collection(db[name])
+        print(f"{name}: {converted} documents converted")
+    print("\n✅ Datetime migration completed!")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
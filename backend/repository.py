@@ -0,0 +1,417 @@
+"""Per-collection data access for the route handlers.
+
+Handlers talk to a Repository instead of a Motor collection, so the API can
+run against two engines with the same filter / sort / paginate semantics:
+
+* MotorRepository wraps a Motor collection; listing finds go through the
+  SlowQueryLog like before.
+* MemoryRepository keeps the documents in process, with hash indexes on the
+  leading equality field of every index declared in indexes.INDEXES (id,
+  status, slug, ...) and unique constraints taken from the same declarations.
+  It evaluates the query subset the API issues: equality, $eq/$ne/$gt/$gte/
+  $lt/$lte/$in/$nin, $or/$and and a weighted-term approximation of $text.
+
+REPOSITORY_BACKEND=memory (see server.py) serves everything from memory, which
+keeps database cost out of profiles and benchmarks and needs no MongoDB.
+Operations that are MongoDB-specific (bulk_write batches, streaming upsert
+imports, explain) stay on the Motor collection, exposed as `collection`, and
+are None for the memory engine.
+"""
+import copy
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import TEXT, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from facets import compute_facets, fetch_facets
+from indexes import INDEXES
+
+COLLECTIONS = ("pbn_sites", "packages", "blog_posts", "faqs", "pages", "domain_listings", "settings", "page_contents")
+
+Query = Dict[str, Any]
+Projection = Optional[Dict[str, Any]]
+Sort = Optional[List[Tuple[str, Any]]]
+
+
+class Repository(ABC):
+    """Operations the route handlers need from a collection; every engine implements all of them"""
+
+    name: str
+    collection: Any = None
+
+    @abstractmethod
+    async def find(self, query: Query, projection: Projection = None, sort: Sort = None,
+                   skip: int = 0, limit: int = 0) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def find_one(self, query: Query, projection: Projection = None) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def iterate(self, query: Query, projection: Projection = None, sort: Sort = None,
+                batch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def count(self, query: Query) -> int:
+        ...
+
+    @abstractmethod
+    async def distinct(self, field: str, query: Optional[Query] = None) -> List[Any]:
+        ...
+
+    @abstractmethod
+    async def facets(self, query: Query, category_field: str, price_field: str) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def insert_one(self, doc: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def insert_many(self, docs: Iterable[Dict[str, Any]]) -> int:
+        ...
+
+    @abstractmethod
+    async def update(self, query: Query, changes: Dict[str, Any], upsert: bool = False) -> Optional[Dict[str, Any]]:
+        """`$set` on the first matching document; returns it as updated (without _id) or None"""
+
+    @abstractmethod
+    async def delete(self, query: Query) -> bool:
+        ...
+
+
+class MotorRepository(Repository):
+    def __init__(self, collection, slow_queries=None):
+        self.name = collection.name
+        self.collection = collection
+        self.slow_queries = slow_queries
+
+    async def find(self, query, projection=None, sort=None, skip=0, limit=0):
+        if self.slow_queries is not None:
+            return await self.slow_queries.find(self.collection, query, projection, sort, skip, limit)
+        cursor = self.collection.find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(limit or None)
+
+    async def find_one(self, query, projection=None):
+        return await self.collection.find_one(query, projection)
+
+    async def iterate(self, query, projection=None, sort=None, batch_size=1000):
+        cursor = self.collection.find(query, projection).batch_size(batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        async for doc in cursor:
+            yield doc
+
+    async def count(self, query):
+        return await self.collection.count_documents(query)
+
+    async def distinct(self, field, query=None):
+        return await self.collection.distinct(field, query or {})
+
+    async def facets(self, query, category_field, price_field):
+        return await fetch_facets(self.collection, query, category_field, price_field)
+
+    async def insert_one(self, doc):
+        await self.collection.insert_one(doc)
+
+    async def insert_many(self, docs):
+        result = await self.collection.insert_many(list(docs))
+        return len(result.inserted_ids)
+
+    async def update(self, query, changes, upsert=False):
+        return await self.collection.find_one_and_update(
+            query, {"$set": changes}, projection={"_id": 0}, upsert=upsert, return_document=ReturnDocument.AFTER
+        )
+
+    async def delete(self, query):
+        result = await self.collection.delete_one(query)
+        return result.deleted_count > 0
+
+
+# ==================== IN-MEMORY ENGINE ====================
+
+_MISSING = object()
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _copy(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Detached copy, so callers mutating a result (fastjson does) cannot touch the store"""
+    return {key: copy.deepcopy(value) if isinstance(value, (dict, list)) else value for key, value in doc.items()}
+
+
+def _stored(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy as MongoDB would store it: datetimes keep millisecond precision"""
+    stored = _copy(doc)
+    for key, value in stored.items():
+        if isinstance(value, datetime):
+            stored[key] = value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return stored
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if value is None or value is _MISSING or operand is None:
+        return False
+    try:
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        # Mongo compares across BSON types by type order; the API never relies on that
+        return False
+    raise ValueError(f"unsupported query operator {operator}")
+
+
+def matches(doc: Dict[str, Any], query: Query) -> bool:
+    """Whether `doc` satisfies `query` (the operator subset listed in the module docstring)"""
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif field == "$and":
+            if not all(matches(doc, clause) for clause in condition):
+                return False
+        elif field == "$text":
+            continue  # applied by MemoryRepository through its text scores
+        elif isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+            value = doc.get(field)
+            if not all(_compare(value, operator, operand) for operator, operand in condition.items()):
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+def project(doc: Dict[str, Any], projection: Projection, score: Optional[float] = None) -> Dict[str, Any]:
+    """Apply an inclusion or exclusion projection ({"$meta": "textScore"} fields get `score`)"""
+    if not projection:
+        return _copy(doc)
+    meta = [field for field, spec in projection.items() if isinstance(spec, dict)]
+    flags = {field: spec for field, spec in projection.items() if not isinstance(spec, dict)}
+    included = [field for field, spec in flags.items() if spec and field != "_id"]
+    if included:
+        shaped = _copy({field: doc[field] for field in included if field in doc})
+        if flags.get("_id", 1) and "_id" in doc:
+            shaped["_id"] = doc["_id"]
+    else:
+        shaped = _copy({key: value for key, value in doc.items() if flags.get(key, 1)})
+    for field in meta:
+        shaped[field] = score if score is not None else 0.0
+    return shaped
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    # Missing / null sorts before any value, as in MongoDB
+    return (0, 0) if value is None or value is _MISSING else (1, value)
+
+
+class MemoryRepository(Repository):
+    """Indexed in-process collection with MongoDB query semantics for the API's query shapes"""
+
+    def __init__(self, name: str, indexes=None):
+        self.name = name
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self._next_key = 0
+        declared = INDEXES.get(name, []) if indexes is None else indexes
+        self.indexed: Dict[str, Dict[Any, Set[int]]] = {}
+        self.unique: Set[str] = set()
+        self.text_weights: Dict[str, int] = {}
+        for model in declared:
+            spec = model.document
+            keys = list(spec["key"].items())
+            if any(direction == TEXT for _, direction in keys):
+                self.text_weights = dict(spec.get("weights") or {field: 1 for field, _ in keys})
+                continue
+            field = keys[0][0]
+            self.indexed.setdefault(field, {})
+            if spec.get("unique") and len(keys) == 1:
+                self.unique.add(field)
+
+    # -- index maintenance --
+
+    def _add(self, key: int, doc: Dict[str, Any]) -> None:
+        for field in self.unique:
+            value = doc.get(field)
+            if value is not None and self.indexed[field].get(value):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {field}_unique "
+                                        f"dup key: {{ {field}: {value!r} }}", 11000,
+                                        {"keyPattern": {field: 1}, "keyValue": {field: value}})
+        self.docs[key] = doc
+        for field, index in self.indexed.items():
+            value = doc.get(field)
+            if isinstance(value, (dict, list)):
+                continue
+            index.setdefault(value, set()).add(key)
+
+    def _remove(self, key: int) -> Dict[str, Any]:
+        doc = self.docs.pop(key)
+        for field, index in self.indexed.items():
+            value = doc.get(field)
+            if isinstance(value, (dict, list)):
+                continue
+            keys = index.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+        return doc
+
+    def _candidates(self, query: Query) -> Iterable[int]:
+        """Keys that can match: intersect index hits for top-level equality / $in, else scan"""
+        best: Optional[Set[int]] = None
+        for field, condition in query.items():
+            index = self.indexed.get(field)
+            if index is None:
+                continue
+            if isinstance(condition, dict):
+                if set(condition) != {"$in"}:
+                    continue
+                hits = set().union(*(index.get(value, ()) for value in condition["$in"]))
+            else:
+                hits = index.get(condition, set())
+            best = hits if best is None else best & hits
+            if not best:
+                return ()
+        # Keys grow with insertion, so sorting keeps natural order across updates
+        return sorted(best if best is not None else self.docs)
+
+    def _text_score(self, doc: Dict[str, Any], terms: List[str]) -> float:
+        score = 0.0
+        for field, weight in self.text_weights.items():
+            value = doc.get(field)
+            if isinstance(value, str):
+                words = _WORD.findall(value.lower())
+                score += weight * sum(words.count(term) for term in terms)
+        return score
+
+    def _select(self, query: Query) -> List[Tuple[Dict[str, Any], Optional[float]]]:
+        text = query.get("$text")
+        terms = _WORD.findall(text["$search"].lower()) if text else []
+        selected = []
+        for key in self._candidates(query):
+            doc = self.docs[key]
+            if not matches(doc, query):
+                continue
+            score = None
+            if text:
+                score = self._text_score(doc, terms)
+                if score <= 0:
+                    continue
+            selected.append((doc, score))
+        return selected
+
+    # -- Repository API --
+
+    async def find(self, query, projection=None, sort=None, skip=0, limit=0):
+        selected = self._select(query)
+        # Stable multi-key sort: apply the keys from least to most significant
+        for field, direction in reversed(sort or []):
+            if isinstance(direction, dict):  # {"$meta": "textScore"}, always descending
+                selected.sort(key=lambda item: item[1] or 0.0, reverse=True)
+            else:
+                selected.sort(key=lambda item: _sort_key(item[0].get(field, _MISSING)), reverse=direction < 0)
+        end = skip + limit if limit else None
+        return [project(doc, projection, score) for doc, score in selected[skip:end]]
+
+    async def find_one(self, query, projection=None):
+        docs = await self.find(query, projection, limit=1)
+        return docs[0] if docs else None
+
+    async def iterate(self, query, projection=None, sort=None, batch_size=1000):
+        for doc in await self.find(query, projection, sort):
+            yield doc
+
+    async def count(self, query):
+        return len(self._select(query))
+
+    async def distinct(self, field, query=None):
+        values = []
+        for doc, _ in self._select(query or {}):
+            value = doc.get(field)
+            if value is not None and value not in values:
+                values.append(value)
+        return values
+
+    async def facets(self, query, category_field, price_field):
+        return compute_facets([doc for doc, _ in self._select(query)], category_field, price_field)
+
+    async def insert_one(self, doc):
+        self._add(self._next_key, _stored(doc))
+        self._next_key += 1
+
+    async def insert_many(self, docs):
+        inserted = 0
+        for doc in docs:
+            await self.insert_one(doc)
+            inserted += 1
+        return inserted
+
+    async def update(self, query, changes, upsert=False):
+        keys = [key for key in self._candidates(query) if matches(self.docs[key], query)]
+        if not keys:
+            if not upsert:
+                return None
+            seed = {field: value for field, value in query.items() if not field.startswith("$")
+                    and not isinstance(value, dict)}
+            await self.insert_one({**seed, **changes})
+            return project(self.docs[self._next_key - 1], {"_id": 0})
+        key = keys[0]
+        before = self._remove(key)
+        updated = {**before, **_stored(changes)}
+        try:
+            self._add(key, updated)
+        except DuplicateKeyError:
+            self._add(key, before)
+            raise
+        return project(updated, {"_id": 0})
+
+    async def delete(self, query):
+        for key in self._candidates(query):
+            if matches(self.docs[key], query):
+                self._remove(key)
+                return True
+        return False
+
+
+class Repositories:
+    """One repository per API collection, reachable as attributes or by name"""
+
+    def __init__(self, factory: Callable[[str], Repository]):
+        for name in COLLECTIONS:
+            setattr(self, name, factory(name))
+
+    def __getitem__(self, name: str) -> Repository:
+        if name not in COLLECTIONS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+
+def motor_repositories(db, slow_queries=None) -> Repositories:
+    return Repositories(lambda name: MotorRepository(db[name], slow_queries))
+
+
+def memory_repositories() -> Repositories:
+    return Repositories(MemoryRepository)
@@ -39,7 +39,7 @@ async def seed_data():
             "price_per_post": 150000,
             "status": "active",
             "notes": "High authority tech blog",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -54,7 +54,7 @@ async def seed_data():
             "price_per_post": 120000,
             "status": "active",
             "notes": "Health niche blog",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -69,7 +69,7 @@ async def seed_data():
             "price_per_post": 200000,
             "status": "active",
             "notes": "Premium finance authority",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -84,7 +84,7 @@ async def seed_data():
             "price_per_post": 100000,
             "status": "active",
             "notes": "Travel blog",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -99,7 +99,7 @@ async def seed_data():
             "price_per_post": 140000,
             "status": "active",
             "notes": "Business authority site",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -114,7 +114,7 @@ async def seed_data():
             "price_per_post": 110000,
             "status": "active",
             "notes": "Lifestyle blog",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -129,7 +129,7 @@ async def seed_data():
             "price_per_post": 170000,
             "status": "active",
             "notes": "Education authority",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -144,7 +144,7 @@ async def seed_data():
             "price_per_post": 130000,
             "status": "active",
             "notes": "Real estate blog",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -159,7 +159,7 @@ async def seed_data():
             "price_per_post": 145000,
             "status": "active",
             "notes": "Marketing niche",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -174,7 +174,7 @@ async def seed_data():
             "price_per_post": 180000,
             "status": "active",
             "notes": "E-commerce authority",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     await db.pbn_sites.insert_many(pbn_sites)
@@ -192,7 +192,7 @@ async def seed_data():
             "is_popular": False,
             "sort_order": 1,
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -204,7 +204,7 @@ async def seed_data():
             "is_popular": True,
             "sort_order": 2,
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -216,7 +216,7 @@ async def seed_data():
             "is_popular": False,
             "sort_order": 3,
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     await db.packages.insert_many(packages)
@@ -234,8 +234,8 @@ async def seed_data():
             "meta_title": "Apa Itu PBN? Panduan Lengkap Private Blog Network untuk SEO 2024",
             "meta_description": "Pelajari apa itu PBN (Private Blog Network), mengapa efektif untuk SEO, dan bagaimana menggunakan PBN dengan aman untuk meningkatkan ranking website Anda.",
             "is_published": True,
-            "published_at": datetime.now(timezone.utc).isoformat(),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "published_at": datetime.now(timezone.utc),
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -247,8 +247,8 @@ async def seed_data():
             "meta_title": "5 Kesalahan Fatal Membeli Backlink PBN - Hindari Penalty Google!",
             "meta_description": "Jangan sampai salah beli backlink PBN! Pelajari 5 kesalahan fatal yang sering dilakukan dan cara menghindari penalty dari Google.",
             "is_published": True,
-            "published_at": datetime.now(timezone.utc).isoformat(),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "published_at": datetime.now(timezone.utc),
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -260,8 +260,8 @@ async def seed_data():
             "meta_title": "Berapa Lama Hasil Backlink PBN Terlihat? Timeline Realistis 2024",
             "meta_description": "Kapan ranking website naik setelah beli backlink PBN? Pelajari timeline realistis dan faktor yang mempengaruhi kecepatan hasil backlink PBN.",
             "is_published": True,
-            "published_at": datetime.now(timezone.utc).isoformat(),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "published_at": datetime.now(timezone.utc),
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     await db.blog_posts.insert_many(blog_posts)
@@ -275,7 +275,7 @@ async def seed_data():
             "answer": "Ya, sangat aman selama menggunakan PBN berkualitas. Semua domain kami memiliki metrics bagus, spam score rendah, dan history bersih. Kami juga menggunakan drip posting untuk distribusi backlink yang natural.",
             "sort_order": 1,
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -283,7 +283,7 @@ async def seed_data():
             "answer": "Setelah pembayaran dikonfirmasi, kami akan mulai posting dalam 1-3 hari kerja. Untuk hasil optimal, kami merekomendasikan drip posting 2-3 artikel per minggu untuk distribusi yang natural.",
             "sort_order": 2,
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -291,7 +291,7 @@ async def seed_data():
             "answer": "Ya, Anda bisa request niche tertentu atau memilih dari list PBN kami. Kami punya PBN di berbagai niche: teknologi, finance, health, lifestyle, dan lainnya.",
             "sort_order": 3,
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -299,7 +299,7 @@ async def seed_data():
             "answer": "Kami menggunakan kombinasi AI dan human editing untuk menghasilkan artikel berkualitas tinggi yang readable, natural, dan SEO-friendly. Semua artikel lolos plagiarism check.",
             "sort_order": 4,
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -307,7 +307,7 @@ async def seed_data():
             "answer": "Setelah proses selesai, kami akan mengirimkan laporan lengkap berisi URL artikel, anchor text, dan metrics PBN yang digunakan melalui email atau Telegram.",
             "sort_order": 5,
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     await db.faqs.insert_many(faqs)
@@ -321,7 +321,7 @@ async def seed_data():
             "slug": "about",
             "content": "<h2>Tentang DomainPBN</h2><p>DomainPBN adalah penyedia layanan backlink PBN premium terpercaya di Indonesia. Kami memahami betapa pentingnya backlink berkualitas untuk kesuksesan SEO website Anda.</p><h3>Mengapa Memilih DomainPBN?</h3><ul><li><strong>Domain Berkualitas:</strong> Semua PBN kami menggunakan aged domain dengan authority tinggi, history bersih, dan metrics terbukti.</li><li><strong>Harga Terjangkau:</strong> Kami percaya backlink berkualitas tidak harus mahal. Paket kami dirancang untuk semua budget.</li><li><strong>Transparansi Penuh:</strong> Anda bisa melihat metrics semua PBN kami sebelum order. No hidden domain.</li><li><strong>Support Responsif:</strong> Tim kami siap membantu Anda via WhatsApp atau Telegram untuk konsultasi strategi backlink.</li></ul><h3>Pengalaman Kami</h3><p>Sejak 2020, kami telah membantu ratusan website mencapai ranking page 1 Google. Dari bisnis lokal hingga e-commerce besar, DomainPBN adalah partner SEO terpercaya mereka.</p><h3>Komitmen Kami</h3><p>Kami berkomitmen memberikan layanan backlink PBN yang:</p><ul><li>Aman dan tidak berisiko penalty</li><li>Natural dan contextual</li><li>Memberikan hasil nyata</li><li>Dengan harga yang kompetitif</li></ul><p>Mulai tingkatkan ranking website Anda bersama DomainPBN hari ini!</p>",
             "is_published": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -329,7 +329,7 @@ async def seed_data():
             "slug": "tos",
             "content": "<h2>Syarat dan Ketentuan Layanan DomainPBN</h2><p>Dengan menggunakan layanan DomainPBN, Anda menyetujui syarat dan ketentuan berikut:</p><h3>1. Layanan</h3><ul><li>DomainPBN menyediakan layanan backlink dari Private Blog Network</li><li>Semua backlink bersifat permanent (tidak dihapus)</li><li>Waktu pengerjaan 1-7 hari kerja tergantung paket dan drip posting</li></ul><h3>2. Pembayaran</h3><ul><li>Pembayaran dilakukan sebelum proses pengerjaan dimulai</li><li>Metode pembayaran: Transfer Bank, E-wallet, atau Cryptocurrency</li><li>Harga dapat berubah sewaktu-waktu tanpa pemberitahuan sebelumnya</li></ul><h3>3. Kebijakan Refund</h3><ul><li>Refund hanya diberikan jika kami tidak dapat memenuhi order dalam 14 hari kerja</li><li>Tidak ada refund setelah backlink dipublish</li><li>Kami tidak bertanggung jawab atas hasil ranking yang tidak sesuai ekspektasi</li></ul><h3>4. Konten</h3><ul><li>Klien bertanggung jawab atas URL dan anchor text yang diberikan</li><li>Kami berhak menolak URL atau konten yang melanggar hukum, spam, atau adult content</li><li>Artikel backlink ditulis oleh tim kami dan tidak dapat dikustomisasi 100%</li></ul><h3>5. Penggunaan Wajar</h3><ul><li>Klien tidak diperbolehkan menyalahgunakan layanan untuk spam atau black hat SEO</li><li>Kami berhak membatalkan order yang mencurigakan tanpa refund</li></ul><h3>6. Garansi dan Disclaimer</h3><ul><li>Kami menjamin backlink permanent dan metrics PBN sesuai yang tertera</li><li>Kami tidak menjamin ranking atau traffic website klien</li><li>SEO adalah proses kompleks yang dipengaruhi banyak faktor</li></ul><h3>7. Perubahan Syarat</h3><p>DomainPBN berhak mengubah syarat dan ketentuan ini kapan saja. Perubahan akan efektif segera setelah dipublikasikan di website.</p><p>Jika Anda tidak setuju dengan syarat ini, mohon jangan menggunakan layanan kami.</p>",
             "is_published": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -337,7 +337,7 @@ async def seed_data():
             "slug": "privacy",
             "content": "<h2>Kebijakan Privasi DomainPBN</h2><p>DomainPBN menghormati privasi Anda. Kebijakan ini menjelaskan bagaimana kami mengumpulkan, menggunakan, dan melindungi informasi Anda.</p><h3>Informasi Yang Kami Kumpulkan</h3><ul><li><strong>Informasi Kontak:</strong> Nama, email, nomor WhatsApp/Telegram</li><li><strong>Informasi Order:</strong> URL website, anchor text, keyword target</li><li><strong>Informasi Pembayaran:</strong> Nomor rekening, bukti transfer (kami tidak menyimpan data kartu kredit)</li></ul><h3>Bagaimana Kami Menggunakan Informasi</h3><ul><li>Memproses order dan memberikan layanan backlink</li><li>Mengirimkan update dan laporan order via email/WhatsApp</li><li>Meningkatkan layanan kami</li><li>Mengirim newsletter dan promosi (Anda bisa unsubscribe kapan saja)</li></ul><h3>Keamanan Data</h3><ul><li>Semua data disimpan dengan enkripsi</li><li>Hanya tim internal yang memiliki akses ke data klien</li><li>Kami tidak menjual atau membagikan data Anda ke pihak ketiga</li></ul><h3>Cookie dan Tracking</h3><ul><li>Website kami menggunakan cookie untuk meningkatkan pengalaman pengguna</li><li>Kami menggunakan Google Analytics untuk memahami traffic website</li><li>Anda dapat disable cookie di browser Anda</li></ul><h3>Hak Anda</h3><p>Anda memiliki hak untuk:</p><ul><li>Mengakses data pribadi yang kami simpan</li><li>Meminta penghapusan data Anda</li><li>Meminta koreksi data yang salah</li><li>Menolak marketing communication</li></ul><h3>Perubahan Kebijakan</h3><p>Kami dapat mengubah kebijakan privasi ini sewaktu-waktu. Perubahan akan dipublikasikan di halaman ini.</p><h3>Kontak</h3><p>Jika Anda punya pertanyaan tentang kebijakan privasi ini, silakan hubungi kami via WhatsApp atau email.</p>",
             "is_published": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     await db.pages.insert_many(pages)
@@ -357,7 +357,7 @@ async def seed_data():
             "twitter": "https://twitter.com/domainpbn",
             "facebook": "https://facebook.com/domainpbn"
         },
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "updated_at": datetime.now(timezone.utc)
     }
     await db.settings.insert_one(settings)
     print("Inserted settings")
@@ -379,7 +379,7 @@ async def seed_data():
             "registrar": "GoDaddy",
             "status": "available",
             "notes": "Clean tech blog with strong backlink profile",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -396,7 +396,7 @@ async def seed_data():
             "registrar": "Namecheap",
             "status": "available",
             "notes": "High authority health & wellness domain",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -413,7 +413,7 @@ async def seed_data():
             "registrar": "GoDaddy",
             "status": "available",
             "notes": "Premium finance domain with excellent metrics",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -430,7 +430,7 @@ async def seed_data():
             "registrar": "Namecheap",
             "status": "available",
             "notes": "Travel niche domain with global reach",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -447,7 +447,7 @@ async def seed_data():
             "registrar": "GoDaddy",
             "status": "available",
             "notes": "Business & marketing focused domain",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -464,7 +464,7 @@ async def seed_data():
             "registrar": "Namecheap",
             "status": "available",
             "notes": "E-commerce authority site with strong SEO",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     await db.domain_listings.insert_many(aged_domains)
@@ -46,7 +46,7 @@ async def seed_extended_data():
             "price_per_post": random.choice([100000, 120000, 140000, 150000, 170000, 180000, 200000]),
             "status": "active",
             "notes": f"{niche} authority site",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     
     await db.pbn_sites.insert_many(pbn_sites)
@@ -94,8 +94,8 @@ async def seed_extended_data():
             "meta_title": f"{title} | DomainPBN",
             "meta_description": f"Panduan lengkap {title}. Tips dan strategi SEO untuk meningkatkan ranking website Anda.",
             "is_published": True,
-            "published_at": (datetime.now(timezone.utc) - timedelta(days=i)).isoformat(),
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=i)).isoformat()
+            "published_at": datetime.now(timezone.utc) - timedelta(days=i),
+            "created_at": datetime.now(timezone.utc) - timedelta(days=i)
         })
     
     await db.blog_posts.insert_many(blog_posts)
@@ -129,7 +129,7 @@ async def seed_extended_data():
             "registrar": random.choice(["GoDaddy", "Namecheap", "Google Domains"]),
             "status": "available",
             "notes": f"Clean {keyword} domain with good metrics",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     
     await db.domain_listings.insert_many(domains)
@@ -146,7 +146,7 @@ async def seed_extended_data():
                 "title_highlight": "Harga Murah, Kualitas Tinggi",
                 "description": "Backlink Powerful, Ranking Naik, Budget Aman. Tingkatkan authority website Anda dengan PBN premium."
             },
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -156,7 +156,7 @@ async def seed_extended_data():
                 "title": "PBN Network Kami",
                 "description": "Transparansi penuh! Lihat metrics semua PBN kami sebelum order. Domain aged dengan authority tinggi dan spam score rendah."
             },
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -166,7 +166,7 @@ async def seed_extended_data():
                 "title": "Aged Domain Premium",
                 "description": "Domain expired & deleted berkualitas dengan authority tinggi. Perfect untuk PBN atau project baru Anda."
             },
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -176,7 +176,7 @@ async def seed_extended_data():
                 "title": "Blog SEO",
                 "description": "Tips, panduan, dan strategi SEO untuk memaksimalkan hasil backlink PBN Anda"
             },
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -186,7 +186,7 @@ async def seed_extended_data():
                 "title": "Paket Backlink Premium",
                 "description": "Pilih paket yang sesuai dengan budget dan kebutuhan SEO Anda. Harga transparan, kualitas terjamin."
             },
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -196,7 +196,7 @@ async def seed_extended_data():
                 "title": "Mengapa Pilih DomainPBN?",
                 "description": "Backlink berkualitas tinggi dengan harga yang terjangkau untuk semua ukuran bisnis"
             },
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -206,7 +206,7 @@ async def seed_extended_data():
                 "title": "Siap Tingkatkan Ranking Website Anda?",
                 "description": "Mulai bangun authority website Anda dengan backlink PBN premium hari ini. Konsultasi gratis dengan tim kami!"
             },
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         }
     ]
     
@@ -0,0 +1,146 @@
+"""Bulk-load synthetic DomainPBN data for staging and load tests.
+
+Generates N PBN sites, domains, blog posts and page contents with the
+distributions in synthetic.py (plus the fixed packages / FAQ / pages /
+settings) and writes every collection concurrently, each as a stream of
+batched `insert_many(ordered=False)` calls.
+
+By default rows are appended and existing documents are kept; the fixed
+content is only loaded into collections that are still empty. --drop
+(explicit, it deletes everything the run loads) drops and recreates the
+collections instead, and rebuilds their indexes once after the load, which
+is much cheaper than maintaining them during it.
+
+    python seed_synthetic.py --rows 100000 --drop
+    python seed_synthetic.py --pbn 50000 --domains 20000 --blog 5000
+
+The collection versions are bumped at the end so running API workers drop
+their cached ETags, snapshots and sitemap.
+"""
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from dotenv import load_dotenv
+from pymongo.errors import BulkWriteError
+
+from conditional import CollectionVersions
+from indexes import ensure_indexes
+from synthetic import fixed_content, generate
+
+ROOT_DIR = Path(__file__).parent
+
+
+async def load_collection(collection, docs: Iterable[dict], batch_size: int = 5000, in_flight: int = 2) -> int:
+    """insert_many(ordered=False) in batches, keeping up to `in_flight` batches outstanding"""
+    pending = set()
+    inserted = 0
+
+    async def insert(batch: List[dict]) -> int:
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+        except BulkWriteError as exc:
+            # Appending with a seed used before collides on unique id / slug; keep the rest
+            return exc.details["nInserted"]
+        return len(result.inserted_ids)
+
+    batch: List[dict] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            pending.add(asyncio.ensure_future(insert(batch)))
+            batch = []
+            if len(pending) >= in_flight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                inserted += sum(task.result() for task in done)
+            else:
+                # Let the event loop start the insert before generating the next batch
+                await asyncio.sleep(0)
+    if batch:
+        pending.add(asyncio.ensure_future(insert(batch)))
+    if pending:
+        done, _ = await asyncio.wait(pending)
+        inserted += sum(task.result() for task in done)
+    return inserted
+
+
+async def seed(db, counts: Dict[str, int], drop: bool = False, batch_size: int = 5000,
+               in_flight: int = 2, seed_value: int = 42, with_fixed: bool = True) -> Dict[str, Dict[str, float]]:
+    """Load every collection in parallel; returns rows and seconds per collection"""
+    sources: Dict[str, Iterable[dict]] = {
+        name: generate(name, count, seed=seed_value) for name, count in counts.items() if count
+    }
+    if with_fixed:
+        sources.update(fixed_content())
+
+    for name in list(sources):
+        if drop:
+            await db.drop_collection(name)
+        elif name not in counts and await db[name].find_one({}, {"_id": 1}) is not None:
+            # Appending keeps the packages, FAQ, pages and settings already there
+            del sources[name]
+
+    async def timed(name: str, docs: Iterable[dict]):
+        started = time.perf_counter()
+        rows = await load_collection(db[name], docs, batch_size, in_flight)
+        return name, {"rows": rows, "seconds": time.perf_counter() - started}
+
+    report = dict(await asyncio.gather(*(timed(name, docs) for name, docs in sources.items())))
+    if drop:
+        await ensure_indexes(db)
+    versions = CollectionVersions(db)
+    for name in sources:
+        await versions.bump(name)
+    return report
+
+
+async def main(args) -> None:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    counts = {
+        "pbn_sites": args.pbn if args.pbn is not None else args.rows,
+        "domain_listings": args.domains if args.domains is not None else args.rows,
+        "blog_posts": args.blog if args.blog is not None else args.rows,
+        "page_contents": args.page_content,
+    }
+    print(f"Seeding {os.environ['DB_NAME']} ({'drop' if args.drop else 'append'}): "
+          + ", ".join(f"{name}={count}" for name, count in counts.items()))
+    started = time.perf_counter()
+    try:
+        report = await seed(db, counts, drop=args.drop, batch_size=args.batch_size,
+                            in_flight=args.in_flight, seed_value=args.seed, with_fixed=not args.no_fixed)
+    finally:
+        client.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'collection':<18}{'rows':>10}{'seconds':>10}{'rows/sec':>12}")
+    for name, row in report.items():
+        rate = row["rows"] / row["seconds"] if row["seconds"] else 0
+        print(f"{name:<18}{row['rows']:>10}{row['seconds']:>10.2f}{rate:>12.0f}")
+    total = sum(row["rows"] for row in report.values())
+    print(f"{'total':<18}{total:>10}{elapsed:>10.2f}{total / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and bulk-load synthetic DomainPBN data")
+    parser.add_argument("--rows", type=int, default=1000, help="default count for pbn, domains and blog")
+    parser.add_argument("--pbn", type=int)
+    parser.add_argument("--domains", type=int)
+    parser.add_argument("--blog", type=int)
+    parser.add_argument("--page-content", type=int, default=8)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--drop", dest="drop", action="store_true", default=False,
+                      help="drop and recreate the seeded collections, rebuilding indexes after the load")
+    mode.add_argument("--append", dest="drop", action="store_false",
+                      help="keep existing documents; fixed content only fills empty collections (default)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--in-flight", type=int, default=2, help="concurrent insert_many batches per collection")
+    parser.add_argument("--seed", type=int, default=42, help="random seed; the same seed yields the same data")
+    parser.add_argument("--no-fixed", action="store_true", help="skip packages, FAQ, pages and settings")
+    asyncio.run(main(parser.parse_args()))
@@ -1,32 +1,203 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, create_model
+from typing import List, Optional, Dict, Any, Union, Literal, Callable, Awaitable, Tuple
 import uuid
 from datetime import datetime, timezone
 import re
+import json
+import base64
+import gzip
+import math
+
+from indexes import ensure_indexes
+from cache import TTLCache
+from conditional import (CachedCollectionVersions, CollectionVersions, ConditionalGetMiddleware,
+                         LocalCollectionVersions, VersionState)
+from export import EXPORT_BATCH_SIZE, export_response
+from importer import IMPORT_MAX_JSON_ROWS, detect_format, import_rows, iter_rows, spool_body
+from sitemap import SitemapBuilder
+from bootstrap import Snapshot
+from fastjson import fast_json
+from bulk import BulkSpec, run_bulk
+from compression import CompressionMiddleware, negotiate
+from metrics import MetricsMiddleware, MetricsRegistry, MongoCommandListener, MongoPoolListener
+from slowlog import SlowQueryLog, track_route
+from repository import COLLECTIONS, Repository, memory_repositories, motor_repositories
+from catalog import CatalogIndex
+from changefeed import ChangeFeed
+from singleflight import SingleFlight, SingleFlightMiddleware
+from synthetic import fixed_content, generate
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Request / query instrumentation exposed on /metrics
+metrics = MetricsRegistry()
+
+# Listing finds slower than SLOW_QUERY_MS are logged with their explain summary
+slow_queries = SlowQueryLog(
+    threshold_ms=float(os.environ.get('SLOW_QUERY_MS', '200')),
+    interval=float(os.environ.get('SLOW_QUERY_LOG_INTERVAL', '60')),
+    max_per_minute=int(os.environ.get('SLOW_QUERY_MAX_PER_MINUTE', '30')),
+)
+
+# "mongo" (default) or "memory": an in-process, indexed store seeded with
+# MEMORY_SEED_ROWS synthetic rows per catalog collection, which needs no
+# MongoDB and keeps database cost out of profiles (see repository.py)
+REPOSITORY_BACKEND = os.environ.get('REPOSITORY_BACKEND', 'mongo')
+MEMORY_SEED_ROWS = int(os.environ.get('MEMORY_SEED_ROWS', '0'))
+
+client = db = None
+
+if REPOSITORY_BACKEND == 'memory':
+    repos = public_repos = memory_repositories()
+    # Per-collection change counters backing ETag / Last-Modified
+    collection_versions = LocalCollectionVersions()
+else:
+    # MongoDB connection
+    mongo_url = os.environ['MONGO_URL']
+
+    # Pool / transport tuning; unset variables keep the driver defaults
+    MONGO_CLIENT_OPTIONS = {
+        option: cast(os.environ[env_var])
+        for option, env_var, cast in [
+            ('maxPoolSize', 'MONGO_MAX_POOL_SIZE', int),
+            ('minPoolSize', 'MONGO_MIN_POOL_SIZE', int),
+            ('maxIdleTimeMS', 'MONGO_MAX_IDLE_TIME_MS', int),
+            ('waitQueueTimeoutMS', 'MONGO_WAIT_QUEUE_TIMEOUT_MS', int),
+            ('serverSelectionTimeoutMS', 'MONGO_SERVER_SELECTION_TIMEOUT_MS', int),
+            ('compressors', 'MONGO_COMPRESSORS', str),  # e.g. "zstd,snappy,zlib"
+        ]
+        if os.environ.get(env_var)
+    }
+
+    # tz_aware so datetimes stored as BSON dates come back as UTC-aware values
+    client = AsyncIOMotorClient(
+        mongo_url,
+        tz_aware=True,
+        event_listeners=[MongoCommandListener(metrics), MongoPoolListener(metrics)],
+        **MONGO_CLIENT_OPTIONS,
+    )
+    db = client[os.environ['DB_NAME']]
+
+    # Public GET handlers read through this handle, so they can be pointed at
+    # secondaries (MONGO_PUBLIC_READ_PREFERENCE=secondaryPreferred). Admin
+    # routes, the sitemap and the version counters keep reading from the primary.
+    READ_PREFERENCES = {
+        'primary': ReadPreference.PRIMARY,
+        'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+        'secondary': ReadPreference.SECONDARY,
+        'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+        'nearest': ReadPreference.NEAREST,
+    }
+    public_read_preference = os.environ.get('MONGO_PUBLIC_READ_PREFERENCE', 'primary')
+    if public_read_preference != 'primary':
+        # Public results are cached under the collection version read from the
+        # primary (read cache, bootstrap snapshot, catalog index, encoded
+        # responses by ETag). A secondary that has not replicated the write
+        # yet returns the old data, which is then served as the new version
+        # until the next write to that collection, not just for the lag.
+        if os.environ.get('MONGO_PUBLIC_READ_ALLOW_STALE', '0') not in ('1', 'true', 'yes'):
+            raise RuntimeError(
+                f"MONGO_PUBLIC_READ_PREFERENCE={public_read_preference} can cache replica-lagged data under the "
+                "current collection version; set MONGO_PUBLIC_READ_ALLOW_STALE=1 to accept that"
+            )
+        logging.getLogger(__name__).warning(
+            "Public reads use MONGO_PUBLIC_READ_PREFERENCE=%s: a response read from a lagging secondary is "
+            "cached as the current version and can stay stale until the collection's next write",
+            public_read_preference,
+        )
+    public_db = client.get_database(
+        os.environ['DB_NAME'],
+        read_preference=READ_PREFERENCES[public_read_preference],
+    )
+
+    repos = motor_repositories(db, slow_queries)
+    public_repos = motor_repositories(public_db, slow_queries)
+    # Per-collection change counters backing ETag / Last-Modified, read through
+    # an in-process copy: writes on other workers show up within
+    # COLLECTION_VERSIONS_TTL_SECONDS (sooner with the change stream)
+    stored_versions = CollectionVersions(db)
+    collection_versions = CachedCollectionVersions(
+        stored_versions, ttl=float(os.environ.get('COLLECTION_VERSIONS_TTL_SECONDS', '1')),
+    )
+
+# Public read cache, invalidated by the admin write handlers
+response_cache = TTLCache(
+    max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', '512')),
+    ttl=float(os.environ.get('CACHE_TTL_SECONDS', '60')),
+)
+
+# Fully encoded public responses keyed by ETag, so each representation is
+# serialized and compressed once per version (see compression.py)
+encoded_responses = TTLCache(
+    max_entries=int(os.environ.get('COMPRESSION_CACHE_ENTRIES', '256')),
+    ttl=float(os.environ.get('CACHE_TTL_SECONDS', '60')),
+)
+
+# Concurrent GETs for the same representation share one route run, MongoDB
+# query and encoded body (see singleflight.py); SINGLE_FLIGHT=0 turns it off
+SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT', '1') in ('1', 'true', 'yes')
+response_flights = SingleFlight()
+
+# Public site URL used in sitemap and robots.txt
+SITE_URL = os.environ.get('SITE_URL', 'https://linkboost-13.preview.emergentagent.com')
+sitemaps = SitemapBuilder(repos, SITE_URL, collection_versions)
+
+# CATALOG_INDEX=1 answers /api/pbn and /api/domains from in-process column
+# snapshots of the active / available rows (see catalog.py)
+CATALOG_INDEX_ENABLED = os.environ.get('CATALOG_INDEX', '0') in ('1', 'true', 'yes')
+PBN_PUBLIC_PROJECTION = {"_id": 0, "domain_real": 0, "notes": 0}
+PBN_SORT_FIELDS = ["dr", "da", "traffic", "price_per_post"]
+DOMAIN_SORT_FIELDS = ["dr", "da", "price", "age"]
+catalogs = {
+    "pbn_sites": CatalogIndex(public_repos.pbn_sites, collection_versions, {"status": "active"},
+                              PBN_PUBLIC_PROJECTION, PBN_SORT_FIELDS, enabled=CATALOG_INDEX_ENABLED),
+    "domain_listings": CatalogIndex(public_repos.domain_listings, collection_versions, {"status": "available"},
+                                    {"_id": 0}, DOMAIN_SORT_FIELDS, enabled=CATALOG_INDEX_ENABLED),
+}
 
 # Create the main app without a prefix
 app = FastAPI()
 
+@app.exception_handler(DuplicateKeyError)
+async def duplicate_key_conflict(request: Request, exc: DuplicateKeyError):
+    """A create or update hit a unique index (id, slug): 409 naming the taken field"""
+    details = exc.details or {}
+    taken = details.get("keyValue") or {}
+    fields = list(taken) or list(details.get("keyPattern") or {})
+    if not fields:
+        match = re.search(r"index: (\w+?)_unique", str(exc))
+        fields = [match.group(1)] if match else []
+    field = ", ".join(fields) or "unique key"
+    value = ", ".join(str(value) for value in taken.values())
+    detail = f"{field} '{value}' is already taken" if value else f"{field} is already taken"
+    return JSONResponse(status_code=409, content={"detail": detail, "field": field})
+
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", dependencies=[Depends(track_route)])
 
 # ==================== MODELS ====================
 
+def partial_model(model: type) -> type:
+    """PATCH body model: every field of `model` may be omitted, none may be null
+
+    Omitted fields default to None without validation and are then dropped by
+    model_dump(exclude_unset=True); an explicit null still has to pass the
+    field's own type.
+    """
+    fields = {name: (info.annotation, None) for name, info in model.model_fields.items()}
+    return create_model(model.__name__.replace("Base", "").replace("Update", "") + "Patch", **fields)
+
 # PBN Site Models
 class PBNSiteBase(BaseModel):
     code: str
@@ -44,6 +215,8 @@ class PBNSiteBase(BaseModel):
 class PBNSiteCreate(PBNSiteBase):
     pass
 
+PBNSitePatch = partial_model(PBNSiteBase)
+
 class PBNSite(PBNSiteBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -61,6 +234,59 @@ class PBNSitePublic(BaseModel):
     age: int
     price_per_post: int
 
+class PBNSitePage(BaseModel):
+    items: List[PBNSitePublic]
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+# Bulk Admin Models
+BULK_MAX_OPERATIONS = int(os.environ.get('BULK_MAX_OPERATIONS', '1000'))
+
+class BulkOperation(BaseModel):
+    op: Literal["update", "status", "delete", "update_many"]
+    id: Optional[str] = None
+    status: Optional[str] = None
+    set: Optional[Dict[str, Any]] = None
+    filter: Optional[Dict[str, Any]] = None
+    multiply: Optional[Dict[str, float]] = None
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation] = Field(..., min_length=1, max_length=BULK_MAX_OPERATIONS)
+
+class BulkOperationResult(BaseModel):
+    index: int
+    op: str
+    status: Literal["ok", "not_found", "error"]
+    matched: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    results: List[BulkOperationResult]
+    matched: int
+    modified: int
+    deleted: int
+    errors: int
+    write_ms: float
+    elapsed_ms: float
+
+# Catalog Facet Models
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class RangeBucket(BaseModel):
+    min: int
+    max: int
+    count: int
+
+class CatalogFacets(BaseModel):
+    total: int
+    category_field: str
+    categories: List[FacetCount]
+    dr: List[RangeBucket]
+    price: List[RangeBucket]
+
 # Package Models
 class PackageBase(BaseModel):
     name: str
@@ -75,6 +301,8 @@ class PackageBase(BaseModel):
 class PackageCreate(PackageBase):
     pass
 
+PackagePatch = partial_model(PackageBase)
+
 class Package(PackageBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -94,12 +322,29 @@ class BlogPostBase(BaseModel):
 class BlogPostCreate(BlogPostBase):
     pass
 
+BlogPostPatch = partial_model(BlogPostBase)
+
 class BlogPost(BlogPostBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     published_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class BlogPostPage(BaseModel):
+    items: List[BlogPost]
+    has_more: bool = False
+    total: Optional[int] = None
+
+class BlogSearchResult(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    slug: str
+    excerpt: str
+    thumbnail: Optional[str] = None
+    published_at: datetime
+    score: float
+
 # FAQ Models
 class FAQBase(BaseModel):
     question: str
@@ -110,6 +355,8 @@ class FAQBase(BaseModel):
 class FAQCreate(FAQBase):
     pass
 
+FAQPatch = partial_model(FAQBase)
+
 class FAQ(FAQBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -125,6 +372,8 @@ class PageBase(BaseModel):
 class PageCreate(PageBase):
     pass
 
+PagePatch = partial_model(PageBase)
+
 class Page(PageBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -149,11 +398,19 @@ class DomainListingBase(BaseModel):
 class DomainListingCreate(DomainListingBase):
     pass
 
+DomainListingPatch = partial_model(DomainListingBase)
+
 class DomainListing(DomainListingBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class DomainListingPage(BaseModel):
+    items: List[DomainListing]
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
 # Settings Models
 class SettingsBase(BaseModel):
     site_name: str = "DomainPBN"
@@ -184,6 +441,8 @@ class PageContentCreate(PageContentBase):
 class PageContentUpdate(BaseModel):
     content: Dict[str, Any]
 
+PageContentPatch = partial_model(PageContentUpdate)
+
 class PageContent(PageContentBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -191,32 +450,202 @@ class PageContent(PageContentBase):
 
 # ==================== HELPER FUNCTIONS ====================
 
-def serialize_datetime(obj: Any) -> Any:
-    """Convert datetime objects to ISO string for MongoDB"""
-    if isinstance(obj, dict):
-        return {k: serialize_datetime(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [serialize_datetime(item) for item in obj]
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    return obj
-
-def deserialize_datetime(obj: Any) -> Any:
-    """Convert ISO string back to datetime objects"""
-    if isinstance(obj, dict):
-        result = {}
-        for k, v in obj.items():
-            if isinstance(v, str) and k in ['created_at', 'updated_at', 'published_at']:
-                try:
-                    result[k] = datetime.fromisoformat(v)
-                except:
-                    result[k] = v
-            else:
-                result[k] = deserialize_datetime(v)
-        return result
-    elif isinstance(obj, list):
-        return [deserialize_datetime(item) for item in obj]
-    return obj
+def encode_cursor(sort_field: str, doc: Dict[str, Any]) -> str:
+    """Encode the last row's sort value and id as an opaque keyset cursor"""
+    raw = json.dumps([sort_field, doc[sort_field], doc["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def apply_cursor(query: Dict[str, Any], sort_field: str, cursor: str) -> Dict[str, Any]:
+    """Restrict a (sort_field desc, id desc) query to rows after the cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        field, value, last_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if field != sort_field:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort_by")
+    # Decoded values go straight into the filter: anything but a number and an id
+    # string (e.g. {"$gt": 0}) would run as a query operator. json.loads also
+    # accepts NaN and Infinity, which no stored row can follow.
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) \
+            or not isinstance(last_id, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {
+        **query,
+        "$or": [
+            {sort_field: {"$lt": value}},
+            {sort_field: value, "id": {"$lt": last_id}},
+        ],
+    }
+
+async def fetch_keyset_page(repo: Repository, query: Dict[str, Any], projection: Dict[str, int],
+                            sort_field: str, cursor: str, limit: int) -> Dict[str, Any]:
+    """Fetch one page after the cursor; an empty cursor starts from the top"""
+    if cursor:
+        query = apply_cursor(query, sort_field, cursor)
+    docs = await repo.find(query, projection, [(sort_field, -1), ("id", -1)], limit=limit + 1)
+    has_more = len(docs) > limit
+    next_cursor = encode_cursor(sort_field, docs[limit - 1]) if has_more else None
+    return {"items": docs[:limit], "has_more": has_more, "next_cursor": next_cursor}
+
+async def fetch_offset_page(repo: Repository, query: Dict[str, Any], projection: Dict[str, Any],
+                            sort: List[Any], skip: int, limit: int) -> Dict[str, Any]:
+    """Fetch one offset page, reading one extra row to learn whether more follow"""
+    docs = await repo.find(query, projection, sort, skip, limit + 1)
+    return {"items": docs[:limit], "has_more": len(docs) > limit}
+
+def request_versions(request: Request) -> Optional[VersionState]:
+    """Collection versions ConditionalGetMiddleware read for this request, if any"""
+    return getattr(request.state, "collection_versions", None)
+
+async def cached_read(state: Optional[VersionState], key: Tuple[Any, ...],
+                      load: Callable[[], Awaitable[Any]]) -> Any:
+    """response_cache.get_or_load with the current version of collection `key[0]` appended to `key`
+
+    `state` is the request's versions, the same ones its ETag was built
+    from. A write on another worker does not clear this worker's cache, but it
+    bumps the shared version, so later requests look up a new key and read
+    MongoDB instead of answering the new ETag with the old body.
+    """
+    collection = key[0]
+    if state is None or collection not in state:
+        state = await collection_versions.get([collection])
+    return await response_cache.get_or_load((*key, state[collection][0]), load)
+
+async def count_matching(state: Optional[VersionState], repo: Repository, query: Dict[str, Any]) -> int:
+    """count_documents for a listing filter, cached per filter and collection version"""
+    signature = json.dumps(query, sort_keys=True, default=str)
+    async def load():
+        return await repo.count(query)
+    return await cached_read(state, (repo.name, "count", signature), load)
+
+def apply_change(collection: str, change: Optional[Dict[str, Any]]) -> None:
+    """Change feed callback: bring this worker's caches up to date with a write made elsewhere"""
+    if collection == "collection_versions":
+        doc = (change or {}).get("fullDocument") or {}
+        if doc.get("_id") is not None and doc.get("version") is not None:
+            collection_versions.observe(doc["_id"], doc["version"], doc.get("updated_at"))
+        if doc.get("_id") in catalogs:
+            catalogs[doc["_id"]].advance(doc.get("version"))
+        return
+    response_cache.invalidate(collection)
+    sitemaps.notify(collection)
+    if change is not None and collection in catalogs:
+        catalogs[collection].changed(change)
+
+# CHANGE_FEED=auto (default) watches a change stream and falls back to polling
+# collection_versions on a standalone server; "stream", "poll" or "off" force
+# one behaviour (see changefeed.py)
+change_feed = None if db is None else ChangeFeed(
+    db,
+    stored_versions,
+    list(COLLECTIONS),
+    apply_change,
+    mode=os.environ.get('CHANGE_FEED', 'auto'),
+    poll_interval=float(os.environ.get('CHANGE_FEED_POLL_SECONDS', '2')),
+    token_save_interval=float(os.environ.get('CHANGE_FEED_TOKEN_SAVE_SECONDS', '5')),
+)
+
+async def mark_changed(collection: str, doc: Optional[Dict[str, Any]] = None,
+                       deleted_id: Optional[str] = None) -> None:
+    """Called by every admin write handler after it modifies `collection`
+
+    Handlers that wrote a single document pass it (or the deleted id) so the
+    catalog snapshot can be patched instead of reloaded.
+    """
+    response_cache.invalidate(collection)
+    version = await collection_versions.bump(collection)
+    sitemaps.notify(collection)
+    if collection in catalogs:
+        catalogs[collection].written(version, doc, deleted_id)
+
+async def update_and_fetch(collection: str, doc_id: str, changes: Dict[str, Any],
+                           not_found: str, touch: bool = False) -> Dict[str, Any]:
+    """`$set` fields on one document and return it as updated, in a single round-trip
+
+    `touch` also stamps `updated_at`. An empty change set is rejected rather
+    than answered with an unchanged document.
+    """
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    if touch:
+        changes["updated_at"] = datetime.now(timezone.utc)
+    updated = await repos[collection].update({"id": doc_id}, changes)
+    if updated is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    await mark_changed(collection, updated)
+    return updated
+
+PBN_BULK = BulkSpec("pbn_sites", PBNSitePatch, ["active", "hidden"])
+DOMAIN_BULK = BulkSpec("domain_listings", DomainListingPatch, ["available", "sold", "reserved"])
+
+async def catalog_or_repo(collection: str, request: Request) -> Repository:
+    """The catalog snapshot for `collection` when enabled, else its public repository"""
+    snapshot = await catalogs[collection].current(request_versions(request))
+    return snapshot if snapshot is not None else public_repos[collection]
+
+def mongo_collection(name: str):
+    """Motor collection for the MongoDB-only operations (bulk_write, streaming import)"""
+    collection = repos[name].collection
+    if collection is None:
+        raise HTTPException(status_code=501, detail=f"Not supported by the {REPOSITORY_BACKEND} repository backend")
+    return collection
+
+async def run_bulk_request(spec: BulkSpec, request: BulkRequest) -> Dict[str, Any]:
+    collection = mongo_collection(spec.collection)
+    report = await run_bulk(collection, spec, [op.model_dump() for op in request.operations])
+    if report["modified"] or report["deleted"]:
+        await mark_changed(spec.collection)
+    logger.info("Bulk %s: %d ops, %d modified, %d deleted, %d errors in %.1f ms", spec.collection,
+                len(request.operations), report["modified"], report["deleted"], report["errors"], report["elapsed_ms"])
+    return report
+
+async def resolve_niches(state: Optional[VersionState], niche: str) -> List[str]:
+    """Map a niche filter to the stored niche values containing it (case-insensitive)
+
+    The niche vocabulary is small, so matching the substring against the
+    cached distinct values lets the listing query use `$in` on an index
+    instead of an unanchored `$regex`.
+    """
+    async def load():
+        return await public_repos.pbn_sites.distinct("niche")
+    niches = await cached_read(state, ("pbn_sites", "niches"), load)
+    needle = niche.lower()
+    return [value for value in niches if needle in value.lower()]
+
+async def build_pbn_query(state: Optional[VersionState], niche: Optional[str], min_dr: Optional[int],
+                          max_price: Optional[int]) -> Dict[str, Any]:
+    """Filter shared by the public PBN listing and its facets"""
+    query = {"status": "active"}
+    if niche:
+        query["niche"] = {"$in": await resolve_niches(state, niche)}
+    if min_dr:
+        query["dr"] = {"$gte": min_dr}
+    if max_price:
+        query["price_per_post"] = {"$lte": max_price}
+    return query
+
+def build_domain_query(status: Optional[str], min_dr: Optional[int], max_price: Optional[int]) -> Dict[str, Any]:
+    """Filter shared by the public domain listing and its facets"""
+    query = {}
+    if status:
+        query["status"] = status
+    else:
+        query["status"] = "available"  # Default to available only
+        
+    if min_dr:
+        query["dr"] = {"$gte": min_dr}
+    if max_price:
+        query["price"] = {"$lte": max_price}
+    return query
+
+def text_search(search: str) -> Dict[str, Any]:
+    """Filter and sort for a ranked `$text` query over title/excerpt/content"""
+    return {
+        "filter": {"$text": {"$search": search}},
+        "score": {"score": {"$meta": "textScore"}},
+        "sort": [("score", {"$meta": "textScore"}), ("published_at", -1)],
+    }
 
 def create_slug(text: str) -> str:
     """Create URL-friendly slug"""
@@ -232,283 +661,440 @@ async def root():
     return {"message": "DomainPBN API", "version": "1.0"}
 
 # PBN Routes
-@api_router.get("/pbn", response_model=List[PBNSitePublic])
+@api_router.get("/pbn", response_model=Union[List[PBNSitePublic], PBNSitePage])
 async def get_pbn_sites(
+    request: Request,
     niche: Optional[str] = None,
     min_dr: Optional[int] = None,
     max_price: Optional[int] = None,
     sort_by: str = "dr",
     page: int = Query(1, ge=1),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    envelope: bool = False
 ):
-    """Get public PBN listing (domain hidden)"""
-    query = {"status": "active"}
-    if niche:
-        query["niche"] = {"$regex": niche, "$options": "i"}
-    if min_dr:
-        query["dr"] = {"$gte": min_dr}
-    if max_price:
-        query["price_per_post"] = {"$lte": max_price}
-    
-    sort_field = sort_by if sort_by in ["dr", "da", "traffic", "price_per_post"] else "dr"
+    """Get public PBN listing (domain hidden)
+
+    Passing `cursor` (empty for the first page) switches to keyset pagination
+    and `envelope=true` adds `total`; both return `{items, has_more, ...}`
+    instead of a bare list.
+    """
+    query = await build_pbn_query(request_versions(request), niche, min_dr, max_price)
+    sort_field = sort_by if sort_by in PBN_SORT_FIELDS else "dr"
+    projection = PBN_PUBLIC_PROJECTION
+    sort = [(sort_field, -1), ("id", -1)]
     skip = (page - 1) * limit
-    sites = await db.pbn_sites.find(query, {"_id": 0, "domain_real": 0, "notes": 0}).sort(sort_field, -1).skip(skip).limit(limit).to_list(limit)
-    return [deserialize_datetime(site) for site in sites]
+    listing = await catalog_or_repo("pbn_sites", request)
+    if cursor is None and not envelope:
+        return await listing.find(query, projection, sort, skip, limit)
+    if cursor is not None:
+        result = await fetch_keyset_page(listing, query, projection, sort_field, cursor, limit)
+    else:
+        result = await fetch_offset_page(listing, query, projection, sort, skip, limit)
+    if envelope:
+        result["total"] = await count_matching(request_versions(request), listing, query)
+    return result
+
+@api_router.get("/pbn/facets", response_model=CatalogFacets)
+async def get_pbn_facets(
+    request: Request,
+    niche: Optional[str] = None,
+    min_dr: Optional[int] = None,
+    max_price: Optional[int] = None
+):
+    """Niche counts, DR and price buckets and total for the current PBN filters"""
+    state = request_versions(request)
+    async def load():
+        query = await build_pbn_query(state, niche, min_dr, max_price)
+        facets = await public_repos.pbn_sites.facets(query, "niche", "price_per_post")
+        return {"category_field": "niche", **facets}
+    return await cached_read(state, ("pbn_sites", "facets", niche, min_dr, max_price), load)
 
 @api_router.get("/admin/pbn", response_model=List[PBNSite])
 async def get_admin_pbn_sites():
     """Get all PBN sites for admin (includes domain)"""
-    sites = await db.pbn_sites.find({}, {"_id": 0}).to_list(1000)
-    return [deserialize_datetime(site) for site in sites]
+    sites = await repos.pbn_sites.find({}, {"_id": 0}, limit=1000)
+    return fast_json(PBNSite, sites)
+
+@api_router.get("/admin/pbn/export")
+async def export_pbn_sites(fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format")):
+    """Stream every PBN site as NDJSON or CSV"""
+    rows = repos.pbn_sites.iterate({}, {"_id": 0}, batch_size=EXPORT_BATCH_SIZE)
+    return export_response(rows, fmt, list(PBNSite.model_fields), "pbn-sites")
 
 @api_router.post("/admin/pbn", response_model=PBNSite)
 async def create_pbn_site(site: PBNSiteCreate):
     site_obj = PBNSite(**site.model_dump())
-    doc = serialize_datetime(site_obj.model_dump())
-    await db.pbn_sites.insert_one(doc)
+    doc = site_obj.model_dump()
+    await repos.pbn_sites.insert_one(doc)
+    await mark_changed("pbn_sites", doc)
     return site_obj
 
 @api_router.put("/admin/pbn/{site_id}", response_model=PBNSite)
 async def update_pbn_site(site_id: str, site: PBNSiteCreate):
-    doc = serialize_datetime(site.model_dump())
-    result = await db.pbn_sites.update_one({"id": site_id}, {"$set": doc})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="PBN site not found")
-    updated_site = await db.pbn_sites.find_one({"id": site_id}, {"_id": 0})
-    return deserialize_datetime(updated_site)
+    return await update_and_fetch("pbn_sites", site_id, site.model_dump(), "PBN site not found")
+
+@api_router.patch("/admin/pbn/{site_id}", response_model=PBNSite)
+async def patch_pbn_site(site_id: str, site: PBNSitePatch):
+    """Update only the fields present in the request body"""
+    return await update_and_fetch("pbn_sites", site_id, site.model_dump(exclude_unset=True), "PBN site not found")
 
 @api_router.delete("/admin/pbn/{site_id}")
 async def delete_pbn_site(site_id: str):
-    result = await db.pbn_sites.delete_one({"id": site_id})
-    if result.deleted_count == 0:
+    if not await repos.pbn_sites.delete({"id": site_id}):
         raise HTTPException(status_code=404, detail="PBN site not found")
+    await mark_changed("pbn_sites", deleted_id=site_id)
     return {"message": "PBN site deleted"}
 
+@api_router.post("/admin/pbn/bulk", response_model=BulkResult)
+async def bulk_pbn_sites(request: BulkRequest):
+    """Apply many update/status/delete/update_many operations in one bulk_write"""
+    return await run_bulk_request(PBN_BULK, request)
+
 # Package Routes
+async def read_packages(state: Optional[VersionState] = None) -> List[Dict[str, Any]]:
+    async def load():
+        return await public_repos.packages.find({"is_active": True}, {"_id": 0}, [("sort_order", 1)], limit=100)
+    return await cached_read(state, ("packages", "list"), load)
+
 @api_router.get("/packages", response_model=List[Package])
-async def get_packages():
-    packages = await db.packages.find({"is_active": True}, {"_id": 0}).sort("sort_order", 1).to_list(100)
-    return [deserialize_datetime(pkg) for pkg in packages]
+async def get_packages(request: Request):
+    return await read_packages(request_versions(request))
 
 @api_router.get("/admin/packages", response_model=List[Package])
 async def get_admin_packages():
-    packages = await db.packages.find({}, {"_id": 0}).sort("sort_order", 1).to_list(100)
-    return [deserialize_datetime(pkg) for pkg in packages]
+    packages = await repos.packages.find({}, {"_id": 0}, [("sort_order", 1)], limit=100)
+    return fast_json(Package, packages)
 
 @api_router.post("/admin/packages", response_model=Package)
 async def create_package(package: PackageCreate):
     package_obj = Package(**package.model_dump())
-    doc = serialize_datetime(package_obj.model_dump())
-    await db.packages.insert_one(doc)
+    doc = package_obj.model_dump()
+    await repos.packages.insert_one(doc)
+    await mark_changed("packages")
     return package_obj
 
 @api_router.put("/admin/packages/{package_id}", response_model=Package)
 async def update_package(package_id: str, package: PackageCreate):
-    doc = serialize_datetime(package.model_dump())
-    result = await db.packages.update_one({"id": package_id}, {"$set": doc})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Package not found")
-    updated_pkg = await db.packages.find_one({"id": package_id}, {"_id": 0})
-    return deserialize_datetime(updated_pkg)
+    return await update_and_fetch("packages", package_id, package.model_dump(), "Package not found")
+
+@api_router.patch("/admin/packages/{package_id}", response_model=Package)
+async def patch_package(package_id: str, package: PackagePatch):
+    """Update only the fields present in the request body"""
+    return await update_and_fetch("packages", package_id, package.model_dump(exclude_unset=True), "Package not found")
 
 @api_router.delete("/admin/packages/{package_id}")
 async def delete_package(package_id: str):
-    result = await db.packages.delete_one({"id": package_id})
-    if result.deleted_count == 0:
+    if not await repos.packages.delete({"id": package_id}):
         raise HTTPException(status_code=404, detail="Package not found")
+    await mark_changed("packages")
     return {"message": "Package deleted"}
 
 # Blog Routes
-@api_router.get("/blog", response_model=List[BlogPost])
+@api_router.get("/blog", response_model=Union[List[BlogPost], BlogPostPage])
 async def get_blog_posts(
+    request: Request,
     search: Optional[str] = None,
     page: int = Query(1, ge=1),
-    limit: int = Query(10, ge=1, le=50)
+    limit: int = Query(10, ge=1, le=50),
+    envelope: bool = False
 ):
+    """Published posts, newest first (ranked by relevance when searching)
+
+    `envelope=true` returns `{items, total, has_more}` instead of a bare list.
+    """
     query = {"is_published": True}
+    projection = {"_id": 0}
+    sort = [("published_at", -1)]
     if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"excerpt": {"$regex": search, "$options": "i"}}
-        ]
+        ranked = text_search(search)
+        query.update(ranked["filter"])
+        projection.update(ranked["score"])
+        sort = ranked["sort"]
     
     skip = (page - 1) * limit
-    posts = await db.blog_posts.find(query, {"_id": 0}).sort("published_at", -1).skip(skip).limit(limit).to_list(limit)
-    return [deserialize_datetime(post) for post in posts]
+    if not envelope:
+        return await public_repos.blog_posts.find(query, projection, sort, skip, limit)
+    result = await fetch_offset_page(public_repos.blog_posts, query, projection, sort, skip, limit)
+    result["total"] = await count_matching(request_versions(request), public_repos.blog_posts, query)
+    return result
+
+@api_router.get("/search", response_model=List[BlogSearchResult])
+async def search_blog_posts(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Relevance-ranked search over published blog posts (title > excerpt > content)"""
+    ranked = text_search(q)
+    query = {"is_published": True, **ranked["filter"]}
+    projection = {"_id": 0, "content": 0, **ranked["score"]}
+    posts = await public_repos.blog_posts.find(query, projection, ranked["sort"], limit=limit)
+    return posts
 
 @api_router.get("/blog/{slug}", response_model=BlogPost)
 async def get_blog_post(slug: str):
-    post = await db.blog_posts.find_one({"slug": slug, "is_published": True}, {"_id": 0})
+    post = await public_repos.blog_posts.find_one({"slug": slug, "is_published": True}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Blog post not found")
-    return deserialize_datetime(post)
+    return post
 
 @api_router.get("/admin/blog", response_model=List[BlogPost])
 async def get_admin_blog_posts():
-    posts = await db.blog_posts.find({}, {"_id": 0}).sort("published_at", -1).to_list(1000)
-    return [deserialize_datetime(post) for post in posts]
+    posts = await repos.blog_posts.find({}, {"_id": 0}, [("published_at", -1)], limit=1000)
+    return fast_json(BlogPost, posts)
+
+@api_router.get("/admin/blog/export")
+async def export_blog_posts(fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format")):
+    """Stream every blog post as NDJSON or CSV"""
+    rows = repos.blog_posts.iterate({}, {"_id": 0}, [("published_at", -1)], EXPORT_BATCH_SIZE)
+    return export_response(rows, fmt, list(BlogPost.model_fields), "blog-posts")
 
 @api_router.post("/admin/blog", response_model=BlogPost)
 async def create_blog_post(post: BlogPostCreate):
     post_obj = BlogPost(**post.model_dump())
-    doc = serialize_datetime(post_obj.model_dump())
-    await db.blog_posts.insert_one(doc)
+    doc = post_obj.model_dump()
+    await repos.blog_posts.insert_one(doc)
+    await mark_changed("blog_posts")
     return post_obj
 
 @api_router.put("/admin/blog/{post_id}", response_model=BlogPost)
 async def update_blog_post(post_id: str, post: BlogPostCreate):
-    doc = serialize_datetime(post.model_dump())
-    result = await db.blog_posts.update_one({"id": post_id}, {"$set": doc})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Blog post not found")
-    updated_post = await db.blog_posts.find_one({"id": post_id}, {"_id": 0})
-    return deserialize_datetime(updated_post)
+    return await update_and_fetch("blog_posts", post_id, post.model_dump(), "Blog post not found", touch=True)
+
+@api_router.patch("/admin/blog/{post_id}", response_model=BlogPost)
+async def patch_blog_post(post_id: str, post: BlogPostPatch):
+    """Update only the fields present in the request body"""
+    return await update_and_fetch("blog_posts", post_id, post.model_dump(exclude_unset=True), "Blog post not found", touch=True)
 
 @api_router.delete("/admin/blog/{post_id}")
 async def delete_blog_post(post_id: str):
-    result = await db.blog_posts.delete_one({"id": post_id})
-    if result.deleted_count == 0:
+    if not await repos.blog_posts.delete({"id": post_id}):
         raise HTTPException(status_code=404, detail="Blog post not found")
+    await mark_changed("blog_posts")
     return {"message": "Blog post deleted"}
 
 # FAQ Routes
+async def read_faqs(state: Optional[VersionState] = None) -> List[Dict[str, Any]]:
+    async def load():
+        return await public_repos.faqs.find({"is_active": True}, {"_id": 0}, [("sort_order", 1)], limit=100)
+    return await cached_read(state, ("faqs", "list"), load)
+
 @api_router.get("/faq", response_model=List[FAQ])
-async def get_faqs():
-    faqs = await db.faqs.find({"is_active": True}, {"_id": 0}).sort("sort_order", 1).to_list(100)
-    return [deserialize_datetime(faq) for faq in faqs]
+async def get_faqs(request: Request):
+    return await read_faqs(request_versions(request))
 
 @api_router.get("/admin/faq", response_model=List[FAQ])
 async def get_admin_faqs():
-    faqs = await db.faqs.find({}, {"_id": 0}).sort("sort_order", 1).to_list(100)
-    return [deserialize_datetime(faq) for faq in faqs]
+    faqs = await repos.faqs.find({}, {"_id": 0}, [("sort_order", 1)], limit=100)
+    return fast_json(FAQ, faqs)
 
 @api_router.post("/admin/faq", response_model=FAQ)
 async def create_faq(faq: FAQCreate):
     faq_obj = FAQ(**faq.model_dump())
-    doc = serialize_datetime(faq_obj.model_dump())
-    await db.faqs.insert_one(doc)
+    doc = faq_obj.model_dump()
+    await repos.faqs.insert_one(doc)
+    await mark_changed("faqs")
     return faq_obj
 
 @api_router.put("/admin/faq/{faq_id}", response_model=FAQ)
 async def update_faq(faq_id: str, faq: FAQCreate):
-    doc = serialize_datetime(faq.model_dump())
-    result = await db.faqs.update_one({"id": faq_id}, {"$set": doc})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="FAQ not found")
-    updated_faq = await db.faqs.find_one({"id": faq_id}, {"_id": 0})
-    return deserialize_datetime(updated_faq)
+    return await update_and_fetch("faqs", faq_id, faq.model_dump(), "FAQ not found")
+
+@api_router.patch("/admin/faq/{faq_id}", response_model=FAQ)
+async def patch_faq(faq_id: str, faq: FAQPatch):
+    """Update only the fields present in the request body"""
+    return await update_and_fetch("faqs", faq_id, faq.model_dump(exclude_unset=True), "FAQ not found")
 
 @api_router.delete("/admin/faq/{faq_id}")
 async def delete_faq(faq_id: str):
-    result = await db.faqs.delete_one({"id": faq_id})
-    if result.deleted_count == 0:
+    if not await repos.faqs.delete({"id": faq_id}):
         raise HTTPException(status_code=404, detail="FAQ not found")
+    await mark_changed("faqs")
     return {"message": "FAQ deleted"}
 
 # Pages Routes
 @api_router.get("/pages/{slug}", response_model=Page)
-async def get_page(slug: str):
-    page = await db.pages.find_one({"slug": slug, "is_published": True}, {"_id": 0})
+async def get_page(slug: str, request: Request):
+    async def load():
+        return await public_repos.pages.find_one({"slug": slug, "is_published": True}, {"_id": 0})
+    page = await cached_read(request_versions(request), ("pages", "slug", slug), load)
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
-    return deserialize_datetime(page)
+    return page
 
 @api_router.get("/admin/pages", response_model=List[Page])
 async def get_admin_pages():
-    pages = await db.pages.find({}, {"_id": 0}).to_list(100)
-    return [deserialize_datetime(page) for page in pages]
+    pages = await repos.pages.find({}, {"_id": 0}, limit=100)
+    return fast_json(Page, pages)
 
 @api_router.post("/admin/pages", response_model=Page)
 async def create_page(page: PageCreate):
     page_obj = Page(**page.model_dump())
-    doc = serialize_datetime(page_obj.model_dump())
-    await db.pages.insert_one(doc)
+    doc = page_obj.model_dump()
+    await repos.pages.insert_one(doc)
+    await mark_changed("pages")
     return page_obj
 
 @api_router.put("/admin/pages/{page_id}", response_model=Page)
 async def update_page(page_id: str, page: PageCreate):
-    doc = serialize_datetime(page.model_dump())
-    result = await db.pages.update_one({"id": page_id}, {"$set": doc})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Page not found")
-    updated_page = await db.pages.find_one({"id": page_id}, {"_id": 0})
-    return deserialize_datetime(updated_page)
+    return await update_and_fetch("pages", page_id, page.model_dump(), "Page not found", touch=True)
+
+@api_router.patch("/admin/pages/{page_id}", response_model=Page)
+async def patch_page(page_id: str, page: PagePatch):
+    """Update only the fields present in the request body"""
+    return await update_and_fetch("pages", page_id, page.model_dump(exclude_unset=True), "Page not found", touch=True)
 
 @api_router.delete("/admin/pages/{page_id}")
 async def delete_page(page_id: str):
-    result = await db.pages.delete_one({"id": page_id})
-    if result.deleted_count == 0:
+    if not await repos.pages.delete({"id": page_id}):
         raise HTTPException(status_code=404, detail="Page not found")
+    await mark_changed("pages")
     return {"message": "Page deleted"}
 
 # Domain Listing Routes
-@api_router.get("/domains", response_model=List[DomainListing])
+@api_router.get("/domains", response_model=Union[List[DomainListing], DomainListingPage])
 async def get_domains(
+    request: Request,
     status: Optional[str] = None,
     min_dr: Optional[int] = None,
     max_price: Optional[int] = None,
     sort_by: str = "dr",
     page: int = Query(1, ge=1),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    envelope: bool = False
 ):
-    """Get public domain listings"""
-    query = {}
-    if status:
-        query["status"] = status
-    else:
-        query["status"] = "available"  # Default to available only
-        
-    if min_dr:
-        query["dr"] = {"$gte": min_dr}
-    if max_price:
-        query["price"] = {"$lte": max_price}
-    
-    sort_field = sort_by if sort_by in ["dr", "da", "price", "age"] else "dr"
+    """Get public domain listings
+
+    Passing `cursor` (empty for the first page) switches to keyset pagination
+    and `envelope=true` adds `total`; both return `{items, has_more, ...}`
+    instead of a bare list.
+    """
+    query = build_domain_query(status, min_dr, max_price)
+    sort_field = sort_by if sort_by in DOMAIN_SORT_FIELDS else "dr"
+    sort = [(sort_field, -1), ("id", -1)]
     skip = (page - 1) * limit
-    domains = await db.domain_listings.find(query, {"_id": 0}).sort(sort_field, -1).skip(skip).limit(limit).to_list(limit)
-    return [deserialize_datetime(domain) for domain in domains]
+    listing = await catalog_or_repo("domain_listings", request)
+    if cursor is None and not envelope:
+        return await listing.find(query, {"_id": 0}, sort, skip, limit)
+    if cursor is not None:
+        result = await fetch_keyset_page(listing, query, {"_id": 0}, sort_field, cursor, limit)
+    else:
+        result = await fetch_offset_page(listing, query, {"_id": 0}, sort, skip, limit)
+    if envelope:
+        result["total"] = await count_matching(request_versions(request), listing, query)
+    return result
+
+@api_router.get("/domains/facets", response_model=CatalogFacets)
+async def get_domain_facets(
+    request: Request,
+    status: Optional[str] = None,
+    min_dr: Optional[int] = None,
+    max_price: Optional[int] = None
+):
+    """Registrar counts, DR and price buckets and total for the current domain filters"""
+    async def load():
+        query = build_domain_query(status, min_dr, max_price)
+        facets = await public_repos.domain_listings.facets(query, "registrar", "price")
+        return {"category_field": "registrar", **facets}
+    return await cached_read(request_versions(request), ("domain_listings", "facets", status, min_dr, max_price), load)
 
 @api_router.get("/admin/domains", response_model=List[DomainListing])
 async def get_admin_domains():
     """Get all domains for admin"""
-    domains = await db.domain_listings.find({}, {"_id": 0}).to_list(1000)
-    return [deserialize_datetime(domain) for domain in domains]
+    domains = await repos.domain_listings.find({}, {"_id": 0}, limit=1000)
+    return fast_json(DomainListing, domains)
+
+@api_router.get("/admin/domains/export")
+async def export_domains(fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format")):
+    """Stream every domain listing as NDJSON or CSV"""
+    rows = repos.domain_listings.iterate({}, {"_id": 0}, batch_size=EXPORT_BATCH_SIZE)
+    return export_response(rows, fmt, list(DomainListing.model_fields), "domains")
 
 @api_router.post("/admin/domains", response_model=DomainListing)
 async def create_domain(domain: DomainListingCreate):
     domain_obj = DomainListing(**domain.model_dump())
-    doc = serialize_datetime(domain_obj.model_dump())
-    await db.domain_listings.insert_one(doc)
+    doc = domain_obj.model_dump()
+    await repos.domain_listings.insert_one(doc)
+    await mark_changed("domain_listings", doc)
     return domain_obj
 
-@api_router.post("/admin/domains/import")
+@api_router.post("/admin/domains/import", deprecated=True)
 async def import_domains(domains: List[DomainListingCreate]):
-    """Bulk import domains from CSV/Excel"""
-    domain_objs = [DomainListing(**domain.model_dump()) for domain in domains]
-    docs = [serialize_datetime(obj.model_dump()) for obj in domain_objs]
-    result = await db.domain_listings.insert_many(docs)
-    return {"imported": len(result.inserted_ids), "message": f"{len(result.inserted_ids)} domains imported successfully"}
+    """Bulk upsert domains from a JSON array; superseded by /admin/domains/import/stream
+
+    The whole array is parsed in memory, so it is capped at
+    IMPORT_MAX_JSON_ROWS rows; the rows are written in the importer's chunks.
+    """
+    if len(domains) > IMPORT_MAX_JSON_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {IMPORT_MAX_JSON_ROWS} domains per request; "
+                                                    "use /admin/domains/import/stream for larger files")
+    collection = mongo_collection("domain_listings")
+    rows = ((line_no, domain.model_dump(exclude_unset=True)) for line_no, domain in enumerate(domains, 1))
+    errors = []
+    try:
+        async for report in import_rows(collection, rows, DomainListingCreate):
+            errors.extend(report.get("errors", []))
+    finally:
+        await mark_changed("domain_listings")
+    imported = report["inserted"] + report["updated"]
+    return {**report, "imported": imported, "errors": errors,
+            "message": f"{imported} domains imported successfully"}
+
+@api_router.post("/admin/domains/import/stream")
+async def import_domains_stream(
+    request: Request,
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format")
+):
+    """Bulk upsert domains from a raw CSV or NDJSON request body
+
+    Rows are validated and written in chunks; the response streams one NDJSON
+    progress report per chunk (with row-level errors) and a final summary.
+    The whole body is spooled (to disk past IMPORT_SPOOL_MAX_MEMORY) before
+    the first row is read, so the first report only arrives once the upload
+    has finished.
+    """
+    collection = mongo_collection("domain_listings")
+    fmt = fmt or detect_format(request.headers.get("content-type"))
+    upload = await spool_body(request.stream())
+
+    async def progress():
+        try:
+            rows = iter_rows(upload, fmt)
+            async for report in import_rows(collection, rows, DomainListingCreate):
+                yield json.dumps(report) + "\n"
+        finally:
+            upload.close()
+            await mark_changed("domain_listings")
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
 
 @api_router.put("/admin/domains/{domain_id}", response_model=DomainListing)
 async def update_domain(domain_id: str, domain: DomainListingCreate):
-    doc = serialize_datetime(domain.model_dump())
-    result = await db.domain_listings.update_one({"id": domain_id}, {"$set": doc})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Domain not found")
-    updated_domain = await db.domain_listings.find_one({"id": domain_id}, {"_id": 0})
-    return deserialize_datetime(updated_domain)
+    return await update_and_fetch("domain_listings", domain_id, domain.model_dump(), "Domain not found")
+
+@api_router.patch("/admin/domains/{domain_id}", response_model=DomainListing)
+async def patch_domain(domain_id: str, domain: DomainListingPatch):
+    """Update only the fields present in the request body"""
+    return await update_and_fetch("domain_listings", domain_id, domain.model_dump(exclude_unset=True), "Domain not found")
 
 @api_router.delete("/admin/domains/{domain_id}")
 async def delete_domain(domain_id: str):
-    result = await db.domain_listings.delete_one({"id": domain_id})
-    if result.deleted_count == 0:
+    if not await repos.domain_listings.delete({"id": domain_id}):
         raise HTTPException(status_code=404, detail="Domain not found")
+    await mark_changed("domain_listings", deleted_id=domain_id)
     return {"message": "Domain deleted"}
 
+@api_router.post("/admin/domains/bulk", response_model=BulkResult)
+async def bulk_domains(request: BulkRequest):
+    """Apply many update/status/delete/update_many operations in one bulk_write"""
+    return await run_bulk_request(DOMAIN_BULK, request)
+
 # Settings Routes
-@api_router.get("/settings", response_model=Settings)
-async def get_settings():
-    settings = await db.settings.find_one({"id": "global_settings"}, {"_id": 0})
+async def read_settings(state: Optional[VersionState] = None) -> Any:
+    async def load():
+        return await public_repos.settings.find_one({"id": "global_settings"}, {"_id": 0})
+    settings = await cached_read(state, ("settings", "global"), load)
     if not settings:
         # Return default settings
         default_settings = Settings(
@@ -517,95 +1103,250 @@ async def get_settings():
             footer_text="DomainPBN © 2024. Premium Backlinks untuk SEO Anda."
         )
         return default_settings
-    return deserialize_datetime(settings)
+    return settings
+
+@api_router.get("/settings", response_model=Settings)
+async def get_settings(request: Request):
+    return await read_settings(request_versions(request))
 
 @api_router.put("/admin/settings", response_model=Settings)
 async def update_settings(settings: SettingsUpdate):
     settings_obj = Settings(**settings.model_dump())
-    doc = serialize_datetime(settings_obj.model_dump())
-    await db.settings.update_one(
-        {"id": "global_settings"},
-        {"$set": doc},
-        upsert=True
-    )
+    doc = settings_obj.model_dump()
+    await repos.settings.update({"id": "global_settings"}, doc, upsert=True)
+    await mark_changed("settings")
     return settings_obj
 
 # Page Content Routes
+async def read_page_contents(state: Optional[VersionState] = None) -> List[Dict[str, Any]]:
+    async def load():
+        return await public_repos.page_contents.find({}, {"_id": 0}, limit=1000)
+    return await cached_read(state, ("page_contents", "list"), load)
+
 @api_router.get("/page-content", response_model=List[PageContent])
-async def get_all_page_contents():
+async def get_all_page_contents(request: Request):
     """Get all page content templates"""
-    contents = await db.page_contents.find({}, {"_id": 0}).to_list(1000)
-    return [deserialize_datetime(content) for content in contents]
+    return await read_page_contents(request_versions(request))
 
 @api_router.get("/page-content/{page_key}", response_model=PageContent)
-async def get_page_content(page_key: str):
+async def get_page_content(page_key: str, request: Request):
     """Get specific page content by key"""
-    content = await db.page_contents.find_one({"page_key": page_key}, {"_id": 0})
+    async def load():
+        return await public_repos.page_contents.find_one({"page_key": page_key}, {"_id": 0})
+    content = await cached_read(request_versions(request), ("page_contents", "key", page_key), load)
     if not content:
         raise HTTPException(status_code=404, detail="Page content not found")
-    return deserialize_datetime(content)
+    return content
 
 @api_router.get("/admin/page-content", response_model=List[PageContent])
 async def get_admin_page_contents():
     """Get all page contents for admin"""
-    contents = await db.page_contents.find({}, {"_id": 0}).to_list(1000)
-    return [deserialize_datetime(content) for content in contents]
+    contents = await repos.page_contents.find({}, {"_id": 0}, limit=1000)
+    return fast_json(PageContent, contents)
+
+@api_router.get("/admin/page-content/export")
+async def export_page_contents(fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format")):
+    """Stream every page content template as NDJSON or CSV"""
+    rows = repos.page_contents.iterate({}, {"_id": 0}, batch_size=EXPORT_BATCH_SIZE)
+    return export_response(rows, fmt, list(PageContent.model_fields), "page-contents")
 
 @api_router.post("/admin/page-content", response_model=PageContent)
 async def create_page_content(content: PageContentCreate):
     """Create new page content"""
     content_obj = PageContent(**content.model_dump())
-    doc = serialize_datetime(content_obj.model_dump())
-    await db.page_contents.insert_one(doc)
+    doc = content_obj.model_dump()
+    await repos.page_contents.insert_one(doc)
+    await mark_changed("page_contents")
     return content_obj
 
 @api_router.put("/admin/page-content/{content_id}", response_model=PageContent)
 async def update_page_content(content_id: str, content: PageContentUpdate):
     """Update page content"""
-    doc = serialize_datetime(content.model_dump())
-    doc['updated_at'] = datetime.now(timezone.utc).isoformat()
-    result = await db.page_contents.update_one({"id": content_id}, {"$set": doc})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Page content not found")
-    updated_content = await db.page_contents.find_one({"id": content_id}, {"_id": 0})
-    return deserialize_datetime(updated_content)
+    return await update_and_fetch("page_contents", content_id, content.model_dump(), "Page content not found", touch=True)
+
+@api_router.patch("/admin/page-content/{content_id}", response_model=PageContent)
+async def patch_page_content(content_id: str, content: PageContentPatch):
+    """Update only the fields present in the request body"""
+    return await update_and_fetch("page_contents", content_id, content.model_dump(exclude_unset=True), "Page content not found", touch=True)
 
 @api_router.delete("/admin/page-content/{content_id}")
 async def delete_page_content(content_id: str):
     """Delete page content"""
-    result = await db.page_contents.delete_one({"id": content_id})
-    if result.deleted_count == 0:
+    if not await repos.page_contents.delete({"id": content_id}):
         raise HTTPException(status_code=404, detail="Page content not found")
+    await mark_changed("page_contents")
     return {"message": "Page content deleted"}
 
+# Homepage Bootstrap
+HOMEPAGE_PREVIEW_LIMIT = 6
+HOMEPAGE_BLOG_LIMIT = 3
+
+def dump_json(model: Any, value: Any) -> bytes:
+    """Validate against `model` and serialize the way response_model would"""
+    adapter = TypeAdapter(model)
+    return adapter.dump_json(adapter.validate_python(value))
+
+async def load_pbn_preview(state: VersionState) -> bytes:
+    docs = await public_repos.pbn_sites.find(
+        {"status": "active"}, {"_id": 0, "domain_real": 0, "notes": 0}, [("dr", -1), ("id", -1)],
+        limit=HOMEPAGE_PREVIEW_LIMIT,
+    )
+    return dump_json(List[PBNSitePublic], docs)
+
+async def load_domains_preview(state: VersionState) -> bytes:
+    docs = await public_repos.domain_listings.find(
+        build_domain_query(None, None, None), {"_id": 0}, [("dr", -1), ("id", -1)], limit=HOMEPAGE_PREVIEW_LIMIT
+    )
+    return dump_json(List[DomainListing], docs)
+
+async def load_latest_posts(state: VersionState) -> bytes:
+    docs = await public_repos.blog_posts.find(
+        {"is_published": True}, {"_id": 0}, [("published_at", -1)], limit=HOMEPAGE_BLOG_LIMIT
+    )
+    return dump_json(List[BlogPost], docs)
+
+def route_section(model: Any, reader) -> Callable[[VersionState], Awaitable[bytes]]:
+    """Snapshot section serving the same data as a parameterless public route"""
+    async def load(state: VersionState) -> bytes:
+        return dump_json(model, await reader(state))
+    return load
+
+homepage_snapshot = Snapshot(collection_versions, {
+    "packages": (["packages"], route_section(List[Package], read_packages)),
+    "faqs": (["faqs"], route_section(List[FAQ], read_faqs)),
+    "settings": (["settings"], route_section(Settings, read_settings)),
+    "page_content": (["page_contents"], route_section(List[PageContent], read_page_contents)),
+    "pbn_preview": (["pbn_sites"], load_pbn_preview),
+    "domains_preview": (["domain_listings"], load_domains_preview),
+    "blog_posts": (["blog_posts"], load_latest_posts),
+})
+
+@api_router.get("/bootstrap")
+async def get_bootstrap(request: Request):
+    """Everything the homepage renders, as one pre-serialized JSON document
+
+    Sections: packages, faqs, settings, page_content, pbn_preview,
+    domains_preview and blog_posts, each shaped like its own public route.
+    """
+    body = await homepage_snapshot.get(request_versions(request))
+    return Response(body, media_type="application/json")
+
+# Cache Routes
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats():
+    """Hit/miss counters of the public read and encoded response caches, coalesced requests, catalog and change feed state"""
+    return {
+        **response_cache.stats(),
+        "encoded_responses": encoded_responses.stats(),
+        "single_flight": {"enabled": SINGLE_FLIGHT_ENABLED, **response_flights.stats()},
+        "catalogs": {name: catalog.stats() for name, catalog in catalogs.items()},
+        "change_feed": change_feed.stats() if change_feed is not None else None,
+        "collection_versions": (collection_versions.stats()
+                                if isinstance(collection_versions, CachedCollectionVersions) else None),
+    }
+
 # SEO Routes
+def xml_response(body_gz: bytes, request: Request) -> Response:
+    """Send pre-gzipped XML as-is to clients that accept gzip, inflated otherwise"""
+    headers = {"Vary": "Accept-Encoding"}
+    if negotiate(request.headers.get("accept-encoding", ""), ["gzip"]) == "gzip":
+        headers["Content-Encoding"] = "gzip"
+        return Response(body_gz, media_type="application/xml", headers=headers)
+    return Response(gzip.decompress(body_gz), media_type="application/xml", headers=headers)
+
 @api_router.get("/sitemap")
-async def get_sitemap():
-    base_url = "https://linkboost-13.preview.emergentagent.com"
-    
-    sitemap = ['<?xml version="1.0" encoding="UTF-8"?>']
-    sitemap.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-    
-    # Static pages
-    static_pages = ["/", "/paket", "/pbn", "/blog", "/faq", "/about", "/tos", "/privacy"]
-    for page in static_pages:
-        sitemap.append(f"<url><loc>{base_url}{page}</loc><changefreq>weekly</changefreq><priority>0.8</priority></url>")
-    
-    # Blog posts
-    blog_posts = await db.blog_posts.find({"is_published": True}, {"slug": 1, "_id": 0}).to_list(1000)
-    for post in blog_posts:
-        sitemap.append(f"<url><loc>{base_url}/blog/{post['slug']}</loc><changefreq>monthly</changefreq><priority>0.6</priority></url>")
-    
-    sitemap.append('</urlset>')
-    return "\n".join(sitemap)
+async def get_sitemap(request: Request):
+    """Sitemap index listing the static, blog and pages shards"""
+    return xml_response(await sitemaps.get_index(), request)
+
+@api_router.get("/sitemap/{name}.xml")
+async def get_sitemap_shard(name: str, request: Request):
+    body = await sitemaps.get_shard(name)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    return xml_response(body, request)
 
 @api_router.get("/robots")
 async def get_robots():
-    return """User-agent: *\nAllow: /\n\nSitemap: https://linkboost-13.preview.emergentagent.com/api/sitemap"""
+    return f"""User-agent: *\nAllow: /\n\nSitemap: {SITE_URL}/api/sitemap"""
+
+def collect_cache_metrics(registry: MetricsRegistry) -> None:
+    gauge = registry.gauge("response_cache", "Public read and encoded response cache counters")
+    with registry.lock:
+        for name, cache in (("reads", response_cache), ("encoded", encoded_responses)):
+            stats = cache.stats()
+            for key in ("entries", "hits", "misses", "evictions", "invalidations"):
+                gauge.set((("cache", name), ("stat", key)), stats[key])
+
+def collect_single_flight_metrics(registry: MetricsRegistry) -> None:
+    gauge = registry.gauge("single_flight_requests", "Public GETs that ran the route (leader) or shared a concurrent identical one (coalesced)")
+    with registry.lock:
+        for route, counts in response_flights.stats()["routes"].items():
+            for role in ("leaders", "coalesced"):
+                gauge.set((("route", route), ("role", role)), counts[role])
+
+def collect_catalog_metrics(registry: MetricsRegistry) -> None:
+    gauge = registry.gauge("catalog_index", "Catalog snapshot rows, reloads, in-place updates and last build time")
+    with registry.lock:
+        for name, catalog in catalogs.items():
+            stats = catalog.stats()
+            for key in ("rows", "reloads", "local_updates", "build_ms"):
+                gauge.set((("collection", name), ("stat", key)), stats[key])
+
+def collect_change_feed_metrics(registry: MetricsRegistry) -> None:
+    if change_feed is None:
+        return
+    gauge = registry.gauge("change_feed_events", "Changes received by the cache invalidation feed per collection")
+    with registry.lock:
+        stats = change_feed.stats()
+        for name, count in stats["events"].items():
+            gauge.set((("collection", name), ("source", stats["active"] or "none")), count)
+
+metrics.add_collector(collect_cache_metrics)
+metrics.add_collector(collect_single_flight_metrics)
+metrics.add_collector(collect_catalog_metrics)
+metrics.add_collector(collect_change_feed_metrics)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of request, MongoDB and cache metrics"""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# gzip / br for responses of at least COMPRESSION_MIN_SIZE bytes
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')),
+    gzip_level=int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6')),
+    brotli_quality=int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5')),
+    cache=encoded_responses,
+)
+
+# Between the two: keyed on the ETag, shares the encoded response
+if SINGLE_FLIGHT_ENABLED:
+    app.add_middleware(SingleFlightMiddleware, flights=response_flights, routes=app.routes)
+
+# Public GET routes and the collections their responses are derived from
+app.add_middleware(
+    ConditionalGetMiddleware,
+    versions=collection_versions,
+    routes={
+        "/api/pbn": ["pbn_sites"],
+        "/api/packages": ["packages"],
+        "/api/blog": ["blog_posts"],
+        "/api/faq": ["faqs"],
+        "/api/pages": ["pages"],
+        "/api/domains": ["domain_listings"],
+        "/api/settings": ["settings"],
+        "/api/page-content": ["page_contents"],
+        "/api/search": ["blog_posts"],
+        "/api/bootstrap": homepage_snapshot.collections,
+        "/api/sitemap": ["packages", "pbn_sites", "domain_listings", "blog_posts", "faqs", "pages"],
+    },
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -614,6 +1355,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so 304s and CORS preflights are timed too
+app.add_middleware(MetricsMiddleware, registry=metrics, routes=app.routes)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -621,6 +1365,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    if db is None:
+        return
+    applied = await ensure_indexes(db)
+    logger.info("Indexes ready on %d collections", len(applied))
+
+@app.on_event("startup")
+async def seed_memory_repositories():
+    """Fill the in-memory backend with fixed content and synthetic catalog rows"""
+    if REPOSITORY_BACKEND != 'memory' or not MEMORY_SEED_ROWS:
+        return
+    for name, docs in fixed_content().items():
+        await repos[name].insert_many(docs)
+    for name in ("pbn_sites", "domain_listings", "blog_posts"):
+        await repos[name].insert_many(generate(name, MEMORY_SEED_ROWS))
+    await repos.page_contents.insert_many(generate("page_contents", 8))
+    logger.info("In-memory repositories seeded with %d rows per catalog collection", MEMORY_SEED_ROWS)
+
+@app.on_event("startup")
+async def start_change_feed():
+    if change_feed is not None:
+        change_feed.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    if change_feed is not None:
+        await change_feed.stop()
+    if client is not None:
+        client.close()
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Request coalescing (single-flight) for identical concurrent public reads.
+
+When a blog post goes viral, hundreds of requests for the same URL can
+arrive before the first one has been answered. The read cache, the encoded
+response cache and the catalog snapshot only help once a result exists; until
+then every request runs the route, issues the same MongoDB query and
+serializes the same body.
+
+SingleFlightMiddleware sits between ConditionalGetMiddleware and
+CompressionMiddleware. For a public GET, the ETag computed by the former
+already identifies the representation: path, query string, collection
+versions and negotiated coding. The first request for an ETag (the leader)
+runs the route and compression. Requests for the same ETag that arrive while
+it is running wait for it and are sent the same status, headers and encoded
+body. A write changes the versions, hence the ETag, so a request made after
+a write never joins a flight started before it.
+
+If the leader fails, its followers get the same error. If it is cancelled,
+they start their own flight instead.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """At most one call in flight per key; concurrent callers with the same key share its result"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        # label -> [leaders, coalesced]
+        self.counts: Dict[str, List[int]] = {}
+
+    def _count(self, label: str, coalesced: bool) -> None:
+        counts = self.counts.setdefault(label, [0, 0])
+        counts[1 if coalesced else 0] += 1
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]], label: str = "") -> Tuple[Any, bool]:
+        """(result, coalesced): await `call()`, or the identical call already running for `key`"""
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            try:
+                result = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The leader was cancelled, not this caller: run it ourselves
+                continue
+            self._count(label, True)
+            return result, True
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self._count(label, False)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            # Followers re-raise it; mark it retrieved for callers without any
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result, False
+        finally:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        leaders = sum(counts[0] for counts in self.counts.values())
+        coalesced = sum(counts[1] for counts in self.counts.values())
+        return {
+            "in_flight": len(self._flights),
+            "leaders": leaders,
+            "coalesced": coalesced,
+            "coalesced_ratio": round(coalesced / (leaders + coalesced), 4) if leaders + coalesced else 0.0,
+            "routes": {label: {"leaders": counts[0], "coalesced": counts[1]}
+                       for label, counts in sorted(self.counts.items())},
+        }
+
+
+class SingleFlightMiddleware:
+    """ASGI middleware sharing one response between concurrent GETs for the same ETag"""
+
+    def __init__(self, app, flights: Optional[SingleFlight] = None, routes: Optional[list] = None):
+        self.app = app
+        self.flights = flights if flights is not None else SingleFlight()
+        # Used to label the counters with the route template
+        self.routes = routes if routes is not None else []
+
+    async def __call__(self, scope, receive, send):
+        etag = scope.get("state", {}).get("etag") if scope["type"] == "http" and scope["method"] == "GET" else None
+        if etag is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def respond() -> List[Dict[str, Any]]:
+            messages: List[Dict[str, Any]] = []
+
+            async def capture(message):
+                messages.append(message)
+
+            await self.app(scope, receive, capture)
+            return messages
+
+        messages, _ = await self.flights.do(("responses", etag), respond, route_template(scope, self.routes))
+        for message in messages:
+            # Downstream middleware add headers in place; each request gets its own copy
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message["headers"])}
+            await send(message)
@@ -0,0 +1,173 @@
+"""Sharded, gzip-compressed sitemap kept up to date by the admin write handlers.
+
+The sitemap is split into sections (static routes, blog posts, pages), each
+cut into shards of at most 50,000 URLs as the sitemaps.org spec requires,
+and listed in a sitemap index. A section is rebuilt only when the version of
+one of its source collections (see conditional.CollectionVersions) moved
+since it was last built, so crawler hits are served from memory and an edit
+to a blog post never regenerates the pages shard.
+"""
+import asyncio
+import gzip
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_URL_LIMIT = 50_000
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+# Listing routes of the frontend and the collection whose edits change them
+STATIC_ROUTES: List[Tuple[str, Optional[str]]] = [
+    ("/", None),
+    ("/paket", "packages"),
+    ("/pbn", "pbn_sites"),
+    ("/domains", "domain_listings"),
+    ("/blog", "blog_posts"),
+    ("/faq", "faqs"),
+]
+
+SECTIONS: Dict[str, List[str]] = {
+    "static": ["packages", "pbn_sites", "domain_listings", "blog_posts", "faqs"],
+    "blog": ["blog_posts"],
+    "pages": ["pages"],
+}
+SOURCE_COLLECTIONS = sorted({name for collections in SECTIONS.values() for name in collections})
+
+Entry = Tuple[str, Optional[datetime], str, str]  # path, lastmod, changefreq, priority
+
+
+def _lastmod(doc: dict) -> Optional[datetime]:
+    stamps = [doc.get(key) for key in ("updated_at", "published_at", "created_at")]
+    stamps = [stamp for stamp in stamps if isinstance(stamp, datetime)]
+    return max(stamps) if stamps else None
+
+
+def _w3c(stamp: Optional[datetime]) -> str:
+    return stamp.strftime("%Y-%m-%dT%H:%M:%S+00:00") if stamp else ""
+
+
+def render_urlset(base_url: str, entries: Iterable[Entry]) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>', f'<urlset xmlns="{XMLNS}">']
+    for path, lastmod, changefreq, priority in entries:
+        lastmod_tag = f"<lastmod>{_w3c(lastmod)}</lastmod>" if lastmod else ""
+        parts.append(
+            f"<url><loc>{escape(base_url + path)}</loc>{lastmod_tag}"
+            f"<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>"
+        )
+    parts.append("</urlset>")
+    return gzip.compress("\n".join(parts).encode(), compresslevel=6)
+
+
+def render_index(base_url: str, shards: Iterable[Tuple[str, Optional[datetime]]]) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>', f'<sitemapindex xmlns="{XMLNS}">']
+    for name, lastmod in shards:
+        lastmod_tag = f"<lastmod>{_w3c(lastmod)}</lastmod>" if lastmod else ""
+        parts.append(f"<sitemap><loc>{escape(base_url)}/api/sitemap/{name}.xml</loc>{lastmod_tag}</sitemap>")
+    parts.append("</sitemapindex>")
+    return gzip.compress("\n".join(parts).encode(), compresslevel=6)
+
+
+class SitemapBuilder:
+    """Holds the gzipped sitemap index and shards, rebuilding stale sections"""
+
+    def __init__(self, repos, base_url: str, versions):
+        self.repos = repos
+        self.base_url = base_url.rstrip("/")
+        self.versions = versions
+        self.shards: Dict[str, Dict[str, Tuple[bytes, Optional[datetime]]]] = {}
+        self.built_versions: Dict[str, Dict[str, int]] = {}
+        self.index: Optional[bytes] = None
+        self._lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _static_entries(self, state) -> List[Entry]:
+        stamps = [updated_at for _, updated_at in state.values() if updated_at]
+        entries = []
+        for path, collection in STATIC_ROUTES:
+            lastmod = state[collection][1] if collection else (max(stamps) if stamps else None)
+            entries.append((path, lastmod, "weekly" if path == "/" else "daily", "1.0" if path == "/" else "0.8"))
+        return entries
+
+    async def _blog_entries(self) -> List[Entry]:
+        rows = self.repos.blog_posts.iterate(
+            {"is_published": True},
+            {"_id": 0, "slug": 1, "published_at": 1, "created_at": 1, "updated_at": 1},
+            [("published_at", -1)],
+            batch_size=5000,
+        )
+        return [(f"/blog/{doc['slug']}", _lastmod(doc), "monthly", "0.6") async for doc in rows]
+
+    async def _page_entries(self) -> List[Entry]:
+        rows = self.repos.pages.iterate(
+            {"is_published": True},
+            {"_id": 0, "slug": 1, "created_at": 1, "updated_at": 1},
+        )
+        return [(f"/{doc['slug']}", _lastmod(doc), "monthly", "0.5") async for doc in rows]
+
+    async def _build_section(self, section: str, state) -> None:
+        if section == "static":
+            entries = self._static_entries(state)
+        elif section == "blog":
+            entries = await self._blog_entries()
+        else:
+            entries = await self._page_entries()
+        shards = {}
+        for start in range(0, max(len(entries), 1), SITEMAP_URL_LIMIT):
+            chunk = entries[start:start + SITEMAP_URL_LIMIT]
+            stamps = [lastmod for _, lastmod, _, _ in chunk if lastmod]
+            name = section if start == 0 else f"{section}-{start // SITEMAP_URL_LIMIT + 1}"
+            shards[name] = (render_urlset(self.base_url, chunk), max(stamps) if stamps else None)
+        self.shards[section] = shards
+
+    def _stale(self, state) -> List[str]:
+        """Sections not built, or built from other versions than those in `state`"""
+        return [section for section, collections in SECTIONS.items()
+                if section not in self.shards
+                or self.built_versions.get(section) != {name: state[name][0] for name in collections}]
+
+    async def refresh(self) -> None:
+        """Rebuild every section whose source collections changed since the last build"""
+        # Crawler hits on an unchanged sitemap only compare versions, without queueing on the lock
+        if self.index is not None and not self._stale(await self.versions.get(SOURCE_COLLECTIONS)):
+            return
+        async with self._lock:
+            # Read again: a rebuild that held the lock meanwhile may have caught up
+            state = await self.versions.get(SOURCE_COLLECTIONS)
+            rebuilt = []
+            for section in self._stale(state):
+                await self._build_section(section, state)
+                self.built_versions[section] = {name: state[name][0] for name in SECTIONS[section]}
+                rebuilt.append(section)
+            if rebuilt or self.index is None:
+                listing = [(name, lastmod) for shards in self.shards.values()
+                           for name, (_, lastmod) in shards.items()]
+                self.index = render_index(self.base_url, listing)
+                logger.info("Sitemap sections rebuilt: %s", ", ".join(rebuilt) or "index")
+
+    def notify(self, collection: str) -> None:
+        """Schedule a background rebuild after an admin write to `collection`"""
+        if not any(collection in collections for collections in SECTIONS.values()):
+            return
+        task = asyncio.create_task(self._refresh_logged())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh_logged(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Background sitemap rebuild failed")
+
+    async def get_index(self) -> bytes:
+        await self.refresh()
+        return self.index
+
+    async def get_shard(self, name: str) -> Optional[bytes]:
+        await self.refresh()
+        for shards in self.shards.values():
+            if name in shards:
+                return shards[name][0]
+        return None
@@ -0,0 +1,149 @@
+"""Slow-query log for the listing routes, with explain("executionStats") capture.
+
+Listing handlers run their finds through SlowQueryLog.find(). A find slower
+than SLOW_QUERY_MS is logged as one JSON line with the route, the exact
+filter/sort/skip/limit, its duration and a summary of the executionStats
+explain (keys and documents examined vs returned, winning plan stages).
+
+Logging is rate-limited so a pathological filter hammered by a crawler cannot
+turn the log itself into a hot path: each query shape (the filter with its
+values blanked out) is reported at most once per SLOW_QUERY_LOG_INTERVAL
+seconds, at most SLOW_QUERY_MAX_PER_MINUTE reports are made overall, and the
+explain runs in a background task, one at a time, after the response is sent.
+"""
+import asyncio
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import Request
+
+from indexes import plan_stages
+
+logger = logging.getLogger(__name__)
+
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+
+async def track_route(request: Request) -> None:
+    """Router dependency remembering which request issued the queries that follow"""
+    route = request.scope.get("route")
+    label = f"{request.method} {getattr(route, 'path', request.url.path)}"
+    if request.url.query:
+        label += f"?{request.url.query}"
+    current_route.set(label)
+
+
+def query_shape(value: Any) -> Any:
+    """The filter with every value replaced by 1, so `dr >= 40` and `dr >= 50` match"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [query_shape(item) for item in value] if value and isinstance(value[0], dict) else 1
+    return 1
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    stats = explain.get("executionStats", {})
+    returned = stats.get("nReturned", 0)
+    return {
+        "stages": plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {})),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "returned": returned,
+        "execution_ms": stats.get("executionTimeMillis"),
+        "docs_examined_per_returned": round(stats.get("totalDocsExamined", 0) / max(returned, 1), 1),
+    }
+
+
+class SlowQueryLog:
+    """Times finds and reports the slow ones with their query plan"""
+
+    def __init__(self, threshold_ms: float = 200, interval: float = 60, max_per_minute: int = 30):
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self.max_per_minute = max_per_minute
+        self._last_reported: Dict[str, float] = {}
+        self._window_start = 0.0
+        self._window_count = 0
+        self._explain_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def find(self, collection, query: Dict[str, Any], projection: Optional[Dict[str, Any]] = None,
+                   sort: Optional[List[Any]] = None, skip: int = 0, limit: int = 0) -> List[Dict[str, Any]]:
+        """collection.find(...).to_list() that reports itself when slow"""
+        cursor = collection.find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        start = time.perf_counter()
+        docs = await cursor.to_list(limit or None)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= self.threshold_ms and self.threshold_ms > 0:
+            self.report(collection, query, projection, sort, skip, limit, elapsed_ms)
+        return docs
+
+    def _allow(self, shape_key: str) -> bool:
+        now = time.monotonic()
+        if now - self._last_reported.get(shape_key, -self.interval) < self.interval:
+            return False
+        if now - self._window_start >= 60:
+            self._window_start, self._window_count = now, 0
+            # Forget shapes whose interval has long passed so the dict stays small
+            self._last_reported = {key: stamp for key, stamp in self._last_reported.items()
+                                   if now - stamp < self.interval}
+        if self._window_count >= self.max_per_minute:
+            return False
+        self._window_count += 1
+        self._last_reported[shape_key] = now
+        return True
+
+    def report(self, collection, query, projection, sort, skip, limit, elapsed_ms: float) -> None:
+        shape_key = json.dumps([collection.name, query_shape(query), sort], sort_keys=True, default=str)
+        if not self._allow(shape_key):
+            return
+        record = {
+            "event": "slow_query",
+            "route": current_route.get(),
+            "collection": collection.name,
+            "filter": query,
+            "sort": sort,
+            "skip": skip,
+            "limit": limit,
+            "duration_ms": round(elapsed_ms, 1),
+            "threshold_ms": self.threshold_ms,
+        }
+        task = asyncio.create_task(self._explain_and_log(collection, projection, record))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain_and_log(self, collection, projection, record: Dict[str, Any]) -> None:
+        if self._explain_lock.locked():
+            record["explain"] = {"skipped": "another explain is running"}
+        else:
+            async with self._explain_lock:
+                record["explain"] = await self._explain(collection, projection, record)
+        logger.warning(json.dumps(record, default=str))
+
+    async def _explain(self, collection, projection, record: Dict[str, Any]) -> Dict[str, Any]:
+        command: Dict[str, Any] = {"find": collection.name, "filter": record["filter"]}
+        if projection:
+            command["projection"] = projection
+        if record["sort"]:
+            command["sort"] = {field: direction for field, direction in record["sort"]}
+        if record["skip"]:
+            command["skip"] = record["skip"]
+        if record["limit"]:
+            command["limit"] = record["limit"]
+        try:
+            explain = await collection.database.command(
+                {"explain": command, "verbosity": "executionStats"}
+            )
+        except Exception as exc:
+            return {"error": str(exc)}
+        return summarize_explain(explain)
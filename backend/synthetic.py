@@ -0,0 +1,173 @@
+"""Synthetic DomainPBN documents at any scale, modelled on the seed scripts.
+
+The vocabularies come from seed_data.py / seed_data_extended.py; the metric
+distributions are skewed the way a real inventory is (most sites cluster at
+mid DR, traffic is long-tailed, price follows DR) so filters, sorts and
+facets see realistic selectivity. Every generator is deterministic for a
+given seed.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+NICHES = ["Technology", "Health & Wellness", "Finance", "Travel", "Business",
+          "Lifestyle", "Education", "Real Estate", "Marketing", "E-commerce",
+          "Food & Recipe", "Fashion", "Sports", "Gaming", "Automotive"]
+
+BLOG_TOPICS = [
+    "Apa Itu PBN dan Mengapa Penting untuk SEO",
+    "Kesalahan Fatal Saat Membeli Backlink PBN",
+    "Cara Memilih PBN Berkualitas untuk Website Anda",
+    "PBN vs Guest Post: Mana yang Lebih Baik",
+    "Panduan Lengkap Backlink Strategy",
+    "Metrics PBN yang Harus Anda Perhatikan",
+    "Aged Domain: Investasi Terbaik untuk SEO",
+    "Backlink Natural vs PBN: Pro dan Kontra",
+    "Link Building Strategy untuk E-commerce",
+    "Menghindari Google Penalty dari Backlink",
+    "Diversifikasi Anchor Text untuk Backlink",
+    "Niche Relevance dalam PBN",
+]
+
+PARAGRAPH = ("Artikel ini membahas secara mendalam strategi dan best practices dalam SEO "
+             "dan backlink management. Lorem ipsum dolor sit amet, consectetur adipiscing "
+             "elit. Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.")
+
+DOMAIN_KEYWORDS = ["tech", "health", "finance", "travel", "business", "lifestyle",
+                   "education", "property", "marketing", "shop", "digital", "global",
+                   "prime", "expert", "pro", "best", "top", "smart", "fast", "secure"]
+DOMAIN_SUFFIXES = ["hub", "zone", "guide", "site", "web", ""]
+TLDS = [".com", ".net", ".org", ".co", ".io"]
+REGISTRARS = ["GoDaddy", "Namecheap", "Google Domains", "Cloudflare", "Porkbun"]
+
+PAGE_KEYS = ["homepage_hero", "homepage_features", "homepage_cta", "pbn_hero",
+             "packages_hero", "domains_hero", "faq_hero", "blog_hero"]
+
+
+def _dr(rng: random.Random) -> int:
+    return max(5, min(95, int(rng.gauss(50, 14))))
+
+
+def pbn_site(i: int, rng: random.Random, now: datetime) -> Dict[str, Any]:
+    doc_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    niche = rng.choice(NICHES)
+    dr = _dr(rng)
+    # Keys in model_dump() order, like documents written by the admin handlers
+    return {
+        "code": f"PBN-{i:06d}",
+        "domain_real": f"example{i}.com",
+        "niche": niche,
+        "dr": dr,
+        "da": max(1, dr - rng.randint(0, 6)),
+        "traffic": int(rng.lognormvariate(9, 1)),
+        "spam_score": round(rng.uniform(0.3, 2.5), 1),
+        "age": rng.randint(2, 15),
+        # Price tracks DR in steps of 10k IDR, like the hand-written seed rows
+        "price_per_post": max(50000, int(round(dr * 2500 + rng.gauss(0, 15000), -4))),
+        "status": "active" if rng.random() < 0.9 else "hidden",
+        "notes": f"{niche} authority site",
+        "id": doc_id,
+        "created_at": now - timedelta(minutes=i),
+    }
+
+
+def domain_listing(i: int, rng: random.Random, now: datetime) -> Dict[str, Any]:
+    doc_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    name = f"{rng.choice(DOMAIN_KEYWORDS)}{rng.choice(DOMAIN_SUFFIXES)}{i}{rng.choice(TLDS)}"
+    dr = _dr(rng)
+    roll = rng.random()
+    return {
+        "domain_name": name,
+        "da": max(1, dr - rng.randint(0, 8)),
+        "pa": max(1, dr - rng.randint(2, 12)),
+        "ur": max(1, dr - rng.randint(5, 15)),
+        "dr": dr,
+        "tf": max(1, dr - rng.randint(10, 25)),
+        "cf": max(1, dr - rng.randint(5, 20)),
+        "price": max(1000000, int(round(dr * 200000 + rng.gauss(0, 1500000), -5))),
+        "web_archive_history": f"https://web.archive.org/web/*/{name}",
+        "age": rng.randint(3, 20),
+        "registrar": rng.choice(REGISTRARS),
+        "status": "available" if roll < 0.8 else ("sold" if roll < 0.95 else "reserved"),
+        "notes": None,
+        "id": doc_id,
+        "created_at": now - timedelta(minutes=i),
+    }
+
+
+def blog_post(i: int, rng: random.Random, now: datetime) -> Dict[str, Any]:
+    doc_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    title = f"{rng.choice(BLOG_TOPICS)} #{i}"
+    published = now - timedelta(hours=i)
+    return {
+        "title": title,
+        "slug": f"post-{i}",
+        "excerpt": f"Pelajari {title.lower()} dengan panduan lengkap ini. Tips praktis untuk SEO.",
+        "content": f"<h2>{title}</h2>" + f"<p>{PARAGRAPH}</p>" * rng.randint(3, 12),
+        "thumbnail": None,
+        "meta_title": f"{title} | DomainPBN",
+        "meta_description": f"Panduan lengkap {title}.",
+        "is_published": rng.random() < 0.95,
+        "id": doc_id,
+        "published_at": published,
+        "created_at": published,
+    }
+
+
+def page_content(i: int, rng: random.Random, now: datetime) -> Dict[str, Any]:
+    key = PAGE_KEYS[i - 1] if i <= len(PAGE_KEYS) else f"section_{i}"
+    return {
+        "page_key": key,
+        "section": key.replace("_", " ").title(),
+        "content": {"title": f"Judul {key}", "description": PARAGRAPH},
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "updated_at": now,
+    }
+
+
+GENERATORS = {
+    "pbn_sites": pbn_site,
+    "domain_listings": domain_listing,
+    "blog_posts": blog_post,
+    "page_contents": page_content,
+}
+
+
+def generate(collection: str, count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Yield `count` documents for one of the GENERATORS collections"""
+    rng = random.Random(f"{collection}:{seed}")
+    now = datetime.now(timezone.utc)
+    make = GENERATORS[collection]
+    for i in range(1, count + 1):
+        yield make(i, rng, now)
+
+
+def fixed_content() -> Dict[str, List[Dict[str, Any]]]:
+    """Small hand-sized collections every environment needs (packages, FAQ, pages, settings)"""
+    now = datetime.now(timezone.utc)
+    packages = [
+        {"name": name, "slug": name.lower().replace(" ", "-"), "backlink_count": count, "price": price,
+         "description": f"{count} backlink PBN berkualitas", "is_popular": name == "Paket Pro",
+         "sort_order": order, "is_active": True, "id": str(uuid.uuid4()), "created_at": now}
+        for order, (name, count, price) in enumerate(
+            [("Paket Starter", 5, 500000), ("Paket Pro", 15, 1350000), ("Paket Enterprise", 40, 3200000)], 1)
+    ]
+    faqs = [
+        {"question": f"Pertanyaan umum #{n}?", "answer": PARAGRAPH, "sort_order": n,
+         "is_active": True, "id": str(uuid.uuid4()), "created_at": now}
+        for n in range(1, 6)
+    ]
+    pages = [
+        {"title": title, "slug": slug, "content": f"<p>{PARAGRAPH}</p>", "is_published": True,
+         "id": str(uuid.uuid4()), "created_at": now}
+        for title, slug in [("Tentang Kami", "about"), ("Syarat & Ketentuan", "tos"), ("Kebijakan Privasi", "privacy")]
+    ]
+    settings = [{
+        "site_name": "DomainPBN", "logo": None,
+        "tagline": "Premium PBN Backlinks - Harga Murah, Kualitas Tinggi",
+        "whatsapp_number": "6281234567890", "telegram_username": "domainpbn",
+        "footer_text": "DomainPBN © 2024. Premium Backlinks untuk SEO Anda.",
+        "social_links": None, "id": "global_settings", "updated_at": now,
+    }]
+    return {"packages": packages, "faqs": faqs, "pages": pages, "settings": settings}
@@ -54,9 +54,8 @@ function App() {
           <Route path="/blog" element={<PublicLayout><BlogListPage /></PublicLayout>} />
           <Route path="/blog/:slug" element={<PublicLayout><BlogDetailPage /></PublicLayout>} />
           <Route path="/faq" element={<PublicLayout><FAQPage /></PublicLayout>} />
-          <Route path="/about" element={<PublicLayout><StaticPage /></PublicLayout>} />
-          <Route path="/tos" element={<PublicLayout><StaticPage /></PublicLayout>} />
-          <Route path="/privacy" element={<PublicLayout><StaticPage /></PublicLayout>} />
+          {/* CMS pages (about, tos, privacy, ...); StaticPage loads them by slug */}
+          <Route path="/:slug" element={<PublicLayout><StaticPage /></PublicLayout>} />
 
           {/* Admin Routes */}
           <Route path="/admin" element={<AdminLayout />}>
@@ -13,9 +13,13 @@ const apiClient = axios.create({
 // PBN API
 export const pbnAPI = {
   getPublic: (params) => apiClient.get('/pbn', { params }),
+  getFacets: (params) => apiClient.get('/pbn/facets', { params }),
   getAll: () => apiClient.get('/admin/pbn'),
+  export: (format = 'ndjson') => apiClient.get('/admin/pbn/export', { params: { format }, responseType: 'blob' }),
   create: (data) => apiClient.post('/admin/pbn', data),
   update: (id, data) => apiClient.put(`/admin/pbn/${id}`, data),
+  patch: (id, data) => apiClient.patch(`/admin/pbn/${id}`, data),
+  bulk: (operations) => apiClient.post('/admin/pbn/bulk', { operations }),
   delete: (id) => apiClient.delete(`/admin/pbn/${id}`),
 };
 
@@ -25,6 +29,7 @@ export const packagesAPI = {
   getAll: () => apiClient.get('/admin/packages'),
   create: (data) => apiClient.post('/admin/packages', data),
   update: (id, data) => apiClient.put(`/admin/packages/${id}`, data),
+  patch: (id, data) => apiClient.patch(`/admin/packages/${id}`, data),
   delete: (id) => apiClient.delete(`/admin/packages/${id}`),
 };
 
@@ -33,8 +38,10 @@ export const blogAPI = {
   getList: (params) => apiClient.get('/blog', { params }),
   getBySlug: (slug) => apiClient.get(`/blog/${slug}`),
   getAll: () => apiClient.get('/admin/blog'),
+  export: (format = 'ndjson') => apiClient.get('/admin/blog/export', { params: { format }, responseType: 'blob' }),
   create: (data) => apiClient.post('/admin/blog', data),
   update: (id, data) => apiClient.put(`/admin/blog/${id}`, data),
+  patch: (id, data) => apiClient.patch(`/admin/blog/${id}`, data),
   delete: (id) => apiClient.delete(`/admin/blog/${id}`),
 };
 
@@ -44,6 +51,7 @@ export const faqAPI = {
   getAll: () => apiClient.get('/admin/faq'),
   create: (data) => apiClient.post('/admin/faq', data),
   update: (id, data) => apiClient.put(`/admin/faq/${id}`, data),
+  patch: (id, data) => apiClient.patch(`/admin/faq/${id}`, data),
   delete: (id) => apiClient.delete(`/admin/faq/${id}`),
 };
 
@@ -53,9 +61,15 @@ export const pagesAPI = {
   getAll: () => apiClient.get('/admin/pages'),
   create: (data) => apiClient.post('/admin/pages', data),
   update: (id, data) => apiClient.put(`/admin/pages/${id}`, data),
+  patch: (id, data) => apiClient.patch(`/admin/pages/${id}`, data),
   delete: (id) => apiClient.delete(`/admin/pages/${id}`),
 };
 
+// Homepage bundle (packages, FAQ, settings, page content and previews)
+export const bootstrapAPI = {
+  get: () => apiClient.get('/bootstrap'),
+};
+
 // Settings API
 export const settingsAPI = {
   get: () => apiClient.get('/settings'),
@@ -65,10 +79,21 @@ export const settingsAPI = {
 // Domain Listing API
 export const domainsAPI = {
   getPublic: (params) => apiClient.get('/domains', { params }),
+  getFacets: (params) => apiClient.get('/domains/facets', { params }),
   getAll: () => apiClient.get('/admin/domains'),
+  export: (format = 'ndjson') => apiClient.get('/admin/domains/export', { params: { format }, responseType: 'blob' }),
   create: (data) => apiClient.post('/admin/domains', data),
   importBulk: (data) => apiClient.post('/admin/domains/import', data),
+  importStream: (file, contentType = 'text/csv') =>
+    apiClient.post('/admin/domains/import/stream', file, {
+      headers: { 'Content-Type': contentType },
+      // One JSON report per line; the caller parses them
+      responseType: 'text',
+      transformResponse: (data) => data,
+    }),
   update: (id, data) => apiClient.put(`/admin/domains/${id}`, data),
+  patch: (id, data) => apiClient.patch(`/admin/domains/${id}`, data),
+  bulk: (operations) => apiClient.post('/admin/domains/bulk', { operations }),
   delete: (id) => apiClient.delete(`/admin/domains/${id}`),
 };
 
@@ -77,8 +102,10 @@ export const pageContentAPI = {
   getAll: () => apiClient.get('/page-content'),
   getByKey: (key) => apiClient.get(`/page-content/${key}`),
   getAllAdmin: () => apiClient.get('/admin/page-content'),
+  export: (format = 'ndjson') => apiClient.get('/admin/page-content/export', { params: { format }, responseType: 'blob' }),
   create: (data) => apiClient.post('/admin/page-content', data),
   update: (id, data) => apiClient.put(`/admin/page-content/${id}`, data),
+  patch: (id, data) => apiClient.patch(`/admin/page-content/${id}`, data),
   delete: (id) => apiClient.delete(`/admin/page-content/${id}`),
 };
 
@@ -100,7 +100,7 @@ const DomainImport = ({ onSuccess, onCancel }) => {
 
       if (errors.length === 0) {
         // Clean and convert data
-        validatedData.push({
+        const domain = {
           domain_name: row.domain_name?.toString().trim() || '',
           da: parseInt(row.da) || 0,
           pa: parseInt(row.pa) || 0,
@@ -109,12 +109,18 @@ const DomainImport = ({ onSuccess, onCancel }) => {
           tf: parseInt(row.tf) || 0,
           cf: parseInt(row.cf) || 0,
           price: parseInt(row.price) || 0,
-          web_archive_history: row.web_archive_history?.toString().trim() || '',
           age: parseInt(row.age) || 0,
           registrar: row.registrar?.toString().trim() || '',
-          status: row.status?.toString().trim() || 'available',
-          notes: row.notes?.toString().trim() || '',
+        };
+        // Optional columns are only sent when filled in, so re-importing a
+        // domain keeps its current status and notes
+        ['web_archive_history', 'status', 'notes'].forEach(field => {
+          const value = row[field]?.toString().trim();
+          if (value) {
+            domain[field] = value;
+          }
         });
+        validatedData.push(domain);
       } else {
         validationErrors.push(...errors);
       }
@@ -140,8 +146,18 @@ const DomainImport = ({ onSuccess, onCancel }) => {
 
     try {
       setImporting(true);
-      const response = await domainsAPI.importBulk(parsedData);
-      toast.success(response.data.message);
+      const body = parsedData.map((domain) => JSON.stringify(domain)).join('\n');
+      const response = await domainsAPI.importStream(body, 'application/x-ndjson');
+      const reports = response.data.split('\n').filter(Boolean).map((line) => JSON.parse(line));
+      const summary = reports[reports.length - 1];
+      const rowErrors = reports.flatMap((report) => report.errors || []);
+      toast.success(`${summary.inserted + summary.updated} domains imported successfully`);
+      if (rowErrors.length > 0) {
+        // Stay on the page so the rejected rows can be fixed
+        setErrors(rowErrors.map((error) => `Row ${error.row}: ${error.errors.join(', ')}`));
+        toast.error(`${rowErrors.length} rows failed to import`);
+        return;
+      }
       onSuccess();
     } catch (error) {
       console.error('Error importing domains:', error);
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { ArrowRight, Shield, Zap, TrendingUp, CheckCircle } from 'lucide-react';
-import { packagesAPI, pbnAPI, blogAPI, settingsAPI, domainsAPI } from '../api/client';
+import { bootstrapAPI } from '../api/client';
 import { generateWhatsAppMessage, getWhatsAppURL } from '../utils/whatsapp';
 import { formatIDR, formatNumber } from '../utils/format';
 import SEOHead from '../components/SEOHead';
@@ -17,18 +17,12 @@ const Homepage = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [pkgRes, pbnRes, domainsRes, blogRes, settingsRes] = await Promise.all([
-          packagesAPI.getPublic(),
-          pbnAPI.getPublic({ sort_by: 'dr', limit: 6 }),
-          domainsAPI.getPublic({ sort_by: 'dr', limit: 6 }),
-          blogAPI.getList({ limit: 3 }),
-          settingsAPI.get(),
-        ]);
-        setPackages(pkgRes.data.slice(0, 3));
-        setPbnSites(pbnRes.data);
-        setAgedDomains(domainsRes.data);
-        setBlogPosts(blogRes.data);
-        setSettings(settingsRes.data);
+        const { data } = await bootstrapAPI.get();
+        setPackages(data.packages.slice(0, 3));
+        setPbnSites(data.pbn_preview);
+        setAgedDomains(data.domains_preview);
+        setBlogPosts(data.blog_posts);
+        setSettings(data.settings);
       } catch (error) {
         console.error('Error fetching data:', error);
       } finally {
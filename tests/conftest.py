@@ -0,0 +1,24 @@
+import os
+import sys
+from pathlib import Path
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Importing server needs no MongoDB with the in-memory repositories
+os.environ.setdefault("REPOSITORY_BACKEND", "memory")
+# Seed rows for the API tests; seeding runs once per app startup
+os.environ.setdefault("MEMORY_SEED_ROWS", "200")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient on the app with seeded in-memory repositories, started once per session"""
+    from fastapi.testclient import TestClient
+
+    import server
+
+    with TestClient(server.app) as client:
+        yield client
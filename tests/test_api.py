@@ -0,0 +1,72 @@
+"""HTTP behaviour of the public and admin routes on the in-memory repositories"""
+import base64
+import json
+
+import pytest
+
+
+def cursor(*parts):
+    return base64.urlsafe_b64encode(json.dumps(parts).encode()).decode().rstrip("=")
+
+
+def first_site(client):
+    return client.get("/api/pbn", params={"limit": 1}).json()[0]
+
+
+def test_not_modified_until_a_write(client):
+    response = client.get("/api/pbn")
+    etag = response.headers["etag"]
+    assert client.get("/api/pbn", headers={"If-None-Match": etag}).status_code == 304
+
+    site = response.json()[0]
+    assert client.patch(f"/api/admin/pbn/{site['id']}", json={"price_per_post": 123450000}).status_code == 200
+
+    response = client.get("/api/pbn", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert {"id": site["id"], "price_per_post": 123450000} in [
+        {"id": row["id"], "price_per_post": row["price_per_post"]} for row in response.json()]
+
+
+def test_keyset_pages_do_not_overlap(client):
+    first = client.get("/api/pbn", params={"cursor": "", "limit": 5, "sort_by": "dr"}).json()
+    second = client.get("/api/pbn", params={"cursor": first["next_cursor"], "limit": 5, "sort_by": "dr"}).json()
+    keys = [(row["dr"], row["id"]) for row in first["items"] + second["items"]]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == 10
+
+
+@pytest.mark.parametrize("value", [
+    "not-base64-json",
+    cursor("da", 50, "x"),
+    cursor("dr", {"$gt": 0}, "x"),
+    cursor("dr", True, "x"),
+    cursor("dr", 50, {"$ne": None}),
+    cursor("dr", 50),
+    base64.urlsafe_b64encode(b'["dr",NaN,"x"]').decode(),
+    base64.urlsafe_b64encode(b'["dr",-Infinity,"x"]').decode(),
+])
+def test_invalid_cursor_is_rejected(client, value):
+    response = client.get("/api/pbn", params={"cursor": value, "sort_by": "dr"})
+    assert response.status_code == 400
+
+
+def test_duplicate_slug_is_a_conflict(client):
+    page = {"title": "Duplicate", "slug": "duplicate-slug", "content": "x"}
+    assert client.post("/api/admin/pages", json=page).status_code == 200
+    response = client.post("/api/admin/pages", json=page)
+    assert response.status_code == 409
+    assert response.json()["field"] == "slug"
+
+
+def test_empty_patch_is_rejected(client):
+    site = first_site(client)
+    response = client.patch(f"/api/admin/pbn/{site['id']}", json={})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("accept_encoding,coding", [("gzip", "gzip"), ("gzip;q=0", None), ("identity", None)])
+def test_sitemap_respects_accept_encoding(client, accept_encoding, coding):
+    response = client.get("/api/sitemap", headers={"Accept-Encoding": accept_encoding})
+    assert response.headers.get("content-encoding") == coding
+    assert response.text.startswith("<?xml")
@@ -0,0 +1,54 @@
+"""Validation of bulk admin operations before anything reaches MongoDB"""
+import asyncio
+
+import pytest
+from pymongo import DeleteOne, UpdateMany, UpdateOne
+
+from bulk import build_write, run_bulk
+from server import PBN_BULK
+
+INVALID = [
+    ({"op": "update", "set": {"dr": 50}}, "needs an id"),
+    ({"op": "update", "id": "x", "set": {}}, "at least one field"),
+    ({"op": "update", "id": "x", "set": {"dr": "high"}}, "dr"),
+    ({"op": "update", "id": "x", "set": {"owner": "me"}}, "unknown fields: owner"),
+    ({"op": "status", "id": "x", "status": "deleted"}, "status must be one of"),
+    ({"op": "update_many", "filter": {}, "set": {"status": "hidden"}}, "non-empty filter"),
+    ({"op": "update_many", "filter": {"domain_real": {"$regex": "."}}, "set": {"status": "hidden"}}, "not allowed"),
+    ({"op": "update_many", "filter": {"owner": "me"}, "set": {"status": "hidden"}}, "cannot filter on 'owner'"),
+    ({"op": "update_many", "filter": {"niche": {"$in": "Finance"}}, "set": {"status": "hidden"}}, "needs a list"),
+    ({"op": "update_many", "filter": {"niche": {"$eq": {"$ne": 1}}}, "set": {"status": "hidden"}}, "plain values"),
+    ({"op": "update_many", "filter": {"niche": "Finance"}, "multiply": {"niche": 2}}, "not a numeric field"),
+    ({"op": "update_many", "filter": {"niche": "Finance"}, "set": {"dr": 1}, "multiply": {"dr": 2}},
+     "both set and multiplied"),
+    ({"op": "update_many", "filter": {"niche": "Finance"}, "multiply": {"price_per_post": 0}}, "factor"),
+    ({"op": "update_many", "filter": {"niche": "Finance"}, "multiply": {"price_per_post": -1.1}}, "factor"),
+    ({"op": "update_many", "filter": {"niche": "Finance"}, "multiply": {"price_per_post": 1000}}, "factor"),
+    ({"op": "update_many", "filter": {"niche": "Finance"}, "multiply": {"price_per_post": float("nan")}}, "factor"),
+    ({"op": "update_many", "filter": {"niche": "Finance"}, "multiply": {"price_per_post": "2"}}, "factor"),
+    ({"op": "update_many", "filter": {"niche": "Finance"}}, "needs 'set' or 'multiply'"),
+    ({"op": "rename", "id": "x"}, "unknown op"),
+]
+
+
+@pytest.mark.parametrize("op,message", INVALID)
+def test_invalid_operation(op, message):
+    with pytest.raises(ValueError, match=message):
+        build_write(PBN_BULK, op)
+
+
+def test_valid_operations():
+    assert isinstance(build_write(PBN_BULK, {"op": "delete", "id": "x"}), DeleteOne)
+    assert isinstance(build_write(PBN_BULK, {"op": "status", "id": "x", "status": "hidden"}), UpdateOne)
+    write = build_write(PBN_BULK, {"op": "update_many", "filter": {"niche": {"$in": ["Finance"]}},
+                                   "multiply": {"price_per_post": 1.1}})
+    assert isinstance(write, UpdateMany)
+
+
+def test_invalid_operations_are_reported_per_index():
+    operations = [op for op, _ in INVALID]
+    # Nothing is valid, so the collection is never touched
+    report = asyncio.run(run_bulk(None, PBN_BULK, operations))
+    assert report["errors"] == len(operations)
+    assert [result["index"] for result in report["results"]] == list(range(len(operations)))
+    assert all(result["status"] == "error" and result["error"] for result in report["results"])
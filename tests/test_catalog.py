@@ -0,0 +1,75 @@
+"""A CatalogSnapshot must answer every query exactly like the repository it indexes"""
+import asyncio
+import random
+
+import pytest
+
+from catalog import CatalogIndex
+from conditional import LocalCollectionVersions
+from repository import MemoryRepository
+from synthetic import generate
+
+PROJECTION = {"_id": 0, "domain_real": 0, "notes": 0}
+SORT_FIELDS = ["dr", "da", "traffic", "price_per_post"]
+
+
+@pytest.fixture
+def catalog():
+    async def build():
+        versions = LocalCollectionVersions()
+        repo = MemoryRepository("pbn_sites")
+        await repo.insert_many(generate("pbn_sites", 2000))
+        index = CatalogIndex(repo, versions, {"status": "active"}, PROJECTION, SORT_FIELDS)
+        return repo, versions, index
+    return asyncio.run(build())
+
+
+def random_queries(niches, seed=1, count=200):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        query = {"status": "active"}
+        if rnd.random() < .5:
+            query["dr"] = {"$gte": rnd.randint(0, 80)}
+        if rnd.random() < .5:
+            query["price_per_post"] = {"$lte": rnd.randint(50000, 250000)}
+        if rnd.random() < .4:
+            query["niche"] = {"$in": rnd.sample(niches, rnd.randint(0, 3))}
+        field = rnd.choice(SORT_FIELDS)
+        skip, limit = rnd.choice([(0, 10), (30, 20), (0, 100), (500, 10)])
+        yield query, [(field, -1), ("id", -1)], skip, limit
+
+
+def test_snapshot_matches_repository(catalog):
+    repo, _, index = catalog
+
+    async def check():
+        snapshot = await index.current()
+        for query, sort, skip, limit in random_queries(await repo.distinct("niche")):
+            assert await snapshot.find(query, PROJECTION, sort, skip, limit) == \
+                await repo.find(query, PROJECTION, sort, skip, limit), (query, sort, skip)
+            assert await snapshot.count(query) == await repo.count(query), query
+        # Outside the indexed rows the snapshot falls back to the repository
+        hidden = {"status": "hidden"}
+        assert await snapshot.find(hidden, PROJECTION, [("dr", -1), ("id", -1)], 0, 5) == \
+            await repo.find(hidden, PROJECTION, [("dr", -1), ("id", -1)], 0, 5)
+
+    asyncio.run(check())
+
+
+def test_local_writes_keep_parity(catalog):
+    repo, versions, index = catalog
+
+    async def check():
+        await index.current()
+        sort = [("dr", -1), ("id", -1)]
+        top = (await repo.find({"status": "active"}, None, sort, 0, 1))[0]
+        index.written(await versions.bump("pbn_sites"), await repo.update({"id": top["id"]}, {"dr": 1}))
+        hidden = (await repo.find({"status": "active"}, None, sort, 0, 1))[0]
+        index.written(await versions.bump("pbn_sites"), await repo.update({"id": hidden["id"]}, {"status": "hidden"}))
+        snapshot = await index.current()
+        assert index.reloads == 1 and index.local_updates == 2
+        for query, sort, skip, limit in random_queries(await repo.distinct("niche"), seed=2, count=50):
+            assert await snapshot.find(query, PROJECTION, sort, skip, limit) == \
+                await repo.find(query, PROJECTION, sort, skip, limit), (query, sort, skip)
+
+    asyncio.run(check())
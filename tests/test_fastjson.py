@@ -0,0 +1,24 @@
+"""fast_json() must encode admin listings to exactly the bytes response_model produces"""
+import asyncio
+from typing import List
+
+import pytest
+from fastapi.utils import create_response_field
+
+import fastjson
+from bench_fastjson import fast_body, listings, validated_body
+
+LISTINGS = listings(200)
+
+
+@pytest.fixture(autouse=True)
+def fast_json_enabled(monkeypatch):
+    monkeypatch.setattr(fastjson, "FAST_JSON_ENABLED", True)
+
+
+@pytest.mark.parametrize("route", sorted(LISTINGS))
+def test_fast_json_matches_response_model(route):
+    model, docs = LISTINGS[route]
+    field = create_response_field(name=f"Response_{route}", type_=List[model])
+    expected = asyncio.run(validated_body(field, docs))
+    assert fast_body(model, docs) == expected
@@ -0,0 +1,80 @@
+"""Row-level reporting of the chunked domain importer"""
+import asyncio
+import io
+
+from pymongo.errors import BulkWriteError
+
+from importer import import_rows, iter_rows
+from server import DomainListingCreate
+
+HEADER = "domain_name,da,pa,ur,dr,tf,cf,price,age,registrar,status,notes\n"
+
+
+def row(name, **overrides):
+    values = dict(da=10, pa=10, ur=10, dr=20, tf=5, cf=5, price=1000000, age=3, registrar="Namecheap",
+                  status="", notes="")
+    values.update(overrides)
+    return ",".join([name] + [str(value) for value in values.values()]) + "\n"
+
+
+class FakeCollection:
+    """Records the upserts; domain names in `rejected` fail like a server-side write error"""
+
+    def __init__(self, rejected=()):
+        self.rejected = set(rejected)
+        self.ops = []
+
+    async def bulk_write(self, ops, ordered=True):
+        self.ops.extend(ops)
+        errors = [{"index": index, "code": 11000, "errmsg": "E11000 duplicate key error"}
+                  for index, op in enumerate(ops) if op._filter["domain_name"] in self.rejected]
+        accepted = len(ops) - len(errors)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nUpserted": accepted, "nMatched": 0})
+
+        class Result:
+            bulk_api_result = {"nUpserted": accepted, "nMatched": 0}
+            upserted_count = accepted
+            matched_count = 0
+        return Result()
+
+
+def run(collection, body, fmt="csv", chunk_size=None):
+    async def collect():
+        return [report async for report in
+                import_rows(collection, iter_rows(io.BytesIO(body), fmt), DomainListingCreate, chunk_size)]
+    return asyncio.run(collect())
+
+
+def test_invalid_rows_are_reported_by_line():
+    body = (HEADER + row("a.com") + row("b.com", dr="high") + row("c.com", registrar="")).encode()
+    *chunks, summary = run(FakeCollection(), body)
+    errors = {error["row"]: error["errors"] for chunk in chunks for error in chunk["errors"]}
+    assert sorted(errors) == [3, 4]
+    assert any(message.startswith("dr:") for message in errors[3])
+    assert any(message.startswith("registrar:") for message in errors[4])
+    assert summary["done"] and summary["rows"] == 3 and summary["invalid"] == 2
+
+
+def test_undecodable_lines_are_reported():
+    body = HEADER.encode() + row("a.com").encode() + row("b\xe9.com").encode("latin-1")
+    *chunks, summary = run(FakeCollection(), body)
+    assert [error["row"] for chunk in chunks for error in chunk["errors"]] == [3]
+    assert "invalid UTF-8" in chunks[0]["errors"][0]["errors"][0]
+    assert summary["invalid"] == 1
+
+
+def test_write_errors_map_to_source_lines():
+    body = (HEADER + row("a.com") + row("b.com") + row("c.com") + row("d.com")).encode()
+    *chunks, summary = run(FakeCollection(rejected={"d.com"}), body, chunk_size=2)
+    assert [chunk["rows"] for chunk in chunks] == [2, 2]
+    assert chunks[1]["errors"] == [{"row": 5, "errors": ["E11000 duplicate key error"]}]
+    assert summary["write_errors"] == 1
+
+
+def test_blank_cells_are_left_unset():
+    collection = FakeCollection()
+    run(collection, (HEADER + row("a.com")).encode())
+    update = collection.ops[0]._doc
+    assert "status" not in update["$set"] and "notes" not in update["$set"]
+    assert update["$setOnInsert"]["status"] == "available"